@@ -1,5 +1,6 @@
 # Entry point (Socket.IO + FastAPI app)
 
+import asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -7,6 +8,9 @@ from starlette.middleware.cors import CORSMiddleware
 import socketio
 from sockets.interview_socket import sio
 from utils.redis_utils import close_redis, get_redis
+from utils.job_queue import start_workers, stop_workers
+from services.batch_service import batch_service
+from services.video_job_service import VIDEO_QUEUE, CONCURRENCY as VIDEO_CONCURRENCY, RUN_IN_API as VIDEO_JOBS_IN_API
 from socketio import ASGIApp 
 import sockets.interview_socket
 from routers.interview_router import router as interview_router
@@ -17,6 +21,8 @@ from routers.interviewer_router import router as interviewer_router
 from routers.user_router import router as user_router
 from routers.feedback_router import router as feedback_router
 from routers.media_router import router as media_router
+from routers.llm_router import router as llm_router
+from routers.template_router import router as template_router
 from middleware.auth_middleware import AuthMiddleware
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
@@ -38,7 +44,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize Redis connection: {e}")
         # Continue startup even if Redis fails - it will be retried on first use
+    # Background job workers (per-answer analysis etc.); they retry Redis on their own
+    worker_tasks = start_workers()
+    # Video encodes normally run in app/worker.py so they cannot starve live interviews
+    if VIDEO_JOBS_IN_API:
+        worker_tasks += start_workers({VIDEO_QUEUE: VIDEO_CONCURRENCY})
+    if batch_service.enabled:
+        worker_tasks.append(asyncio.create_task(batch_service.run_poller()))
     yield
+    await stop_workers(worker_tasks)
     await close_redis()
 
 app = FastAPI(lifespan=lifespan)
@@ -64,6 +78,8 @@ app.include_router(interviewer_router)
 app.include_router(user_router)
 app.include_router(feedback_router)
 app.include_router(media_router)
+app.include_router(llm_router)
+app.include_router(template_router)
 app.include_router(candidate_router)
 
 # Serve media files (images and videos)
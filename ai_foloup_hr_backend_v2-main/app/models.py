@@ -3,7 +3,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import (create_engine, Column,String,Integer,FLOAT,Text,Boolean,DateTime,ForeignKey,Enum,JSON,ARRAY,TIMESTAMP,func)
+from sqlalchemy import (create_engine, Column,String,Integer,FLOAT,Text,Boolean,DateTime,ForeignKey,Enum,JSON,ARRAY,TIMESTAMP,UniqueConstraint,LargeBinary,func)
 from sqlalchemy.dialects.postgresql import JSONB,UUID
 from sqlalchemy.orm import declarative_base,relationship
 
@@ -82,6 +82,8 @@ class Interview(Base):
     question_mode = Column(String, default="predefined")  
     auto_question_generate = Column(Boolean, default=True)
     manual_questions = Column(JSONB)
+    insights = Column(JSONB, nullable=True)  # cross-candidate insights rollup (services/insights_service.py)
+    question_pool = Column(JSONB, nullable=True)  # pre-generated predefined questions (services/question_pool_service.py)
 
     organization = relationship("Organization", back_populates="interviews")
     user = relationship("User", back_populates="interviews")
@@ -126,6 +128,7 @@ class Response(Base):
     candidate_image_url = Column(Text, nullable=True)
     candidate_video_url = Column(Text, nullable=True)
     overall_analysis = Column(JSONB, default={})
+    running_evaluation = Column(JSONB, nullable=True)  # rolling summary folded after each answer (incremental evaluation mode)
     cost = Column(FLOAT, nullable=False, default=0.0)
     deepgram_cost = Column(FLOAT, nullable=False, default=0.0)
     elevenlabs_cost = Column(FLOAT, nullable=False, default=0.0)
@@ -134,6 +137,22 @@ class Response(Base):
 
     interview = relationship("Interview", back_populates="responses")
     feedbacks = relationship("Feedback", back_populates="response", cascade="all, delete-orphan")
+    questions = relationship("ResponseQuestion", back_populates="response", cascade="all, delete-orphan",
+                             passive_deletes=True, order_by="ResponseQuestion.position")
+
+class ResponseQuestion(Base):
+    """One dynamic-mode question asked in a response; rows are only ever inserted."""
+    __tablename__ = "response_question"
+    __table_args__ = (UniqueConstraint("response_id", "position", name="uq_response_question_position"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    response_id = Column(UUID(as_uuid=True), ForeignKey("response.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # 0-based, matches Response.current_question_index
+    question = Column(JSONB, nullable=False)  # {"id", "question"} as returned by get_questions_list
+    usage = Column(JSONB, nullable=True)  # token usage of the generating LLM call
+
+    response = relationship("Response", back_populates="questions")
 
 class Feedback(Base):
     __tablename__ = "feedback"
@@ -147,4 +166,42 @@ class Feedback(Base):
     satisfaction = Column(Integer)
     
     interview = relationship("Interview", back_populates="feedbacks")
-    response = relationship("Response", back_populates="feedbacks")
\ No newline at end of file
+    response = relationship("Response", back_populates="feedbacks")
+
+class QuestionBankEntry(Base):
+    """A generated or manual question kept for reuse across interviews of one organization."""
+    __tablename__ = "question_bank"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organization.id", ondelete="CASCADE"), nullable=True, index=True)
+    interview_id = Column(UUID(as_uuid=True), ForeignKey("interview.id", ondelete="SET NULL"), nullable=True, index=True)
+    question = Column(Text, nullable=False)
+    text_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of the normalized question text
+    source = Column(String, nullable=False, default="generated")  # generated | manual
+    vector = Column(LargeBinary, nullable=False)  # float16 hashing vector (utils/text_vectors.py)
+    use_count = Column(Integer, nullable=False, default=0)  # times served from the bank to another interview
+
+class InterviewTemplate(Base):
+    """An interview's prepared set-up (JD summary, questions, pool, voice, settings) for creating similar interviews."""
+    __tablename__ = "interview_template"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    name = Column(Text, nullable=False)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organization.id", ondelete="CASCADE"), nullable=True, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=True)
+    source_interview_id = Column(UUID(as_uuid=True), ForeignKey("interview.id", ondelete="SET NULL"), nullable=True)
+    interviewer_id = Column(UUID(as_uuid=True), ForeignKey("interviewer.id", ondelete="SET NULL"), nullable=True)
+    job_description = Column(Text)
+    description = Column(Text)
+    question_mode = Column(String, default="predefined")
+    question_count = Column(Integer)
+    auto_question_generate = Column(Boolean, default=True)
+    manual_questions = Column(JSONB)
+    time_duration = Column(Text)
+    is_anonymous = Column(Boolean, default=False)
+    context = Column(JSONB, default={})  # JD summary, copied as-is into new interviews
+    questions = Column(JSONB)  # prepared predefined question set, served by the first /generate-questions
+    question_pool = Column(JSONB, nullable=True)  # copied so new interviews sample per-response sets right away
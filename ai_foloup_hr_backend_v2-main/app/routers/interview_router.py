@@ -1,33 +1,43 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Request, Depends
 from typing import Optional, Dict, List, Tuple
 from pathlib import Path
+import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import select, func, desc, and_
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.orm import selectinload
 from db import AsyncSessionLocal
-from models import Interview, Response, Candidate, Interviewer, Feedback
+from models import Interview, Response, Candidate, Interviewer, Feedback, User
 from schemas.interview_schema import (
     DeleteInterviewRequest,
     ToggleInterviewStatusRequest,
 )
 from services.summarization_service import summarization_service
 from services.llm_service import llm_service
+from services.analysis_service import analysis_progress
+from services.question_service import FUSED_SETUP_SOURCE
+from services.question_pool_service import HR_EDITED_SOURCE, question_pool_service
 from utils.interview_utils import (
     get_interview_or_404,
-    extract_text_from_file,
+    extract_text_from_file_cached,
     get_questions_list,
     parse_manual_questions,
     commit_and_refresh,
     format_duration,
-    normalize_question
+    normalize_question,
+    question_text
 )
 from middleware.auth_middleware import safe_route
 from routers.candidate_router import _get_interview_link
 from utils.datetime_utils import format_datetime_ist_iso, normalize_to_ist, convert_utc_to_ist, IST_TIMEZONE
+from utils.logger import get_logger
+from config_loader import load_config
 
+logger = get_logger(__name__)
 router = APIRouter(prefix="/api/interview", tags=["interview"])
+# Generate the JD summary and the predefined questions in one LLM call at creation
+FUSED_SETUP_GENERATION = bool((load_config().get("interview_setup", {}) or {}).get("fused_generation", True))
 
 def parse_date(date_str: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
     if not date_str:
@@ -135,9 +145,21 @@ def serialize_interview(interview, responses_count: Optional[int] = None, includ
 
     return result
 
+def new_interview_url(name: Optional[str]) -> Tuple[str, Optional[str]]:
+    url_id = str(uuid.uuid4())
+    url = f"/candidate/interview/{url_id}"
+    
+    readable_slug = None
+    if name:
+        readable_slug = name.lower().replace(' ', '-').replace('_', '-')
+        readable_slug = ''.join(c for c in readable_slug if c.isalnum() or c == '-')[:50]
+        readable_slug = readable_slug.strip('-')
+    return url, readable_slug
+
 @router.post("/create-interview")
 @safe_route
 async def create_interview(
+    http_request: Request,
     name: str = Form(...),
     job_description: str = Form(...),
     # department: Optional[str] = Form(None),
@@ -169,19 +191,49 @@ async def create_interview(
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid interviewer_id format")
         
+        # Owner and organization scope the interview (HR notifications, question bank, templates)
+        owner_id = None
+        organization_id = None
+        user_id = getattr(http_request.state, 'user_id', None)
+        if user_id:
+            try:
+                owner = (await db.execute(select(User).where(User.id == uuid.UUID(str(user_id))))).scalar_one_or_none()
+            except ValueError:
+                owner = None
+            if owner:
+                owner_id = owner.id
+                organization_id = owner.organization_id
+            else:
+                logger.warning(f"Authenticated user {user_id} not found, creating interview without an owner")
+        
+        jd_bytes = None
+        if jd_file:
+            allowed_extensions = ['.pdf', '.docx', '.doc', '.txt']
+            file_extension = Path(jd_file.filename).suffix.lower()
+            if file_extension not in allowed_extensions:
+                raise HTTPException(status_code=400, detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}")
+            jd_bytes = await jd_file.read()
+
         time_duration_str = None
         if duration_minutes and duration_minutes > 0:
             time_duration_str = str(duration_minutes)
             
-        url_id = str(uuid.uuid4())
-        url = f"/candidate/interview/{url_id}"
-        
-        readable_slug = None
-        if name:
-            readable_slug = name.lower().replace(' ', '-').replace('_', '-')
-            readable_slug = ''.join(c for c in readable_slug if c.isalnum() or c == '-')[:50]
-            readable_slug = readable_slug.strip('-')
+        url, readable_slug = new_interview_url(name)
         
+        manual_list = parse_manual_questions(manual_questions)
+        # Same condition under which /generate-questions would call the LLM for this interview
+        fused = FUSED_SETUP_GENERATION and mode == "predefined" and (auto_question_generate or not manual_list)
+
+        async def prepare_setup():
+            jd_text = await extract_text_from_file_cached(jd_bytes, jd_file.filename) if jd_bytes is not None else None
+            if fused:
+                full_description = f"{job_description}\n\n{jd_text}" if jd_text else job_description
+                try:
+                    return jd_text, await llm_service.summarize_jd_and_generate_questions(full_description, question_count, name)
+                except Exception as e:
+                    logger.warning(f"Fused interview setup failed, falling back to separate calls: {e}")
+            return jd_text, None
+
         interview = Interview(
             name=name,
             job_description=job_description,
@@ -190,14 +242,24 @@ async def create_interview(
             question_mode=mode,
             question_count=question_count,
             auto_question_generate=auto_question_generate,
-            manual_questions=parse_manual_questions(manual_questions),
+            manual_questions=manual_list,
             interviewer_id=interviewer_id_uuid,
+            user_id=owner_id,
+            organization_id=organization_id,
             time_duration=time_duration_str,
             url=url,
             readable_slug=readable_slug
         )
-        db.add(interview)
-        await commit_and_refresh(db, interview)
+        # Text extraction and the setup LLM call run while the row is inserted
+        setup_task = asyncio.create_task(prepare_setup()) if (jd_bytes is not None or fused) else None
+        try:
+            db.add(interview)
+            await commit_and_refresh(db, interview)
+        except BaseException:
+            if setup_task:
+                setup_task.cancel()
+            raise
+        jd_text, setup = await setup_task if setup_task else (None, None)
         
         if not interview.context:
             interview.context = {}
@@ -206,13 +268,19 @@ async def create_interview(
             interview.context["context_summary"] = f"Interview job_description: {job_description}"
         flag_modified(interview, 'context')
 
-        if jd_file:
-            allowed_extensions = ['.pdf', '.docx', '.doc', '.txt']
-            file_extension = Path(jd_file.filename).suffix.lower()
-            if file_extension not in allowed_extensions:
-                raise HTTPException(status_code=400, detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}")
-            
-            jd_text = extract_text_from_file(await jd_file.read(), jd_file.filename)
+        if setup:
+            jd_summary = setup["summary"]
+            jd_summary["context_summary"] = summarization_service.get_context_for_llm(jd_summary)
+            interview.context = jd_summary
+            flag_modified(interview, 'context')
+            interview.llm_generated_questions = {
+                "questions": [normalize_question(q) for q in setup["questions"]],
+                "description": setup["description"],
+                "source": FUSED_SETUP_SOURCE,
+                "_usage": {"fused_setup_generation": [setup["_usage"]]} if setup.get("_usage") else {},
+            }
+            flag_modified(interview, 'llm_generated_questions')
+        elif jd_text is not None:
             jd_summary = await summarization_service.summarize_jd(jd_text)
             if isinstance(jd_summary, dict):
                 # jd_summary["difficulty_level"] = difficulty_level
@@ -557,6 +625,8 @@ async def update_interview(
 
         original_mode = interview.question_mode
         original_qc = interview.question_count
+        original_jd = interview.job_description
+        original_questions = [question_text(q) for q in get_questions_list(interview)]
 
         if name is not None:
             interview.name = name
@@ -610,7 +680,8 @@ async def update_interview(
                             formatted_q["id"] = str(uuid.uuid4())
                             formatted_questions.append(formatted_q)
                     
-                    interview.llm_generated_questions = {"questions": formatted_questions}
+                    # Recorded as HR's set so the question pool does not replace it with unreviewed questions
+                    interview.llm_generated_questions = {"questions": formatted_questions, "source": HR_EDITED_SOURCE}
                     flag_modified(interview, 'llm_generated_questions')
                     interview.manual_questions = None
             else:
@@ -639,6 +710,15 @@ async def update_interview(
         ):
             interview.llm_generated_questions = None
 
+        # Pooled sets would no longer match what HR configured; a new pool is built on the next generation
+        if (
+            original_mode != interview.question_mode
+            or original_qc != interview.question_count
+            or original_jd != interview.job_description
+            or original_questions != [question_text(q) for q in get_questions_list(interview)]
+        ):
+            await question_pool_service.reset(interview)
+
         await db.commit()
         await db.refresh(interview)
         return serialize_interview(interview)
@@ -712,6 +792,7 @@ async def list_responses(interview_id: str = Query(...)):
             "name": r.name,
             "email": r.email,
             "answered_questions": len(r.qa_history or []),
+            "analysis_progress": analysis_progress(r.qa_history),
             "cost": getattr(r, "cost", None),
             "deepgram_cost": getattr(r, "deepgram_cost", None),
             "elevenlabs_cost": getattr(r, "elevenlabs_cost", None),
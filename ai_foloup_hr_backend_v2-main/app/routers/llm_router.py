@@ -0,0 +1,50 @@
+from fastapi import APIRouter
+from services.model_routing import model_router
+from services.batch_service import batch_service
+from services.question_bank_service import question_bank_service
+from middleware.auth_middleware import safe_route
+
+router = APIRouter(prefix="/api/llm", tags=["llm"])
+
+
+@router.get("/route-stats")
+@safe_route
+async def get_route_stats():
+    """Per-call-type routing config with exported latency (p50/p95 per deployment), token and cost counters."""
+    return {"ok": True, "routes": await model_router.get_stats()}
+
+
+@router.post("/route-stats/reset")
+@safe_route
+async def reset_route_stats():
+    await model_router.reset_stats()
+    return {"ok": True}
+
+
+@router.get("/batches")
+@safe_route
+async def get_batches():
+    """Offline batch queue depth, open batches and the most recently completed ones."""
+    return {"ok": True, **await batch_service.get_stats()}
+
+
+@router.post("/batches/flush")
+@safe_route
+async def flush_batches():
+    """Submit whatever is queued now instead of waiting for batch.max_wait_seconds."""
+    batch_id = await batch_service.flush(force=True)
+    return {"ok": True, "batch_id": batch_id}
+
+
+@router.get("/question-bank")
+@safe_route
+async def get_question_bank_stats():
+    """Question bank size, hit rate and generation calls avoided by reusing questions from matching JDs."""
+    return {"ok": True, **await question_bank_service.get_stats()}
+
+
+@router.post("/question-bank/reset-stats")
+@safe_route
+async def reset_question_bank_stats():
+    await question_bank_service.reset_stats()
+    return {"ok": True}
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Query, HTTPException, Request, Depends
+from fastapi.responses import StreamingResponse
 from typing import Optional
-from sqlalchemy import select
+import json
 from db import AsyncSessionLocal
-from models import Interviewer
 from schemas.interview_schema import GenerateQuestionsRequest
 from services.question_service import QuestionService
-from utils.interview_utils import get_interview_or_404, get_response_or_404, get_questions_list, question_text, synthesize_tts
+from services.speculation_service import speculation_service
+from utils.interview_utils import get_interview_or_404, get_response_or_404, load_questions_list, get_voice_id, question_text, synthesize_tts
 from middleware.auth_middleware import safe_route
 from utils.logger import get_logger
 
@@ -13,32 +14,10 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/api/interview", tags=["questions"])
 
 
-async def _get_voice_id(db, interview) -> Optional[str]:
-    if interview.interviewer_id:
-        try:
-            interviewer_result = await db.execute(
-                select(Interviewer).where(Interviewer.id == interview.interviewer_id)
-            )
-            interviewer = interviewer_result.scalar_one_or_none()
-            if interviewer and interviewer.elevenlabs_voice_id:
-                return interviewer.elevenlabs_voice_id
-        except Exception:
-            pass
-    
-    try:
-        from services.tts_service import tts_service
-        if hasattr(tts_service.provider, 'default_voice_id'):
-            return tts_service.provider.default_voice_id
-    except Exception:
-        pass
-    
-    return None
-
-
-async def _add_tts_to_result(result: dict, q_text: str, voice_id: Optional[str]) -> None:
+async def _add_tts_to_result(result: dict, q_text: str, voice_id: Optional[str], cache: bool = True) -> None:
     if voice_id and q_text:
         try:
-            tts_data = await synthesize_tts(q_text, voice_id)
+            tts_data = await synthesize_tts(q_text, voice_id, cache=cache)
             if tts_data:
                 result.update(tts_data)
         except Exception as e:
@@ -82,13 +61,70 @@ async def generate_questions(request: GenerateQuestionsRequest):
         }
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/generate-questions/stream")
+@safe_route
+async def generate_questions_stream(request: GenerateQuestionsRequest):
+    """
+    Server-sent events variant of /generate-questions: one `question` event per question as soon as
+    it is generated, then `done` with the same body /generate-questions returns (or `error`).
+    A POST behind the Bearer-token auth, so browsers cannot use EventSource (GET only, no custom
+    headers); clients read the response body with fetch (frontend: generateQuestionsStream).
+    """
+    async with AsyncSessionLocal() as db:
+        await get_interview_or_404(db, request.interview_id)
+
+    async def events():
+        async with AsyncSessionLocal() as db:
+            interview = await get_interview_or_404(db, request.interview_id)
+            target_count = request.question_count if request.question_count and request.question_count > 0 else interview.question_count
+            question_mode = request.question_mode if request.question_mode is not None else interview.question_mode
+            auto_question_generate = request.auto_question_generate if request.auto_question_generate is not None else interview.auto_question_generate
+
+            questions = []
+            try:
+                if question_mode == "predefined" and not auto_question_generate and interview.manual_questions:
+                    questions = await QuestionService.handle_manual_questions(interview, db, target_count)
+                    for question in questions:
+                        yield _sse("question", {"question": question})
+                elif question_mode == "predefined":
+                    context_for_llm = QuestionService.safe_get_context(interview)
+                    stream = QuestionService.stream_predefined_questions(interview, db, target_count, context_for_llm)
+                    async for event in stream:
+                        if "question" in event:
+                            yield _sse("question", {"question": event["question"]})
+                        else:
+                            questions = event["questions"]
+            except Exception as e:
+                logger.error(f"Streaming question generation failed for interview {request.interview_id}: {e}", exc_info=True)
+                yield _sse("error", {"ok": False, "error": str(e)})
+                return
+
+            yield _sse("done", {
+                "ok": True,
+                "questions": questions,
+                "mode": question_mode,
+                "description": interview.description or ""
+            })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stops nginx from buffering the stream until it ends
+        "X-Accel-Buffering": "no",
+    })
+
+
 @router.get("/get-current-question")
 @safe_route
 async def get_current_question(response_id: str = Query(...)):
     async with AsyncSessionLocal() as db:
         response = await get_response_or_404(db, response_id)
         interview = await get_interview_or_404(db, str(response.interview_id))
-        questions = get_questions_list(interview)
+        questions = await load_questions_list(db, interview, response)
+        speculative = False
         
         if interview.question_mode == "dynamic":
             max_questions = interview.question_count
@@ -106,25 +142,35 @@ async def get_current_question(response_id: str = Query(...)):
                 
                 if len(previous_answers) == 0:
                     context_for_llm = QuestionService.safe_get_context(interview)
-                    first_q = await QuestionService.generate_first_dynamic_question(interview, db, context_for_llm)
+                    first_q = await QuestionService.generate_first_dynamic_question(interview, db, context_for_llm, response.id)
                     if not first_q:
                         return {
                             "ok": False,
                             "error": "Failed to generate first question",
                             "mode": interview.question_mode
                         }
-                    questions = get_questions_list(interview)
+                    questions = await load_questions_list(db, interview, response)
                 elif len(previous_answers) < max_questions:
-                    next_question = await QuestionService.generate_next_dynamic_question(
-                        interview, db, previous_answers
+                    last_answer = previous_answers[-1].get("answer", "") if isinstance(previous_answers[-1], dict) else ""
+                    next_question = await speculation_service.take(
+                        response_id, response.current_question_index, last_answer
                     )
+                    if next_question:
+                        next_question = await QuestionService.add_dynamic_question(
+                            db, response.id, response.current_question_index, next_question
+                        )
+                        speculative = True
+                    else:
+                        next_question = await QuestionService.generate_next_dynamic_question(
+                            interview, db, previous_answers, response.id, response.current_question_index
+                        )
                     if not next_question or next_question.get("error"):
                         return {
                             "ok": False,
                             "error": next_question.get("error", "Failed to generate next question") if next_question else "Failed to generate question",
                             "mode": interview.question_mode
                         }
-                    questions = get_questions_list(interview)
+                    questions = await load_questions_list(db, interview, response)
                 else:
                     return {"ok": True, "complete": True, "mode": interview.question_mode}
         
@@ -163,8 +209,19 @@ async def get_current_question(response_id: str = Query(...)):
             "total_questions": total_questions_display,
             "mode": interview.question_mode
         }
+        if interview.question_mode == "dynamic":
+            result["speculative"] = speculative
         
-        voice_id = await _get_voice_id(db, interview)
-        await _add_tts_to_result(result, q_text, voice_id)
+        voice_id = await get_voice_id(db, interview)
+        # Predefined questions come from the pool, a template or HR and recur across candidates;
+        # dynamic follow-ups are specific to one answer and are not worth caching
+        await _add_tts_to_result(result, q_text, voice_id, cache=interview.question_mode != "dynamic")
         
         return result
+
+
+@router.get("/speculation-stats")
+@safe_route
+async def get_speculation_stats(recent: int = Query(20, ge=0, le=200)):
+    stats = await speculation_service.get_stats(recent)
+    return {"ok": True, **stats}
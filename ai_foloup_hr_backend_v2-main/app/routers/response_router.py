@@ -7,19 +7,21 @@ from db import AsyncSessionLocal
 from models import Response, Candidate, Feedback, Interviewer
 from schemas.interview_schema import (
     SubmitAnswerRequest,
-    UpdateResponseStatusRequest
+    UpdateResponseStatusRequest,
+    ReanalyzeResponsesRequest
 )
-from services.llm_service import llm_service
+from services.analysis_service import analysis_service, analysis_state, analysis_progress, ANALYSIS_PENDING
+from services.reanalysis_service import reanalysis_service
+from services.video_job_service import video_job_service
 from utils.interview_utils import (
     get_interview_or_404,
     get_response_or_404,
-    get_questions_list,
+    load_questions_list,
     question_text,
     format_duration
 )
 from utils.cost_utils import apply_response_cost, calculate_response_cost
 from utils.logger import get_logger
-from routers.candidate_router import _send_hr_notification
 from routers.candidate_router import _format_date_for_display, _get_interview_link
 from utils.datetime_utils import format_datetime_ist_iso
 
@@ -52,11 +54,8 @@ async def _ensure_analysis(db, response, interview_id: str) -> dict:
     overall_analysis = getattr(response, "overall_analysis", None)
     if not overall_analysis and response.qa_history:
         try:
-            overall_analysis, usage = await llm_service.generate_final_analysis(str(interview_id), response.qa_history)
-            if usage:
-                overall_analysis = dict(overall_analysis or {})
-                overall_analysis["_usage"] = usage           
-            setattr(response, "overall_analysis", overall_analysis)
+            overall_analysis, per_answer = await analysis_service.final_analysis_once(str(response.id), str(interview_id), response.qa_history)
+            analysis_service.apply_final_analysis(response, overall_analysis, per_answer)
             apply_response_cost(response)
             await db.commit()
         except Exception:
@@ -244,8 +243,8 @@ def _calculate_duration(response) -> tuple[int, str]:
         duration_seconds = response.duration if response.duration else 0
     return duration_seconds, format_duration(duration_seconds)
 
-def _build_question_summaries(interview, qa_history: list, overall_analysis: dict) -> list:
-    all_questions = get_questions_list(interview)
+def _build_question_summaries(interview, all_questions: list, qa_history: list, overall_analysis: dict) -> list:
+    all_questions = list(all_questions)
     
     if interview.question_mode == "dynamic" and interview.question_count:
         while len(all_questions) < interview.question_count:
@@ -266,11 +265,13 @@ def _build_question_summaries(interview, qa_history: list, overall_analysis: dic
         has_answer = False
         answer_text = ""
         qa_analysis = {}
+        qa_analysis_status = None
         if idx < len(qa_history):
             qa_item = qa_history[idx]
             answer_text = qa_item.get("answer", "").strip()
             has_answer = bool(answer_text)
             qa_analysis = qa_item.get("analysis", {}) if isinstance(qa_item.get("analysis"), dict) else {}
+            qa_analysis_status = analysis_state(qa_item)
         
         summary = llm_summaries.get(q_text, "")
         
@@ -311,6 +312,7 @@ def _build_question_summaries(interview, qa_history: list, overall_analysis: dic
             "question_number": idx + 1,
             "question": q_text,
             "status": status,
+            "analysis_status": qa_analysis_status,
             "summary": summary if summary else "Not Answered"
         })
     
@@ -358,7 +360,7 @@ def _format_timestamp(seconds: int) -> str:
 @router.post("/submit-answer")
 async def submit_answer(request: SubmitAnswerRequest, background_tasks: BackgroundTasks = BackgroundTasks()):
     async with AsyncSessionLocal() as db:
-        response = await get_response_or_404(db, request.response_id)
+        response = await get_response_or_404(db, request.response_id, for_update=True)
         interview = await get_interview_or_404(db, str(response.interview_id))
 
         qa_pair = {
@@ -366,32 +368,21 @@ async def submit_answer(request: SubmitAnswerRequest, background_tasks: Backgrou
             "answer": request.transcript,
             "analysis": {}
         }
+        if interview.context:
+            # In batched mode the answer is scored together with the others at interview end
+            qa_pair["analysis_status"] = ANALYSIS_PENDING
 
         updated_qa_history = list(response.qa_history or [])
         updated_qa_history.append(qa_pair)
         response.qa_history = updated_qa_history
         flag_modified(response, 'qa_history')
         response.current_question_index += 1
-
-        if interview.context:
-            try:
-                analysis,usage = await llm_service.analyze_response(
-                    str(interview.id),
-                    request.transcript,
-                    {"question": request.question}
-                )
-                updated_qa_history[-1]["analysis"] = analysis or {}
-                if usage:
-                    updated_qa_history[-1]["analysis_usage"] = usage
-                response.qa_history = updated_qa_history
-                flag_modified(response, 'qa_history')
-            except Exception:
-                pass
+        qa_index = len(updated_qa_history) - 1
 
         total_questions = (
             interview.question_count 
             if interview.question_mode == "dynamic" and interview.question_count 
-            else len(get_questions_list(interview))
+            else len(await load_questions_list(db, interview, response))
         )
         
         is_complete = response.current_question_index >= total_questions and total_questions > 0
@@ -405,38 +396,36 @@ async def submit_answer(request: SubmitAnswerRequest, background_tasks: Backgrou
             
             if response.start_time and response.end_time:
                 response.duration = int((response.end_time - response.start_time).total_seconds())
-            
-            if interview.context:
-                try:
-                    final_analysis, final_usage = await llm_service.generate_final_analysis(
-                        str(interview.id), response.qa_history
-                    )
-                    if final_usage:
-                        final_analysis = dict(final_analysis or {})
-                        final_analysis["_usage"] = final_usage
-                    setattr(response, "overall_analysis", final_analysis)
-                    # await _assign_status_if_needed(db, response, final_analysis)
-                except Exception:
-                    pass
-            
             cost_info = apply_response_cost(response)
 
         try:
             await db.commit()
-            await db.refresh(response)
         except Exception as e:
             await db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to save response: {str(e)}")
 
+        if interview.context and analysis_service.analyzes_each_answer:
+            try:
+                await analysis_service.enqueue_answer_analysis(str(response.id), qa_index)
+            except Exception as e:
+                logger.error(f"Failed to enqueue answer analysis for response {response.id}, running in-process: {e}")
+                background_tasks.add_task(analysis_service.run_answer_analysis, str(response.id), qa_index)
+
+        final_analysis_status = None
         if is_complete:
+            # The final analysis, insights refresh and HR email run as a job; clients poll the report
+            final_analysis_status = ANALYSIS_PENDING if interview.context else None
             try:
-                await _send_hr_notification(db, response, interview)
+                await analysis_service.enqueue_final_analysis(str(response.id), str(interview.id))
             except Exception as e:
-                logger.error(f"Failed to send HR notification for response {response.id}: {e}", exc_info=True)
+                logger.error(f"Failed to enqueue final analysis for response {response.id}, running in-process: {e}")
+                background_tasks.add_task(analysis_service.run_final_analysis, str(response.id), str(interview.id))
             
-            from routers.media_router import _merge_video_background
-            background_tasks.add_task(_merge_video_background, str(response.id), None)
-            logger.debug(f"Video merge task added for auto-completed interview, response_id: {response.id}")
+            try:
+                await video_job_service.enqueue(str(response.id))
+                logger.debug(f"Video transcode queued for auto-completed interview, response_id: {response.id}")
+            except Exception as e:
+                logger.error(f"Failed to queue video transcode for response_id {response.id}: {e}", exc_info=True)
 
         return {
             "ok": True,
@@ -445,7 +434,9 @@ async def submit_answer(request: SubmitAnswerRequest, background_tasks: Backgrou
             "total_questions": total_questions,
             "questions_answered": len(response.qa_history) if response.qa_history else 0,
             "analysis": qa_pair.get("analysis", {}),
-            "final_analysis": getattr(response, "overall_analysis", None) if is_complete else None,
+            "analysis_status": qa_pair.get("analysis_status"),
+            "final_analysis": None,
+            "final_analysis_status": final_analysis_status,
             "cost": cost_info.get("total_cost") if cost_info else None,
             "deepgram_cost": getattr(response, "deepgram_cost", None),
             "elevenlabs_cost": getattr(response, "elevenlabs_cost", None),
@@ -690,6 +681,9 @@ async def get_overall_analysis(
                     **status_counts
                 }
             },
+            # Precomputed by the insights rollup job; never generated on this request
+            "insights": (interview.insights or {}).get("insights", []),
+            "insights_generated_at": (interview.insights or {}).get("generated_at"),
             "period": period,
             "period_start": format_datetime_ist_iso(start_date) if start_date else None,
             "period_end": format_datetime_ist_iso(now) if start_date else None
@@ -744,7 +738,8 @@ async def get_response_detail(response_id: str = Query(...)):
         cost_breakdown = calculate_response_cost(response)
 
         duration_seconds, duration_formatted = _calculate_duration(response)
-        question_summary = _build_question_summaries(interview, qa_history, overall_analysis)
+        all_questions = await load_questions_list(db, interview, response)
+        question_summary = _build_question_summaries(interview, all_questions, qa_history, overall_analysis)
         transcript = _build_transcript(qa_history, response.name, response.start_time, duration_seconds)
         
         return {
@@ -788,6 +783,7 @@ async def get_response_detail(response_id: str = Query(...)):
                 "sentiment": overall_analysis.get("sentiment", "neutral").lower()
             },
             "question_summary": question_summary,
+            "analysis_progress": analysis_progress(qa_history),
             "transcript": transcript,
             "qa_history": qa_history,
             "status": getattr(response, 'status', 'no_status'),
@@ -809,3 +805,25 @@ async def update_response_status(request: UpdateResponseStatusRequest):
         
         return {"ok": True, "status": response.status, "status_source": response.status_source}
 
+
+@router.post("/reanalyze-responses")
+async def reanalyze_responses(request: ReanalyzeResponsesRequest):
+    """Re-run the final analysis for an interview's responses in the background (e.g. after a rubric change)."""
+    async with AsyncSessionLocal() as db:
+        await get_interview_or_404(db, request.interview_id)
+    filters = {
+        "completed_only": request.completed_only is not False,
+        "statuses": request.statuses,
+        "response_ids": request.response_ids,
+        "missing_only": bool(request.missing_only),
+    }
+    job = await reanalysis_service.start(request.interview_id, filters)
+    return {"ok": True, **job}
+
+
+@router.get("/reanalysis-status")
+async def get_reanalysis_status(job_id: str = Query(...)):
+    job = await reanalysis_service.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Re-analysis job not found")
+    return {"ok": True, **job}
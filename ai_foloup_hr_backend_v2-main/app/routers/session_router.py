@@ -6,13 +6,16 @@ import asyncio
 from db import AsyncSessionLocal
 from models import Interview, Response, Candidate
 from schemas.interview_schema import StartInterviewRequest, EndInterviewRequest, TabSwitchCountRequest
-from utils.interview_utils import get_interview_or_404, get_response_or_404, commit_and_refresh, get_questions_list
+from utils.interview_utils import get_interview_or_404, get_response_or_404, commit_and_refresh, load_questions_list
 from utils.redis_utils import create_session, set_session_meta
-from services.llm_service import llm_service
+from services.analysis_service import analysis_service, final_analysis_is_current
+from services.batch_service import batch_service
+from services.insights_service import insights_service
+from services.question_pool_service import question_pool_service
 import secrets
 from middleware.auth_middleware import safe_route
 from services.storage_service import storage_service
-from routers.media_router import _merge_video_background
+from services.video_job_service import video_job_service
 from utils.logger import get_logger
 from utils.cost_utils import apply_response_cost
 from routers.candidate_router import _send_hr_notification, _ensure_candidate_from_response
@@ -68,6 +71,8 @@ async def start_interview(request: StartInterviewRequest):
             else:
                 logger.warning(f"Could not create candidate record for response {response.id} with email {email}")
         
+        # Predefined interviews with a question pool give each candidate their own set
+        await question_pool_service.assign_response_questions(db, interview, response.id)
         await db.commit()
 
         session_id = f"ws_{interview.id}_{response.id}"
@@ -107,6 +112,32 @@ async def end_interview(request: EndInterviewRequest, http_request: Request, bac
         response = await get_response_or_404(db, request.response_id)
         interview = await get_interview_or_404(db, str(response.interview_id))
         
+        # The final analysis runs before the row is locked, since the LLM call can take a while
+        qa_history = response.qa_history or []
+        analysis_deferred = False
+        final_analysis = per_answer = None
+        if len(qa_history) > 0:
+            overall_analysis = getattr(response, "overall_analysis", None)
+            analysis_needed = not final_analysis_is_current(overall_analysis, qa_history)
+            if analysis_needed and interview.context and request.ended_by_timeout and batch_service.enabled:
+                try:
+                    await analysis_service.queue_final_analysis_batch(str(response.id), str(interview.id), qa_history)
+                    analysis_deferred = True
+                except Exception as e:
+                    logger.warning(f"Failed to queue batch final analysis for response {response.id}, running it now: {e}")
+            if analysis_needed and not analysis_deferred:
+                try:
+                    if interview.context:
+                        final_analysis, per_answer = await analysis_service.final_analysis_once(
+                            str(response.id), str(interview.id), qa_history
+                        )
+                except Exception as e:
+                    logger.warning(f"Final analysis generation failed: {e}", exc_info=True)
+        
+        # Re-read under a row lock so answers and analyses written meanwhile are not overwritten
+        response = await get_response_or_404(db, request.response_id, for_update=True)
+        qa_history = response.qa_history or []
+        
         response.is_completed = True
         
         end_time = datetime.now(timezone.utc)
@@ -121,36 +152,23 @@ async def end_interview(request: EndInterviewRequest, http_request: Request, bac
             response.duration = duration_seconds
             logger.debug(f"Interview duration calculated: {duration_seconds} seconds ({duration_seconds // 60}m {duration_seconds % 60}s)")
         
-        qa_history = response.qa_history or []
-        if len(qa_history) > 0:
-            overall_analysis = getattr(response, "overall_analysis", None)
-            if not overall_analysis:
-                try:
-                    if interview.context:
-                        final_analysis,final_usage = await llm_service.generate_final_analysis(
-                            str(interview.id), qa_history
-                        )
-                        try:
-                            if final_usage:
-                                final_analysis = dict(final_analysis or {})
-                                final_analysis["_usage"] = final_usage
-                            setattr(response, "overall_analysis", final_analysis)
-                            
-                            # if final_analysis and (not hasattr(response, 'status') or not response.status or response.status == "no_status"):
-                            #     score = final_analysis.get("overall_score", 0)
-                            #     if score >= 80:
-                            #         response.status = "selected"
-                            #     elif score >= 60:
-                            #         response.status = "potential"
-                            #     elif score < 40:
-                            #         response.status = "not_selected"
-                            #     else:
-                            #         response.status = "potential"
-                            response.status_source = "manual"
-                        except Exception as e:
-                            logger.warning(f"Failed to set overall_analysis: {e}", exc_info=True)
-                except Exception as e:
-                    logger.warning(f"Final analysis generation failed: {e}", exc_info=True)
+        if final_analysis is not None and not final_analysis_is_current(getattr(response, "overall_analysis", None), qa_history):
+            try:
+                analysis_service.apply_final_analysis(response, final_analysis, per_answer)
+                
+                # if final_analysis and (not hasattr(response, 'status') or not response.status or response.status == "no_status"):
+                #     score = final_analysis.get("overall_score", 0)
+                #     if score >= 80:
+                #         response.status = "selected"
+                #     elif score >= 60:
+                #         response.status = "potential"
+                #     elif score < 40:
+                #         response.status = "not_selected"
+                #     else:
+                #         response.status = "potential"
+                response.status_source = "manual"
+            except Exception as e:
+                logger.warning(f"Failed to set overall_analysis: {e}", exc_info=True)
         
         apply_response_cost(response)
         
@@ -162,6 +180,8 @@ async def end_interview(request: EndInterviewRequest, http_request: Request, bac
                 logger.warning(f"Could not create candidate record for response {response.id} with email {response.email}")
         
         await db.commit()
+        if not analysis_deferred:
+            await insights_service.schedule_refresh(str(interview.id))
         
         # Send HR notification email when interview is completed
         try:
@@ -169,19 +189,16 @@ async def end_interview(request: EndInterviewRequest, http_request: Request, bac
         except Exception as e:
             logger.error(f"Failed to send HR notification for response {request.response_id}: {e}", exc_info=True)
         
-        logger.debug(f"Adding video merge task for response_id: {request.response_id}")
-        background_tasks.add_task(_merge_video_background, request.response_id, base_url)
-        logger.debug(f"Video merge task added to background for response_id: {request.response_id}")
+        try:
+            await video_job_service.enqueue(request.response_id, base_url)
+            logger.debug(f"Video transcode queued for response_id: {request.response_id}")
+        except Exception as e:
+            logger.error(f"Failed to queue video transcode for response_id {request.response_id}: {e}", exc_info=True)
 
         if interview.question_mode == "dynamic":
-            try:
-                interview.llm_generated_questions = None
-                await db.commit()
-            except Exception:
-                pass
             total_questions = interview.question_count or 0
         else:
-            questions_list = get_questions_list(interview)
+            questions_list = await load_questions_list(db, interview, response)
             total_questions = len(questions_list) if questions_list else 0
         
         questions_answered = len(qa_history)
@@ -195,7 +212,8 @@ async def end_interview(request: EndInterviewRequest, http_request: Request, bac
             "is_partially_complete": is_partially_complete,
             "end_time": format_datetime_ist_iso(response.end_time) if response.end_time else None,
             "duration_seconds": response.duration if response.duration else None,
-            "video_merge_started": True  # Indicate that video merge has been triggered
+            "video_merge_started": True,  # Indicate that video merge has been triggered
+            "analysis_deferred": analysis_deferred
         }
 
 @router.post("/tab-switch-count")
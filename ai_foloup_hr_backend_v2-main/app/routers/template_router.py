@@ -0,0 +1,165 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import uuid
+from sqlalchemy import select, desc
+from db import AsyncSessionLocal
+from models import InterviewTemplate, Interviewer
+from schemas.interview_schema import (
+    CreateTemplateRequest,
+    UpdateTemplateRequest,
+    CreateInterviewFromTemplateRequest,
+    DeleteTemplateRequest,
+)
+from services.template_service import template_service
+from routers.interview_router import new_interview_url, serialize_interview
+from utils.interview_utils import get_interview_or_404, commit_and_refresh, normalize_question
+from middleware.auth_middleware import safe_route
+from utils.datetime_utils import format_datetime_ist_iso
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/api/template", tags=["template"])
+
+async def get_template_or_404(db, template_id: str) -> InterviewTemplate:
+    try:
+        template_uuid = uuid.UUID(template_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid template_id format")
+    result = await db.execute(select(InterviewTemplate).where(InterviewTemplate.id == template_uuid))
+    template = result.scalar_one_or_none()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return template
+
+async def parse_interviewer_id(db, interviewer_id: Optional[str]) -> Optional[uuid.UUID]:
+    if not interviewer_id:
+        return None
+    try:
+        interviewer_id_uuid = uuid.UUID(interviewer_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid interviewer_id format")
+    result = await db.execute(select(Interviewer).where(Interviewer.id == interviewer_id_uuid))
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Interviewer not found")
+    return interviewer_id_uuid
+
+def serialize_template(template: InterviewTemplate, include_details: bool = False):
+    result = {
+        "id": str(template.id),
+        "name": template.name,
+        "description": template.description,
+        "mode": template.question_mode,
+        "question_count": template.question_count,
+        "auto_question_generate": template.auto_question_generate,
+        "interviewer_id": str(template.interviewer_id) if template.interviewer_id else None,
+        "time_duration": template.time_duration,
+        "source_interview_id": str(template.source_interview_id) if template.source_interview_id else None,
+        "pool_size": len((template.question_pool or {}).get("questions", [])),
+        "created_at": format_datetime_ist_iso(template.created_at) if template.created_at else None,
+        "updated_at": format_datetime_ist_iso(template.updated_at) if template.updated_at else None,
+    }
+    if include_details:
+        result["job_description"] = template.job_description
+        result["context"] = template.context
+        result["questions"] = template.questions or []
+        result["manual_questions"] = template.manual_questions
+    return result
+
+@router.post("/create-template")
+@safe_route
+async def create_template(payload: CreateTemplateRequest):
+    """Save an interview's JD summary, questions, question pool, voice and settings as a template."""
+    async with AsyncSessionLocal() as db:
+        interview = await get_interview_or_404(db, payload.interview_id)
+        template = template_service.from_interview(interview, payload.name)
+        db.add(template)
+        await commit_and_refresh(db, template)
+        await template_service.schedule_tts_warm(str(template.id))
+        return {"ok": True, "template": serialize_template(template, include_details=True)}
+
+@router.get("/list-templates")
+@safe_route
+async def list_templates(search: Optional[str] = Query(None)):
+    async with AsyncSessionLocal() as db:
+        query = select(InterviewTemplate)
+        if search:
+            query = query.where(InterviewTemplate.name.ilike(f"%{search}%"))
+        templates = (await db.execute(query.order_by(desc(InterviewTemplate.created_at)))).scalars().all()
+        return {"ok": True, "templates": [serialize_template(t) for t in templates]}
+
+@router.get("/get-template")
+@safe_route
+async def get_template(template_id: str = Query(...)):
+    async with AsyncSessionLocal() as db:
+        template = await get_template_or_404(db, template_id)
+        return {"ok": True, "template": serialize_template(template, include_details=True)}
+
+@router.post("/update-template")
+@safe_route
+async def update_template(payload: UpdateTemplateRequest):
+    """
+    Edit a template. Only edits that invalidate the prepared set-up call the LLM: a new JD
+    (re-summarized together with the questions) or a larger question count (missing questions only).
+    """
+    async with AsyncSessionLocal() as db:
+        template = await get_template_or_404(db, payload.template_id)
+        original_interviewer = template.interviewer_id
+
+        if payload.name is not None:
+            template.name = payload.name
+        if payload.description is not None:
+            template.description = payload.description
+        if payload.auto_question_generate is not None:
+            template.auto_question_generate = payload.auto_question_generate
+        if payload.manual_questions is not None:
+            template.manual_questions = [normalize_question(q) for q in payload.manual_questions] or None
+        if payload.interviewer_id is not None:
+            template.interviewer_id = await parse_interviewer_id(db, payload.interviewer_id)
+        if payload.duration_minutes is not None and payload.duration_minutes > 0:
+            template.time_duration = str(payload.duration_minutes)
+
+        questions_changed = await template_service.apply_edits(
+            template,
+            job_description=payload.job_description,
+            question_count=payload.question_count,
+            mode=payload.mode,
+            questions=payload.questions,
+        )
+        await commit_and_refresh(db, template)
+        if questions_changed or template.interviewer_id != original_interviewer:
+            await template_service.schedule_tts_warm(str(template.id))
+        return {"ok": True, "template": serialize_template(template, include_details=True)}
+
+@router.post("/delete-template")
+@safe_route
+async def delete_template(payload: DeleteTemplateRequest):
+    async with AsyncSessionLocal() as db:
+        template = await get_template_or_404(db, payload.template_id)
+        await db.delete(template)
+        await db.commit()
+        return {"ok": True, "message": "Template deleted successfully"}
+
+@router.post("/create-interview")
+@safe_route
+async def create_interview_from_template(payload: CreateInterviewFromTemplateRequest):
+    """New interview from a template: one insert, no JD summarization or question generation."""
+    async with AsyncSessionLocal() as db:
+        template = await get_template_or_404(db, payload.template_id)
+        interviewer_id = await parse_interviewer_id(db, payload.interviewer_id)
+        time_duration = str(payload.duration_minutes) if payload.duration_minutes and payload.duration_minutes > 0 else None
+
+        interview = template_service.new_interview(
+            template,
+            name=payload.name,
+            description=payload.description,
+            interviewer_id=interviewer_id,
+            time_duration=time_duration,
+        )
+        interview.url, interview.readable_slug = new_interview_url(interview.name)
+        db.add(interview)
+        await commit_and_refresh(db, interview)
+
+        # The template's audio is already cached in its own voice; another interviewer needs its own
+        if interviewer_id and interviewer_id != template.interviewer_id:
+            await template_service.schedule_tts_warm(str(template.id), str(interviewer_id))
+        return serialize_interview(interview)
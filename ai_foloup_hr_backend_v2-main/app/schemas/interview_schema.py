@@ -11,6 +11,8 @@ class StartInterviewRequest(BaseModel):
 class EndInterviewRequest(BaseModel):
     response_id: str
     reason: Optional[str] = "Candidate requested to end interview"
+    # Time limit reached: nobody waits on the report, so the final analysis may run offline (batch.enabled)
+    ended_by_timeout: Optional[bool] = False
 
 class SubmitAnswerRequest(BaseModel):
     response_id: str
@@ -52,6 +54,13 @@ class GenerateQuestionsRequest(BaseModel):
     question_mode: Optional[str] = None  # 'predefined' | 'dynamic'
     auto_question_generate: Optional[bool] = None
 
+class ReanalyzeResponsesRequest(BaseModel):
+    interview_id: str
+    completed_only: Optional[bool] = True
+    statuses: Optional[List[str]] = None  # only responses with one of these statuses
+    response_ids: Optional[List[str]] = None
+    missing_only: Optional[bool] = False  # only responses without an overall analysis
+
 class UpdateResponseStatusRequest(BaseModel):
     response_id: str
     status: str
@@ -69,4 +78,30 @@ class DeleteInterviewerRequest(BaseModel):
 class TabSwitchCountRequest(BaseModel):
     interview_id: str
     response_id: str
-    tab_switch_count: int
\ No newline at end of file
+    tab_switch_count: int
+class CreateTemplateRequest(BaseModel):
+    interview_id: str
+    name: Optional[str] = None  # defaults to the interview's name
+
+class UpdateTemplateRequest(BaseModel):
+    template_id: str
+    name: Optional[str] = None
+    job_description: Optional[str] = None
+    description: Optional[str] = None
+    mode: Optional[str] = None  # 'predefined' | 'dynamic'
+    question_count: Optional[int] = None
+    auto_question_generate: Optional[bool] = None
+    manual_questions: Optional[List[Dict[str, Any]]] = None
+    questions: Optional[List[Dict[str, Any]]] = None
+    interviewer_id: Optional[str] = None
+    duration_minutes: Optional[int] = None
+
+class CreateInterviewFromTemplateRequest(BaseModel):
+    template_id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    interviewer_id: Optional[str] = None
+    duration_minutes: Optional[int] = None
+
+class DeleteTemplateRequest(BaseModel):
+    template_id: str
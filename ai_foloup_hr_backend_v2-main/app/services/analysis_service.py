@@ -0,0 +1,513 @@
+# Answer analysis orchestration (background per-answer jobs, end-of-interview evaluation)
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import flag_modified
+from config_loader import load_config
+from db import AsyncSessionLocal
+from models import Interview, Response
+from services.llm_service import llm_service
+from services.batch_service import batch_service, register_result_handler
+from services.insights_service import insights_service
+from utils.cost_utils import apply_response_cost
+from utils.job_queue import enqueue, register_handler
+from utils.redis_utils import acquire_lock, get_redis, is_locked, release_lock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ANALYSIS_QUEUE = "analysis"
+
+ANALYSIS_PENDING = "pending"
+ANALYSIS_COMPLETE = "complete"
+ANALYSIS_FAILED = "failed"
+
+# "per_answer": one analysis call per submitted answer plus a final analysis call
+# "batched": no per-answer calls; every answer is scored inside a single call at interview end
+# "incremental": each answer is scored and folded into Response.running_evaluation as it arrives,
+#                so interview end only needs a small finalize call
+EVALUATION_MODE_PER_ANSWER = "per_answer"
+EVALUATION_MODE_BATCHED = "batched"
+EVALUATION_MODE_INCREMENTAL = "incremental"
+EVALUATION_MODES = (EVALUATION_MODE_PER_ANSWER, EVALUATION_MODE_BATCHED, EVALUATION_MODE_INCREMENTAL)
+
+# Single-flight final analysis: one computation per response transcript across all API workers
+FINAL_ANALYSIS_LOCK_SECONDS = 180
+FINAL_ANALYSIS_RESULT_TTL_SECONDS = 600
+FINAL_ANALYSIS_WAIT_SECONDS = 150
+FINAL_ANALYSIS_POLL_SECONDS = 0.5
+
+# Folds of one response are serialized (each builds on the previous running state)
+RUNNING_EVALUATION_LOCK_SECONDS = 120
+RUNNING_EVALUATION_WAIT_SECONDS = 90
+# At interview end, at most this many not-yet-folded answers are folded inline before falling back to a full analysis
+RUNNING_EVALUATION_MAX_INLINE_FOLDS = 2
+
+# Offline batch execution kind for final analyses nobody is waiting on (see services/batch_service.py)
+BATCH_KIND_FINAL_ANALYSIS = "final_analysis"
+
+
+def analysis_state(qa_item: dict) -> str:
+    """Analysis state of one qa_history entry. Entries saved before background analysis carry no status."""
+    if not isinstance(qa_item, dict):
+        return "none"
+    status = qa_item.get("analysis_status")
+    if status:
+        return status
+    return ANALYSIS_COMPLETE if qa_item.get("analysis") else "none"
+
+
+def final_analysis_is_current(overall_analysis, qa_history: Optional[list]) -> bool:
+    """
+    Whether a stored overall_analysis is a successful one covering every answer in qa_history.
+    Analyses stored before the answer count was recorded are taken as current.
+    """
+    if not isinstance(overall_analysis, dict) or not overall_analysis or overall_analysis.get("error"):
+        return False
+    return overall_analysis.get("_answer_count", len(qa_history or [])) >= len(qa_history or [])
+
+
+def analysis_progress(qa_history: list) -> Dict[str, int]:
+    progress = {ANALYSIS_PENDING: 0, ANALYSIS_COMPLETE: 0, ANALYSIS_FAILED: 0}
+    for qa in qa_history or []:
+        state = analysis_state(qa)
+        if state in progress:
+            progress[state] += 1
+    return progress
+
+
+async def _load_response(db, response_id: str, for_update: bool = False):
+    query = select(Response).where(Response.id == response_id)
+    if for_update:
+        query = query.with_for_update().execution_options(populate_existing=True)
+    return (await db.execute(query)).scalar_one_or_none()
+
+
+def _set_qa_fields(response, qa_index: int, fields: dict) -> bool:
+    """Patch qa_history[qa_index] on a loaded Response; None values remove the key."""
+    qa_history = list(response.qa_history or [])
+    if qa_index >= len(qa_history):
+        return False
+    qa_item = dict(qa_history[qa_index])
+    for key, value in fields.items():
+        if value is None:
+            qa_item.pop(key, None)
+        else:
+            qa_item[key] = value
+    qa_history[qa_index] = qa_item
+    response.qa_history = qa_history
+    flag_modified(response, 'qa_history')
+    return True
+
+
+class AnalysisService:
+    def __init__(self):
+        config = load_config()
+        self.evaluation_mode = config.get('llm', {}).get('evaluation_mode', EVALUATION_MODE_PER_ANSWER)
+        if self.evaluation_mode not in EVALUATION_MODES:
+            logger.warning(f"Unknown llm.evaluation_mode '{self.evaluation_mode}', falling back to '{EVALUATION_MODE_PER_ANSWER}'")
+            self.evaluation_mode = EVALUATION_MODE_PER_ANSWER
+        self._final_in_flight: Dict[Tuple[str, int], asyncio.Task] = {}
+
+    @property
+    def analyzes_each_answer(self) -> bool:
+        return self.evaluation_mode in (EVALUATION_MODE_PER_ANSWER, EVALUATION_MODE_INCREMENTAL)
+
+    async def generate_final_analysis(self, interview_id: str, qa_history: List[Dict], response_id: Optional[str] = None) -> Tuple[Dict, Optional[List[Dict]]]:
+        """
+        Run the end-of-interview evaluation for the configured mode.
+        Returns (overall_analysis, per_answer_analyses). overall_analysis carries the call
+        usage under "_usage" and the number of answers it covers under "_answer_count";
+        per_answer_analyses is None unless the mode scores answers here.
+        """
+        if self.evaluation_mode == EVALUATION_MODE_INCREMENTAL and response_id:
+            finalized = await self._finalize_running_evaluation(str(response_id), qa_history)
+            if finalized is not None:
+                finalized["_answer_count"] = len(qa_history)
+                return finalized, None
+            logger.info(f"Running evaluation incomplete for response {response_id}, using the full final analysis")
+
+        if self.evaluation_mode == EVALUATION_MODE_BATCHED:
+            final_analysis, per_answer, usage = await llm_service.evaluate_interview(interview_id, qa_history)
+        else:
+            final_analysis, usage = await llm_service.generate_final_analysis(interview_id, qa_history)
+            per_answer = None
+        final_analysis = dict(final_analysis or {})
+        if usage:
+            final_analysis["_usage"] = usage
+        if not final_analysis.get("error"):
+            final_analysis["_answer_count"] = len(qa_history)
+        return final_analysis, per_answer
+
+    def final_analysis_call_count(self, qa_history: List[Dict]) -> int:
+        """LLM calls generate_final_analysis (without a running evaluation) makes for this transcript."""
+        if self.evaluation_mode == EVALUATION_MODE_BATCHED:
+            return 1
+        return llm_service.final_analysis_call_count(qa_history)
+
+    async def final_analysis_once(self, response_id: str, interview_id: str, qa_history: List[Dict]) -> Tuple[Dict, Optional[List[Dict]]]:
+        """
+        Single-flight wrapper around generate_final_analysis for one response transcript.
+        Callers racing on the same response and answer count (submit-answer, end-interview,
+        report views) share one LLM call: within a process they await the same task, across
+        workers a Redis lock elects one caller and the others wait for its result. Once an
+        analysis covering every answer is persisted it is returned as-is (with per_answer None,
+        since those are already on qa_history); one built from fewer answers is recomputed.
+        """
+        response_id = str(response_id)
+        flight_key = (response_id, len(qa_history or []))
+        task = self._final_in_flight.get(flight_key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._final_analysis_single_flight(response_id, interview_id, qa_history))
+            self._final_in_flight[flight_key] = task
+            task.add_done_callback(
+                lambda t: self._final_in_flight.pop(flight_key, None) if self._final_in_flight.get(flight_key) is t else None
+            )
+        return await asyncio.shield(task)
+
+    async def _final_analysis_single_flight(self, response_id: str, interview_id: str, qa_history: List[Dict]) -> Tuple[Dict, Optional[List[Dict]]]:
+        persisted = await self._persisted_final_analysis(response_id, qa_history)
+        if persisted:
+            return persisted, None
+
+        # Keyed by answer count: an analysis of a shorter transcript is never handed to a later caller
+        lock_name = f"final_analysis:{response_id}:{len(qa_history or [])}"
+        result_key = f"{lock_name}:result"
+        try:
+            redis = await get_redis()
+        except Exception as e:
+            logger.warning(f"Redis unavailable, generating final analysis for response {response_id} without single-flight: {e}")
+            return await self.generate_final_analysis(interview_id, qa_history, response_id)
+
+        deadline = time.monotonic() + FINAL_ANALYSIS_WAIT_SECONDS
+        while True:
+            shared = await redis.get(result_key)
+            if shared:
+                data = json.loads(shared)
+                return data.get("final_analysis") or {}, data.get("per_answer")
+
+            token = await acquire_lock(lock_name, FINAL_ANALYSIS_LOCK_SECONDS)
+            if token:
+                try:
+                    final_analysis, per_answer = await self.generate_final_analysis(interview_id, qa_history, response_id)
+                    # Failures are not shared: the next caller (or a waiter once the lock is released) tries again
+                    if final_analysis and not final_analysis.get("error"):
+                        await redis.set(result_key, json.dumps({
+                            "final_analysis": final_analysis,
+                            "per_answer": per_answer,
+                        }), ex=FINAL_ANALYSIS_RESULT_TTL_SECONDS)
+                    return final_analysis, per_answer
+                finally:
+                    await release_lock(lock_name, token)
+
+            # Another worker is computing it; wait for its result or for the lock to go away
+            while await is_locked(lock_name) and time.monotonic() < deadline:
+                await asyncio.sleep(FINAL_ANALYSIS_POLL_SECONDS)
+            persisted = await self._persisted_final_analysis(response_id, qa_history)
+            if persisted:
+                return persisted, None
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for the in-flight final analysis of response {response_id}")
+
+    async def _persisted_final_analysis(self, response_id: str, qa_history: Optional[List[Dict]] = None) -> Optional[Dict]:
+        """The stored final analysis if it covers qa_history (default: the stored transcript)."""
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id)
+            if not response:
+                return None
+            overall_analysis = getattr(response, "overall_analysis", None)
+            if qa_history is None:
+                qa_history = response.qa_history
+        if final_analysis_is_current(overall_analysis, qa_history):
+            return overall_analysis
+        return None
+
+    def apply_final_analysis(self, response, final_analysis: Dict, per_answer: Optional[List[Dict]] = None) -> None:
+        """Store the final analysis (and batched per-answer scores) on a loaded Response."""
+        setattr(response, "overall_analysis", final_analysis)
+        if not per_answer:
+            return
+        qa_history = list(response.qa_history or [])
+        for index, analysis in enumerate(per_answer[:len(qa_history)]):
+            if not analysis or not isinstance(qa_history[index], dict):
+                continue
+            qa_item = dict(qa_history[index])
+            qa_item["analysis"] = analysis
+            # Token usage of the batched call is accounted once, in overall_analysis["_usage"]
+            qa_item["analysis_status"] = ANALYSIS_COMPLETE
+            qa_history[index] = qa_item
+        response.qa_history = qa_history
+        flag_modified(response, 'qa_history')
+
+    async def queue_final_analysis_batch(self, response_id: str, interview_id: str, qa_history: List[Dict]) -> str:
+        """
+        Queue the final analysis for offline batch execution; the batch poller writes it back to
+        Response.overall_analysis. Always a single call (no map-reduce, no running evaluation).
+        """
+        batched = self.evaluation_mode == EVALUATION_MODE_BATCHED
+        request = llm_service.final_analysis_request(qa_history, batched=batched)
+        return await batch_service.submit(BATCH_KIND_FINAL_ANALYSIS, request, {
+            "response_id": str(response_id),
+            "interview_id": str(interview_id),
+            "answer_count": len(qa_history),
+            "batched": batched,
+        })
+
+    async def store_batch_final_analysis(self, payload: dict, content: Optional[str], usage: Dict) -> None:
+        """Batch result handler. content is None once the batch gave up; then the analysis runs synchronously."""
+        response_id = payload["response_id"]
+        if await self._persisted_final_analysis(response_id):
+            logger.debug(f"Response {response_id} already analysed, dropping batch result")
+            return
+
+        if content is None:
+            async with AsyncSessionLocal() as db:
+                response = await _load_response(db, response_id)
+                qa_history = list(response.qa_history or []) if response else []
+            if not qa_history:
+                return
+            final_analysis, per_answer = await self.final_analysis_once(response_id, payload["interview_id"], qa_history)
+        elif payload.get("batched"):
+            final_analysis, per_answer = llm_service.parse_batched_evaluation(content, int(payload.get("answer_count", 0)))
+            final_analysis["_usage"] = usage
+            final_analysis["_answer_count"] = int(payload.get("answer_count", 0))
+        else:
+            final_analysis, per_answer = llm_service.parse_final_analysis(content), None
+            final_analysis["_usage"] = usage
+            final_analysis["_answer_count"] = int(payload.get("answer_count", 0))
+
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id, for_update=True)
+            if not response:
+                return
+            if final_analysis_is_current(getattr(response, "overall_analysis", None), response.qa_history):
+                return
+            self.apply_final_analysis(response, final_analysis, per_answer)
+            apply_response_cost(response)
+            await db.commit()
+        logger.info(f"Stored batch final analysis for response {response_id}")
+        await insights_service.schedule_refresh(payload["interview_id"])
+
+    async def enqueue_final_analysis(self, response_id: str, interview_id: str) -> str:
+        return await enqueue(ANALYSIS_QUEUE, "final_analysis", {
+            "response_id": str(response_id),
+            "interview_id": str(interview_id),
+        })
+
+    async def run_final_analysis(self, response_id: str, interview_id: str) -> None:
+        """
+        Final analysis of a completed response, then the insights refresh and HR notification.
+        The LLM call runs with no DB session open; the write re-reads the row under a lock.
+        Errors propagate so the job is retried; on give-up only the notification is sent.
+        """
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id)
+            interview = (await db.execute(select(Interview).where(Interview.id == interview_id))).scalar_one_or_none()
+            if not response or not interview:
+                logger.warning(f"Skipping final analysis, response {response_id} or interview {interview_id} not found")
+                return
+            qa_history = list(response.qa_history or [])
+            has_context = bool(interview.context)
+
+        if has_context and qa_history:
+            final_analysis, per_answer = await self.final_analysis_once(response_id, interview_id, qa_history)
+            async with AsyncSessionLocal() as db:
+                response = await _load_response(db, response_id, for_update=True)
+                if not response:
+                    return
+                if not final_analysis_is_current(getattr(response, "overall_analysis", None), response.qa_history):
+                    self.apply_final_analysis(response, final_analysis, per_answer)
+                apply_response_cost(response)
+                await db.commit()
+            await insights_service.schedule_refresh(interview_id)
+
+        await self.notify_response_completed(response_id, interview_id)
+
+    async def notify_response_completed(self, response_id: str, interview_id: str) -> None:
+        """Email the interview's HR user that a candidate finished; failures are logged, not raised."""
+        # Imported here: the router module pulls in the whole candidate API
+        from routers.candidate_router import _send_hr_notification
+        try:
+            async with AsyncSessionLocal() as db:
+                response = await _load_response(db, response_id)
+                interview = (await db.execute(select(Interview).where(Interview.id == interview_id))).scalar_one_or_none()
+                if response and interview:
+                    await _send_hr_notification(db, response, interview)
+        except Exception as e:
+            logger.error(f"Failed to send HR notification for response {response_id}: {e}", exc_info=True)
+
+    async def enqueue_answer_analysis(self, response_id: str, qa_index: int) -> str:
+        return await enqueue(ANALYSIS_QUEUE, "analyze_answer", {
+            "response_id": str(response_id),
+            "qa_index": qa_index,
+        })
+
+    async def run_answer_analysis(self, response_id: str, qa_index: int) -> None:
+        """
+        Analyze qa_history[qa_index] and patch the result in place.
+        The LLM call runs with no DB session open; the write re-reads the row under a lock
+        so answers appended meanwhile by submit-answer are preserved.
+        """
+        if self.evaluation_mode == EVALUATION_MODE_INCREMENTAL:
+            await self.fold_answer(response_id, qa_index)
+            return
+
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id)
+            if not response:
+                logger.warning(f"Skipping answer analysis, response {response_id} not found")
+                return
+            qa_history = response.qa_history or []
+            if qa_index >= len(qa_history):
+                logger.warning(f"Skipping answer analysis, qa_index {qa_index} out of range for response {response_id}")
+                return
+            qa_item = qa_history[qa_index]
+            if analysis_state(qa_item) == ANALYSIS_COMPLETE:
+                return
+            interview_id = str(response.interview_id)
+
+        analysis, usage = await llm_service.analyze_response(
+            interview_id,
+            qa_item.get("answer", ""),
+            {"question": qa_item.get("question", "")}
+        )
+
+        await self._patch_qa_item(response_id, qa_index, {
+            "analysis": analysis or {},
+            "analysis_usage": usage or None,
+            "analysis_status": ANALYSIS_COMPLETE,
+        })
+        logger.debug(f"Answer analysis stored for response {response_id}, question {qa_index + 1}")
+
+    async def mark_answer_analysis_failed(self, response_id: str, qa_index: int) -> None:
+        await self._patch_qa_item(response_id, qa_index, {"analysis_status": ANALYSIS_FAILED})
+
+    async def _patch_qa_item(self, response_id: str, qa_index: int, fields: dict) -> None:
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id, for_update=True)
+            if not response or not _set_qa_fields(response, qa_index, fields):
+                return
+            apply_response_cost(response)
+            await db.commit()
+
+    async def fold_answer(self, response_id: str, qa_index: int) -> None:
+        """Score qa_history[qa_index] and fold it into the response's running evaluation (idempotent)."""
+        lock_name = f"running_evaluation:{response_id}"
+        deadline = time.monotonic() + RUNNING_EVALUATION_WAIT_SECONDS
+        while True:
+            token = await acquire_lock(lock_name, RUNNING_EVALUATION_LOCK_SECONDS)
+            if token:
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting to fold answer {qa_index + 1} of response {response_id}")
+            await asyncio.sleep(0.25)
+        try:
+            await self._fold_answer_locked(response_id, qa_index)
+        finally:
+            await release_lock(lock_name, token)
+
+    async def _fold_answer_locked(self, response_id: str, qa_index: int) -> None:
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id)
+            if not response:
+                logger.warning(f"Skipping answer fold, response {response_id} not found")
+                return
+            qa_history = response.qa_history or []
+            if qa_index >= len(qa_history) or not isinstance(qa_history[qa_index], dict):
+                logger.warning(f"Skipping answer fold, qa_index {qa_index} out of range for response {response_id}")
+                return
+            state = dict(response.running_evaluation or {})
+            if qa_index in (state.get("folded") or []):
+                return
+            qa_item = qa_history[qa_index]
+
+        question = qa_item.get("question", "")
+        folded, usage = await llm_service.fold_answer(state, question, qa_item.get("answer", ""), qa_index + 1)
+
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id, for_update=True)
+            if not response:
+                return
+            _set_qa_fields(response, qa_index, {
+                "analysis": folded.get("answerEvaluation") or {},
+                "analysis_usage": usage or None,
+                "analysis_status": ANALYSIS_COMPLETE,
+            })
+            state = dict(response.running_evaluation or {})
+            summaries = dict(state.get("question_summaries") or {})
+            summaries[str(qa_index)] = {"question": question, "summary": folded.get("questionSummary", "")}
+            state.update({
+                "folded": sorted(set(state.get("folded") or []) | {qa_index}),
+                "question_summaries": summaries,
+                "notes": folded.get("runningNotes") or state.get("notes", ""),
+                "scores": folded.get("runningScores") or state.get("scores") or {},
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            })
+            response.running_evaluation = state
+            flag_modified(response, 'running_evaluation')
+            apply_response_cost(response)
+            await db.commit()
+        logger.debug(f"Folded answer {qa_index + 1} into running evaluation of response {response_id}")
+
+    async def _finalize_running_evaluation(self, response_id: str, qa_history: List[Dict]) -> Optional[Dict]:
+        """
+        Final analysis from the running evaluation. Answers not folded yet (typically the last one)
+        are folded first; returns None when the running state is missing, too far behind, or a
+        fold/finalize call fails, so the caller falls back to the full final analysis.
+        """
+        indices = [i for i, qa in enumerate(qa_history or []) if isinstance(qa, dict)]
+        async with AsyncSessionLocal() as db:
+            response = await _load_response(db, response_id)
+            state = (response.running_evaluation or {}) if response else {}
+        folded = set(state.get("folded") or [])
+        missing = [i for i in indices if i not in folded]
+        if not folded or len(missing) > RUNNING_EVALUATION_MAX_INLINE_FOLDS:
+            return None
+
+        try:
+            for qa_index in missing:
+                await self.fold_answer(response_id, qa_index)
+            if missing:
+                async with AsyncSessionLocal() as db:
+                    response = await _load_response(db, response_id)
+                    state = response.running_evaluation or {}
+
+            summaries = state.get("question_summaries") or {}
+            question_summaries = [summaries[str(i)] for i in indices if str(i) in summaries]
+            final_analysis, usage = await llm_service.finalize_running_evaluation(
+                question_summaries, state.get("notes", ""), state.get("scores") or {}
+            )
+        except Exception as e:
+            logger.error(f"Error finalizing running evaluation for response {response_id}: {str(e)}", exc_info=True)
+            return None
+        if usage:
+            final_analysis["_usage"] = usage
+        return final_analysis
+
+
+analysis_service = AnalysisService()
+
+
+async def _handle_analyze_answer(payload: dict) -> None:
+    await analysis_service.run_answer_analysis(payload["response_id"], int(payload["qa_index"]))
+
+
+async def _give_up_analyze_answer(payload: dict) -> None:
+    await analysis_service.mark_answer_analysis_failed(payload["response_id"], int(payload["qa_index"]))
+
+
+async def _handle_final_analysis(payload: dict) -> None:
+    await analysis_service.run_final_analysis(payload["response_id"], payload["interview_id"])
+
+
+async def _give_up_final_analysis(payload: dict) -> None:
+    await analysis_service.notify_response_completed(payload["response_id"], payload["interview_id"])
+
+
+register_handler("analyze_answer", _handle_analyze_answer, on_give_up=_give_up_analyze_answer)
+register_handler("final_analysis", _handle_final_analysis, on_give_up=_give_up_final_analysis)
+register_result_handler(BATCH_KIND_FINAL_ANALYSIS, analysis_service.store_batch_final_analysis)
@@ -0,0 +1,386 @@
+# Offline LLM batch execution: queue requests, submit JSONL batches, poll and hand results back
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional
+from config_loader import load_config
+from services.llm_service import llm_service
+from services.model_routing import model_router
+from utils.redis_utils import get_redis, acquire_lock, extend_lock, release_lock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_batch_config = load_config().get("batch", {}) or {}
+BATCH_ENABLED = bool(_batch_config.get("enabled", False))
+MAX_BATCH_SIZE = int(_batch_config.get("max_batch_size", 200))
+MAX_WAIT_SECONDS = float(_batch_config.get("max_wait_seconds", 900))
+POLL_INTERVAL_SECONDS = float(_batch_config.get("poll_interval_seconds", 60))
+MAX_ATTEMPTS = int(_batch_config.get("max_attempts", 2))
+BATCHES_KEPT = 200
+
+_QUEUE_KEY = "llm_batch:queue"
+_OPEN_KEY = "llm_batch:open"
+_HISTORY_KEY = "llm_batch:history"
+_POLL_LOCK = "llm_batch:poll"
+# Claim on a local batch while one process executes it; refreshed until the output file is written
+_LOCAL_RUN_LOCK_SECONDS = 120
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# (payload, content, usage) for a successful line; content is None when the item is given up on
+ResultHandler = Callable[[dict, Optional[str], Dict], Awaitable[None]]
+_result_handlers: Dict[str, ResultHandler] = {}
+
+
+def register_result_handler(kind: str, handler: ResultHandler) -> None:
+    _result_handlers[kind] = handler
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+def _configured_deployment() -> str:
+    deployment = _batch_config.get("deployment")
+    # Unset ${ENV} placeholders survive os.path.expandvars verbatim
+    if not deployment or str(deployment).startswith("${"):
+        return model_router.route_for("final_analysis").deployment
+    return str(deployment)
+
+
+class BatchBackend(ABC):
+    """Submits a JSONL batch in the OpenAI Batch API format and reports on it."""
+
+    name = "base"
+    # Results are billed at the Batch API discount (see utils/cost_utils.BATCH_COST_MULTIPLIER)
+    discounted = False
+
+    @abstractmethod
+    async def submit(self, jsonl: bytes) -> str:
+        ...
+
+    @abstractmethod
+    async def status(self, batch_id: str) -> str:
+        """One of the Batch API statuses (validating, in_progress, finalizing, completed, failed, ...)."""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> bytes:
+        """Output JSONL: one {"custom_id", "response": {"status_code", "body"}, "error"} object per line."""
+
+
+class AzureBatchBackend(BatchBackend):
+    """Azure OpenAI Batch API (needs a Global-Batch deployment, see batch.deployment)."""
+
+    name = "azure"
+    discounted = True
+
+    def __init__(self, client):
+        self.client = client
+
+    async def submit(self, jsonl: bytes) -> str:
+        uploaded = await self.client.files.create(file=(f"batch_{uuid.uuid4().hex}.jsonl", jsonl), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self.client.batches.retrieve(batch_id)
+        return batch.status
+
+    async def results(self, batch_id: str) -> bytes:
+        batch = await self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return b""
+        content = await self.client.files.content(batch.output_file_id)
+        return content.content
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    File-based stand-in for testing and local development. Batches are written to `directory` and
+    executed line by line through the regular chat completions client (full synchronous price) in a
+    background task started by the first status poll. One process runs a batch at a time: it holds
+    a per-batch Redis claim, refreshed until the output file is written.
+    """
+
+    name = "local"
+
+    def __init__(self, client, directory: str):
+        self.client = client
+        self.directory = directory
+        self._running = set()
+
+    def _path(self, batch_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{suffix}.jsonl")
+
+    async def submit(self, jsonl: bytes) -> str:
+        batch_id = f"local_{uuid.uuid4().hex}"
+        os.makedirs(self.directory, exist_ok=True)
+        await asyncio.to_thread(self._write, self._path(batch_id, "input"), jsonl)
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        if os.path.exists(self._path(batch_id, "output")):
+            return "completed"
+        if not os.path.exists(self._path(batch_id, "input")):
+            return "failed"
+        lock_name = f"llm_batch:run:{batch_id}"
+        token = await acquire_lock(lock_name, _LOCAL_RUN_LOCK_SECONDS)
+        if token:
+            task = asyncio.create_task(self._execute_claimed(batch_id, lock_name, token))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return "in_progress"
+
+    async def _execute_claimed(self, batch_id: str, lock_name: str, token: str) -> None:
+        async def keep_claim():
+            while True:
+                await asyncio.sleep(_LOCAL_RUN_LOCK_SECONDS / 3)
+                if not await extend_lock(lock_name, token, _LOCAL_RUN_LOCK_SECONDS):
+                    logger.warning(f"Lost the run claim on local batch {batch_id}")
+                    return
+
+        keeper = asyncio.create_task(keep_claim())
+        try:
+            # Another process may have finished it between our status check and taking the claim
+            if not os.path.exists(self._path(batch_id, "output")):
+                await self._execute(batch_id)
+        except Exception as e:
+            logger.error(f"Local batch {batch_id} failed: {type(e).__name__}: {e}")
+        finally:
+            keeper.cancel()
+            await release_lock(lock_name, token)
+
+    async def results(self, batch_id: str) -> bytes:
+        return await asyncio.to_thread(self._read, self._path(batch_id, "output"))
+
+    async def _execute(self, batch_id: str) -> None:
+        lines = (await asyncio.to_thread(self._read, self._path(batch_id, "input"))).splitlines()
+        output = []
+        for line in lines:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            try:
+                completion = await self.client.chat.completions.create(**item["body"])
+                result = {"status_code": 200, "body": completion.model_dump()}
+                output.append({"custom_id": item["custom_id"], "response": result, "error": None})
+            except Exception as e:
+                output.append({"custom_id": item["custom_id"], "response": None,
+                               "error": {"code": type(e).__name__, "message": str(e)}})
+        payload = "".join(json.dumps(entry) + "\n" for entry in output).encode("utf-8")
+        await asyncio.to_thread(self._write, self._path(batch_id, "output"), payload)
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # Readers treat the output file's existence as completion, so it appears only once complete
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _create_backend() -> BatchBackend:
+    backend = str(_batch_config.get("backend", "local")).lower()
+    if backend == "azure":
+        return AzureBatchBackend(llm_service.client)
+    if backend != "local":
+        logger.warning(f"Unknown batch.backend '{backend}', using the local backend")
+    return LocalBatchBackend(llm_service.client, _batch_config.get("local_dir", "batches"))
+
+
+class BatchService:
+    """
+    Offline execution for LLM calls nobody is waiting on (timeout-ended interviews, bulk re-scoring):
+    lower price than synchronous completions and no contention with live-interview traffic.
+
+    submit() queues a request in Redis. The poller (one process at a time, elected with a Redis lock)
+    flushes the queue into a JSONL batch once it holds MAX_BATCH_SIZE requests or its oldest request
+    is MAX_WAIT_SECONDS old, polls open batches and passes every result line to the handler
+    registered for its kind. Failed lines are re-queued up to MAX_ATTEMPTS times, then the handler is
+    called with content=None.
+    """
+
+    def __init__(self):
+        self.enabled = BATCH_ENABLED
+        self.backend = _create_backend()
+        self.deployment = _configured_deployment()
+
+    async def submit(self, kind: str, request: Dict, payload: dict) -> str:
+        custom_id = f"{kind}:{uuid.uuid4().hex}"
+        item = {
+            "custom_id": custom_id,
+            "kind": kind,
+            "payload": payload or {},
+            "request": request,
+            "attempts": 0,
+            "queued_at": time.time(),
+        }
+        redis = await get_redis()
+        await redis.rpush(_QUEUE_KEY, json.dumps(item))
+        logger.debug(f"Queued batch request {custom_id}")
+        return custom_id
+
+    async def flush(self, force: bool = False) -> Optional[str]:
+        """Submit queued requests as one batch when due. Returns the batch id, or None."""
+        redis = await get_redis()
+        raw_items = await redis.lrange(_QUEUE_KEY, 0, MAX_BATCH_SIZE - 1)
+        if not raw_items:
+            return None
+        items = [json.loads(_decode(raw)) for raw in raw_items]
+        oldest = min(item.get("queued_at", 0) for item in items)
+        if not force and len(items) < MAX_BATCH_SIZE and time.time() - oldest < MAX_WAIT_SECONDS:
+            return None
+
+        lines = []
+        for item in items:
+            body = dict(item["request"])
+            body["model"] = self.deployment
+            lines.append(json.dumps({
+                "custom_id": item["custom_id"],
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": body,
+            }))
+        batch_id = await self.backend.submit(("\n".join(lines) + "\n").encode("utf-8"))
+        record = {
+            "batch_id": batch_id,
+            "backend": self.backend.name,
+            "status": "submitted",
+            "submitted_at": time.time(),
+            "count": len(items),
+            "items": {item["custom_id"]: {k: item[k] for k in ("kind", "payload", "request", "attempts", "queued_at")}
+                      for item in items},
+        }
+        pipe = redis.pipeline()
+        pipe.hset(_OPEN_KEY, batch_id, json.dumps(record))
+        pipe.ltrim(_QUEUE_KEY, len(raw_items), -1)
+        await pipe.execute()
+        logger.info(f"Submitted LLM batch {batch_id} with {len(items)} request(s) via {self.backend.name} backend")
+        return batch_id
+
+    async def poll(self) -> None:
+        redis = await get_redis()
+        for raw_id, raw_record in (await redis.hgetall(_OPEN_KEY)).items():
+            batch_id = _decode(raw_id)
+            record = json.loads(_decode(raw_record))
+            try:
+                status = await self.backend.status(batch_id)
+            except Exception as e:
+                logger.warning(f"Failed to poll LLM batch {batch_id}: {e}")
+                continue
+            if status not in TERMINAL_STATUSES:
+                if status != record.get("status"):
+                    record["status"] = status
+                    await redis.hset(_OPEN_KEY, batch_id, json.dumps(record))
+                continue
+            await self._complete_batch(batch_id, status, record)
+
+    async def _complete_batch(self, batch_id: str, status: str, record: Dict) -> None:
+        items = record.get("items", {})
+        results = {}
+        if status in ("completed", "expired"):
+            # Expired batches may still carry output for the lines that finished
+            for line in (await self.backend.results(batch_id)).splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry.get("custom_id")] = entry
+
+        succeeded = 0
+        for custom_id, item in items.items():
+            response = (results.get(custom_id) or {}).get("response") or {}
+            body = response.get("body") if response.get("status_code") == 200 else None
+            if body:
+                usage = dict(body.get("usage") or {})
+                details = usage.pop("prompt_tokens_details", None) or {}
+                usage = {k: usage.get(k, 0) for k in ("prompt_tokens", "completion_tokens", "total_tokens")}
+                if details.get("cached_tokens"):
+                    usage["cached_tokens"] = details["cached_tokens"]
+                if self.backend.discounted:
+                    usage["batch"] = True
+                content = body["choices"][0]["message"]["content"]
+                await self._dispatch(custom_id, item, content, usage)
+                succeeded += 1
+            else:
+                await self._retry_or_give_up(custom_id, item)
+
+        redis = await get_redis()
+        summary = {k: record.get(k) for k in ("batch_id", "backend", "submitted_at", "count")}
+        summary.update({"status": status, "succeeded": succeeded, "completed_at": time.time()})
+        pipe = redis.pipeline()
+        pipe.hdel(_OPEN_KEY, batch_id)
+        pipe.lpush(_HISTORY_KEY, json.dumps(summary))
+        pipe.ltrim(_HISTORY_KEY, 0, BATCHES_KEPT - 1)
+        await pipe.execute()
+        logger.info(f"LLM batch {batch_id} {status}: {succeeded}/{len(items)} request(s) succeeded")
+
+    async def _dispatch(self, custom_id: str, item: Dict, content: Optional[str], usage: Dict) -> None:
+        handler = _result_handlers.get(item.get("kind"))
+        if handler is None:
+            logger.error(f"No batch result handler registered for '{item.get('kind')}' ({custom_id})")
+            return
+        try:
+            await handler(item.get("payload") or {}, content, usage)
+        except Exception as e:
+            logger.error(f"Batch result handler failed for {custom_id}: {e}", exc_info=True)
+
+    async def _retry_or_give_up(self, custom_id: str, item: Dict) -> None:
+        attempts = int(item.get("attempts", 0)) + 1
+        if attempts < MAX_ATTEMPTS:
+            redis = await get_redis()
+            await redis.rpush(_QUEUE_KEY, json.dumps({**item, "custom_id": custom_id, "attempts": attempts}))
+            logger.warning(f"Batch request {custom_id} failed (attempt {attempts}/{MAX_ATTEMPTS}), re-queued")
+        else:
+            logger.error(f"Batch request {custom_id} failed after {attempts} attempt(s)")
+            await self._dispatch(custom_id, item, None, {})
+
+    async def run_once(self) -> None:
+        token = await acquire_lock(_POLL_LOCK, int(POLL_INTERVAL_SECONDS * 2) + 30)
+        if not token:
+            return
+        try:
+            await self.poll()
+            await self.flush()
+        finally:
+            await release_lock(_POLL_LOCK, token)
+
+    async def run_poller(self) -> None:
+        logger.info(f"LLM batch poller started ({self.backend.name} backend, every {POLL_INTERVAL_SECONDS:.0f}s)")
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"LLM batch poller error: {type(e).__name__}: {e}")
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def get_stats(self) -> Dict:
+        redis = await get_redis()
+        open_batches = []
+        for raw in (await redis.hgetall(_OPEN_KEY)).values():
+            record = json.loads(_decode(raw))
+            open_batches.append({k: record.get(k) for k in ("batch_id", "backend", "status", "submitted_at", "count")})
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "queued": await redis.llen(_QUEUE_KEY),
+            "open": open_batches,
+            "recent": [json.loads(_decode(raw)) for raw in await redis.lrange(_HISTORY_KEY, 0, 19)],
+        }
+
+
+batch_service = BatchService()
@@ -0,0 +1,162 @@
+# Interview-level insights rollup (incremental call-summary digest, periodic LLM refresh)
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import select, and_, or_, update
+from config_loader import load_config
+from db import AsyncSessionLocal
+from models import Interview, Response
+from services.llm_service import llm_service
+from utils.job_queue import enqueue, register_handler
+from utils.redis_utils import acquire_lock, get_redis, release_lock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INSIGHTS_QUEUE = "analysis"
+
+_insights_config = load_config().get("insights", {}) or {}
+# Insights are regenerated once this many newly analysed responses have been digested
+REFRESH_EVERY = int(_insights_config.get("refresh_every", 5))
+# The digest keeps the most recent call summaries; older ones have already shaped the current insights
+DIGEST_SIZE = int(_insights_config.get("digest_size", 40))
+SUMMARY_MAX_WORDS = 40
+DIGEST_PAGE_SIZE = 200
+ENQUEUE_DEDUP_SECONDS = 60
+REFRESH_LOCK_SECONDS = 120
+# A completed response still without an analysis after this long is skipped instead of holding the cursor
+UNANALYSED_GRACE = timedelta(hours=24)
+
+
+def _call_summary(overall_analysis: Dict) -> str:
+    summary = overall_analysis.get("overall_feedback") or overall_analysis.get("soft_skill_summary") or ""
+    score = overall_analysis.get("overall_score")
+    words = " ".join(str(summary).split()[:SUMMARY_MAX_WORDS])
+    if not words:
+        return ""
+    return f"(score {score}) {words}" if score is not None else words
+
+
+def _has_analysis(overall_analysis) -> bool:
+    return isinstance(overall_analysis, dict) and bool(overall_analysis) and not overall_analysis.get("error")
+
+
+class InsightsService:
+    """
+    Maintains Interview.insights:
+
+        {"insights": [...], "generated_at", "digest": [call summaries], "cursor": {"end_time", "id"},
+         "digested_count", "pending_count"}
+
+    refresh() digests completed, analysed responses past the cursor (no LLM call), and only calls
+    generate_insights once REFRESH_EVERY new responses have accumulated, or when there are no insights
+    yet. Dashboards read the stored result, so their latency does not depend on the response count.
+    """
+
+    async def schedule_refresh(self, interview_id: str, rebuild: bool = False) -> None:
+        """
+        Queue a rollup for the interview; bursts of completions collapse into one job.
+        rebuild=True re-digests every response and regenerates (e.g. after bulk re-analysis).
+        """
+        try:
+            redis = await get_redis()
+            if not rebuild and not await redis.set(f"insights:scheduled:{interview_id}", b"1", nx=True, ex=ENQUEUE_DEDUP_SECONDS):
+                return
+            # Delayed by the dedup window so the job sees every completion that was collapsed into it
+            await enqueue(INSIGHTS_QUEUE, "refresh_insights", {"interview_id": str(interview_id), "rebuild": rebuild},
+                          delay_seconds=0 if rebuild else ENQUEUE_DEDUP_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to schedule insights refresh for interview {interview_id}: {e}")
+
+    async def refresh(self, interview_id: str, rebuild: bool = False) -> Optional[Dict]:
+        # A Redis lock rather than a row lock: the interview row is written during live interviews
+        token = await acquire_lock(f"insights:{interview_id}", REFRESH_LOCK_SECONDS)
+        if not token:
+            await enqueue(INSIGHTS_QUEUE, "refresh_insights", {"interview_id": str(interview_id), "rebuild": rebuild},
+                          delay_seconds=ENQUEUE_DEDUP_SECONDS)
+            return None
+        try:
+            return await self._refresh_locked(interview_id, rebuild)
+        finally:
+            await release_lock(f"insights:{interview_id}", token)
+
+    async def _refresh_locked(self, interview_id: str, rebuild: bool) -> Optional[Dict]:
+        async with AsyncSessionLocal() as db:
+            interview = (await db.execute(select(Interview).where(Interview.id == interview_id))).scalar_one_or_none()
+            if not interview:
+                return None
+            state = dict(interview.insights or {})
+            if rebuild:
+                state.update({"digest": [], "cursor": {}, "digested_count": 0, "pending_count": 0})
+            digest: List[str] = list(state.get("digest") or [])
+            cursor = state.get("cursor") or {}
+            new_count = 0
+
+            caught_up = False
+            while not caught_up:
+                query = (
+                    select(Response.id, Response.end_time, Response.overall_analysis)
+                    .where(Response.interview_id == interview.id)
+                    .where(Response.is_completed == True)
+                    .where(Response.end_time.isnot(None))
+                )
+                if cursor.get("end_time"):
+                    after = datetime.fromisoformat(cursor["end_time"])
+                    query = query.where(or_(
+                        Response.end_time > after,
+                        and_(Response.end_time == after, Response.id > uuid.UUID(cursor["id"])),
+                    ))
+                rows = (await db.execute(
+                    query.order_by(Response.end_time, Response.id).limit(DIGEST_PAGE_SIZE)
+                )).all()
+                caught_up = len(rows) < DIGEST_PAGE_SIZE
+                now = datetime.now(timezone.utc)
+                for row in rows:
+                    if not _has_analysis(row.overall_analysis) and now - row.end_time < UNANALYSED_GRACE:
+                        # Still being analysed (e.g. queued for offline batch); resume from here next time
+                        caught_up = True
+                        break
+                    summary = _call_summary(row.overall_analysis) if _has_analysis(row.overall_analysis) else ""
+                    if summary:
+                        digest.append(summary)
+                        new_count += 1
+                    cursor = {"end_time": row.end_time.isoformat(), "id": str(row.id)}
+
+            digest = digest[-DIGEST_SIZE:]
+            pending = int(state.get("pending_count", 0)) + new_count
+            state.update({
+                "digest": digest,
+                "cursor": cursor,
+                "digested_count": int(state.get("digested_count", 0)) + new_count,
+                "pending_count": pending,
+            })
+            interview_name = interview.name or ""
+            job_description = interview.job_description or ""
+            interview_description = interview.description or ""
+
+        if digest and (rebuild or pending >= REFRESH_EVERY or not state.get("insights")):
+            insights = await llm_service.generate_insights(digest, interview_name, job_description, interview_description)
+            if insights:
+                state.update({
+                    "insights": insights,
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "generated_from": len(digest),
+                    "pending_count": 0,
+                })
+                logger.info(f"Refreshed insights for interview {interview_id} from {len(digest)} call summaries")
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Interview).where(Interview.id == interview_id).values(insights=state))
+            await db.commit()
+        return state
+
+
+insights_service = InsightsService()
+
+
+async def _handle_refresh_insights(payload: dict) -> None:
+    await insights_service.refresh(payload["interview_id"], rebuild=bool(payload.get("rebuild")))
+
+
+register_handler("refresh_insights", _handle_refresh_insights)
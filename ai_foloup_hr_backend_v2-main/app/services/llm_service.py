@@ -1,8 +1,10 @@
 # LLM (OpenAI, Anthropic, etc.)
 
+import asyncio
 import json
 import re
-from typing import Dict, List, Optional, Union, Tuple
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union, Tuple
 from config_loader import load_config
 import openai
 from openai import AsyncOpenAI
@@ -13,6 +15,10 @@ from db import AsyncSessionLocal
 from models import Interview
 from sqlalchemy import select
 from utils.logger import get_logger
+from utils.stream_utils import JsonArrayObjectReader, JsonStringFieldReader
+from utils.transcript_utils import estimate_tokens, serialize_transcript
+from services.prompt_templates import get_template
+from services.model_routing import LLMDeadlineExceeded, RouteDecision, model_router
 
 logger = get_logger(__name__)
 
@@ -27,6 +33,11 @@ class LLMService:
         self.azure_deployment = self.config.get('llm', {}).get('deployment', self.model)
         self.max_tokens = self.config.get('llm', {}).get('max_tokens', 1000)
         self.temperature = self.config.get('llm', {}).get('temperature', 0.7)
+        final_analysis_config = self.config.get('llm', {}).get('final_analysis', {}) or {}
+        # Transcripts estimated above this size are analysed map-reduce style instead of in one prompt
+        self.map_reduce_threshold_tokens = int(final_analysis_config.get('map_reduce_threshold_tokens', 6000))
+        self.map_chunk_tokens = int(final_analysis_config.get('map_chunk_tokens', 2500))
+        self.map_concurrency = int(final_analysis_config.get('map_concurrency', 4))
         
         if self.provider.lower() in ('openai', 'openai_platform'):
             self.client = AsyncOpenAI(api_key=self.api_key)
@@ -77,6 +88,126 @@ class LLMService:
                 pass
         raise ValueError("LLM response did not contain valid JSON")
 
+    def _usage_dict(self, usage) -> Dict:
+        if not usage:
+            return {}
+        usage_dict = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        }
+        # Prompt tokens served from the provider's prefix cache (a subset of prompt_tokens)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) if details else 0
+        if cached_tokens:
+            usage_dict["cached_tokens"] = cached_tokens
+        return usage_dict
+
+    async def _complete(self, call_type: str, max_tokens: Optional[int] = None, interactive: bool = True,
+                        **values) -> Tuple[str, Dict]:
+        """
+        Run one call of a registered prompt template on its route. Returns (content, usage_dict).
+        Background callers pass interactive=False to skip the route's hedging and deadline.
+        """
+        decision = model_router.choose(call_type)
+        request = self.build_request(call_type, max_tokens, **values)
+        if interactive:
+            response, _ = await self._hedged_create(call_type, decision, request)
+        else:
+            response, _ = await self._routed_create(call_type, decision, request)
+        return response.choices[0].message.content, self._usage_dict(getattr(response, "usage", None))
+
+    def build_request(self, call_type: str, max_tokens: Optional[int] = None, **values) -> Dict:
+        """Chat completion body (without model) for a registered prompt template on its route."""
+        template = get_template(call_type)
+        request = {
+            "messages": template.render(**values),
+            "max_tokens": max_tokens or model_router.route_for(call_type).max_tokens or template.max_tokens,
+            "temperature": template.temperature,
+        }
+        if template.json_response:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    async def _routed_create(self, call_type: str, decision: RouteDecision, request: Dict) -> Tuple[object, RouteDecision]:
+        """
+        chat.completions.create on the routed deployment; transient failures retry once on the fallback.
+        Returns (response, decision actually used).
+        """
+        start = time.perf_counter()
+        try:
+            response = await self.client.chat.completions.create(
+                model=decision.deployment, timeout=decision.timeout_seconds, **request
+            )
+        except (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError) as e:
+            model_router.record(call_type, decision, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+            fallback = model_router.fallback_for(decision)
+            if fallback is None:
+                raise
+            logger.warning(f"LLM call '{call_type}' failed on {decision.deployment} ({type(e).__name__}), retrying on {fallback.deployment}")
+            return await self._routed_create(call_type, fallback, request)
+        except Exception as e:
+            model_router.record(call_type, decision, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+            raise
+        if not request.get("stream"):
+            model_router.record(
+                call_type, decision, (time.perf_counter() - start) * 1000,
+                usage=self._usage_dict(getattr(response, "usage", None))
+            )
+        return response, decision
+
+    async def _hedged_create(self, call_type: str, decision: RouteDecision, request: Dict) -> Tuple[object, RouteDecision]:
+        """
+        _routed_create bounded by the route's deadline_seconds (raises LLMDeadlineExceeded) and, when the
+        route sets hedge_percentile, raced against an identical duplicate sent after the hedge delay.
+        """
+        delay = model_router.hedge_delay_seconds(decision)
+        if delay is None:
+            call = self._routed_create(call_type, decision, request)
+        else:
+            call = self._race_with_hedge(call_type, decision, request, delay)
+        deadline = decision.route.deadline_seconds
+        if not deadline:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout=deadline)
+        except asyncio.TimeoutError:
+            model_router.record_deadline_exceeded(call_type)
+            raise LLMDeadlineExceeded(call_type, deadline)
+
+    async def _race_with_hedge(self, call_type: str, decision: RouteDecision, request: Dict,
+                               delay: float) -> Tuple[object, RouteDecision]:
+        primary = asyncio.create_task(self._routed_create(call_type, decision, request))
+        pending = {primary}
+        hedge = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if primary in done:
+                model_router.record_hedge(call_type, hedged=False)
+                return primary.result()
+
+            logger.info(f"LLM call '{call_type}' still pending after {delay * 1000:.0f}ms, sending hedge request")
+            hedge = asyncio.create_task(self._routed_create(call_type, decision, request))
+            pending.add(hedge)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        response, used = task.result()
+                        model_router.record_hedge(
+                            call_type, hedged=True, hedge_won=task is hedge,
+                            usage=self._usage_dict(getattr(response, "usage", None))
+                        )
+                        return response, used
+                    error = task.exception()
+            model_router.record_hedge(call_type, hedged=True)
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
     async def generate_questions(self, interview_id: str, context: Dict, question_mode: str = "predefined") -> List[Dict]:
         try:
             context_summary = context.get('context_summary', 'No context available')
@@ -91,7 +222,8 @@ class LLMService:
             logger.error(f"Error generating questions: {str(e)}", exc_info=True)
             return []
     
-    async def _generate_predefined_questions(self, context_summary: str, question_count: int, job_description: str = "", interview_name: str = "") -> Dict:
+    async def _generate_predefined_questions(self, context_summary: str, question_count: int, job_description: str = "", interview_name: str = "",
+                                             existing_questions: Optional[List[str]] = None) -> Dict:
         """
         Generate interview questions and description in one call, following Followup AI style.
         Returns a dict with 'questions' (list) and 'description' (str).
@@ -108,71 +240,153 @@ class LLMService:
         # medium_count = max(0, int(question_count * dist["medium"]))
         # hard_count = question_count - easy_count - medium_count
         
-        system_prompt = "You are an expert in coming up with follow up questions to uncover deeper insights."
-        
-        user_prompt = f"""Imagine you are an interviewer specialized in designing interview questions to help hiring managers find candidates with strong technical expertise and project experience, making it easier to identify the ideal fit for the role.
-
-        Interview Title: {interview_name or 'Technical Interview'}
-        Job Description: {job_description or 'Technical skills assessment'}
-
-        Number of questions to be generated: {question_count}
-
-        Follow these detailed guidelines when crafting the questions:
-        - Focus on evaluating the candidate's technical knowledge and their experience working on relevant projects. Questions should aim to gauge depth of expertise, problem-solving ability, and hands-on project experience. These aspects carry the most weight.
-        - Include questions designed to assess problem-solving skills through practical examples. For instance, how the candidate has tackled challenges in previous projects, and their approach to complex technical issues.
-        - Soft skills such as communication, teamwork, and adaptability should be addressed, but given less emphasis compared to technical and problem-solving abilities.
-        - Maintain a professional yet approachable tone, ensuring candidates feel comfortable while demonstrating their knowledge.
-        - Ask concise and precise open-ended questions that encourage detailed responses. Each question should be 30 words or less for clarity.
-
-        Generate exactly {question_count} interview questions.
-
-        Use the following context to generate the questions:
-        {context_summary}
-
-        Moreover generate a 50 word or less second-person description about the interview to be shown to the user. It should be in the field 'description'. 
-        
-        CRITICAL REQUIREMENTS FOR DESCRIPTION:
-        - Do NOT repeat or paraphrase the objective verbatim
-        - Description should be DISTINCT and DIFFERENT from the objective
-        - Description should be more conversational and user-friendly (e.g., "In this interview, you'll discuss..." or "This interview focuses on exploring...")
-        - If objective is formal/technical, description should be more accessible and clear
-        - Description should explain what the candidate will experience, not what the interviewer wants to assess
-        - Make it clear to the respondent who's taking the interview what to expect
-        - If the objective already explains what will be discussed, the description should add context about format, approach, or what the candidate should prepare
-
-        The field 'questions' should take the format of an array of objects with the following key: question.
-
-        Strictly output only a JSON object with the keys 'questions' and 'description'."""
-        
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=1000,
-            temperature=0.4
+        response_text, usage_dict = await self._complete(
+            "predefined_questions",
+            interview_name=interview_name or 'Technical Interview',
+            job_description=job_description or 'Technical skills assessment',
+            question_count=question_count,
+            context_summary=context_summary,
+            existing_questions=self._existing_questions_block(existing_questions),
         )
-        usage = getattr(response, "usage", None)
-        usage_dict = {}
-        if usage:
-            usage_dict = {
-                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
-                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
-                "total_tokens": getattr(usage, "total_tokens", 0) or 0,
-            }
-
-        response_text = response.choices[0].message.content
         parsed = self._parse_json(response_text)
-        
+
         if isinstance(parsed, dict):
             questions = parsed.get('questions', [])
             description = parsed.get('description', '')
         else:
             questions = []
             description = ''
-        
+
+        return {
+            'questions': self._normalize_generated_questions(questions, question_count),
+            'description': description.strip() if description else '',
+            '_usage': usage_dict
+        }
+
+    async def stream_predefined_questions(self, context_summary: str, question_count: int, job_description: str = "",
+                                          interview_name: str = "", existing_questions: Optional[List[str]] = None) -> AsyncIterator[Dict]:
+        """
+        Streaming _generate_predefined_questions. Yields {"question": dict} as soon as each question's
+        JSON object closes, then a final {"result": dict} shaped like the non-streaming return value.
+        """
+        call_type = "predefined_questions"
+        decision = model_router.choose(call_type)
+        request = {
+            **self.build_request(
+                call_type,
+                interview_name=interview_name or 'Technical Interview',
+                job_description=job_description or 'Technical skills assessment',
+                question_count=question_count,
+                context_summary=context_summary,
+                existing_questions=self._existing_questions_block(existing_questions),
+            ),
+            "stream": True,
+        }
+        start = time.perf_counter()
+        stream, decision = await self._open_stream(call_type, decision, request)
+
+        reader = JsonArrayObjectReader("questions")
+        raw_parts = []
+        usage_dict = {}
+        streamed = []
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage:
+                usage_dict = self._usage_dict(usage)
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            raw_parts.append(content)
+            for question in self._normalize_generated_questions(reader.feed(content), question_count - len(streamed)):
+                streamed.append(question)
+                yield {"question": question}
+
+        model_router.record(call_type, decision, (time.perf_counter() - start) * 1000, usage=usage_dict)
+
+        description = ''
+        try:
+            parsed = self._parse_json("".join(raw_parts))
+        except ValueError:
+            if not streamed:
+                raise
+            parsed = {}
+        if isinstance(parsed, dict):
+            description = parsed.get('description') or ''
+            # Anything the incremental reader could not pick up (e.g. bare strings) is sent now
+            remaining = self._normalize_generated_questions(parsed.get('questions', []), question_count)[len(streamed):]
+            for question in remaining:
+                streamed.append(question)
+                yield {"question": question}
+
+        yield {"result": {
+            'questions': streamed,
+            'description': description.strip() if isinstance(description, str) else '',
+            '_usage': usage_dict
+        }}
+
+    async def generate_pool_questions(self, context_summary: str, category_counts: Dict[str, int], existing: List[str],
+                                      job_description: str = "", interview_name: str = "") -> Tuple[List[Dict], Dict]:
+        """
+        Background question-pool generation. Returns ([{"id", "question", "category"}], usage_dict);
+        questions without a category are labelled "technical".
+        """
+        response_text, usage_dict = await self._complete(
+            "question_pool",
+            interactive=False,
+            interview_name=interview_name or 'Technical Interview',
+            job_description=job_description or 'Technical skills assessment',
+            category_counts=", ".join(f"{category}: {count}" for category, count in category_counts.items() if count > 0),
+            context_summary=context_summary,
+            existing_questions=self._existing_questions_block(existing),
+        )
+        parsed = self._parse_json(response_text)
+        questions = parsed.get('questions', []) if isinstance(parsed, dict) else []
+        if not isinstance(questions, list):
+            questions = []
+        pool_questions = []
+        for q in questions:
+            text = (q.get('question') if isinstance(q, dict) else str(q or '')) or ''
+            if not text.strip():
+                continue
+            category = q.get('category') if isinstance(q, dict) else None
+            pool_questions.append({
+                'id': str(uuid.uuid4()),
+                'question': text.strip(),
+                'category': category if category in category_counts else 'technical',
+            })
+        return pool_questions, usage_dict
+
+    async def summarize_jd_and_generate_questions(self, job_description: str, question_count: int, interview_name: str = "") -> Dict:
+        """
+        Fused interview setup: the JD summary, the predefined questions and the description from one call.
+        Returns a dict with 'summary' (dict), 'questions' (list), 'description' (str) and '_usage'.
+        Raises ValueError when the reply lacks a summary or questions so callers can fall back.
+        """
+        response_text, usage_dict = await self._complete(
+            "jd_summary_and_questions",
+            interview_name=interview_name or 'Technical Interview',
+            job_description=job_description or 'Technical skills assessment',
+            question_count=question_count,
+        )
+        parsed = self._parse_json(response_text)
+        summary = parsed.get('summary') if isinstance(parsed, dict) else None
+        questions = self._normalize_generated_questions(parsed.get('questions', []) if isinstance(parsed, dict) else [], question_count)
+        if not isinstance(summary, dict) or not summary.get('summary_text') or not questions:
+            raise ValueError("Fused setup response is missing the summary or the questions")
+        description = parsed.get('description') or ''
+        return {
+            'summary': summary,
+            'questions': questions,
+            'description': description.strip() if isinstance(description, str) else '',
+            '_usage': usage_dict
+        }
+
+    def _existing_questions_block(self, existing_questions: Optional[List[str]]) -> str:
+        return "\n".join(f"- {q}" for q in existing_questions or [] if q) or "None"
+
+    def _normalize_generated_questions(self, questions, question_count: int) -> List[Dict]:
         if not isinstance(questions, list):
             questions = [questions] if questions else []
         
@@ -193,46 +407,25 @@ class LLMService:
                     'question': str(q),
                     'text': str(q)
                 })
-        
-        return {
-            'questions': normalized_questions,
-            'description': description.strip() if description else '',
-            '_usage': usage_dict
-        }
+        return normalized_questions
     
-    async def _generate_dynamic_question(self, context_summary: str) -> List[Dict]:
-        prompt = f"""Generate the first interview question for this role:
-
-        {context_summary}
-
-        The question should:
-        - Welcome the candidate warmly
-        - Ask about their background/experience
-        - Be conversational and professional
-        - Be appropriate for the role level
-
-        Return ONLY a JSON object with "question" and "text" fields (both should be the same question text).
-
-        Return only the JSON object, no extra text."""
-        
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200,
-            temperature=0.4
-        )
-        usage = getattr(response, "usage", None)
-        usage_dict = {}
-        if usage:
-            usage_dict = {
-                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
-                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
-                "total_tokens": getattr(usage, "total_tokens", 0) or 0,
-            }
-
-        question_text = response.choices[0].message.content
-        question = self._parse_json(question_text)
-        
+    def _answers_summary(self, previous_answers: List[Dict]) -> str:
+        answers_summary = ""
+        for i, ans in enumerate(previous_answers[-3:], 1):
+            q = ans.get('question', 'N/A')
+            a = ans.get('answer', 'N/A')[:200]  
+            answers_summary += f"Q{i}: {q}\nA{i}: {a}...\n\n"
+        return answers_summary.strip() or "This is the first question."
+
+    async def _load_context_summary(self, interview_id: str) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Interview).where(Interview.id == interview_id))
+            interview = result.scalar_one_or_none()
+            if not interview or not interview.context:
+                return None
+            return interview.context.get('context_summary', 'No context available')
+
+    def _finalize_question(self, question, usage_dict: Dict) -> Dict:
         if isinstance(question, list):
             question = question[0] if question else {}
         
@@ -241,102 +434,119 @@ class LLMService:
             question['text'] = question.get('question', '')
         if usage_dict:
             question["_usage"] = usage_dict
-        return [question]
+        return question
+
+    async def _generate_dynamic_question(self, context_summary: str) -> List[Dict]:
+        # LLMDeadlineExceeded propagates so QuestionService can serve a fallback question
+        content, usage_dict = await self._complete("first_dynamic_question", context_summary=context_summary)
+        question = self._parse_json(content)
+        return [self._finalize_question(question, usage_dict)]
     
-    async def generate_next_dynamic_question(self, interview_id: str, previous_answers: List[Dict]) -> Dict:
+    async def generate_next_dynamic_question(self, interview_id: str, previous_answers: List[Dict],
+                                             interactive: bool = True) -> Dict:
         try:
-            async with AsyncSessionLocal() as db:
-                result = await db.execute(select(Interview).where(Interview.id == interview_id))
-                interview = result.scalar_one_or_none()
-                
-                if not interview or not interview.context:
-                    return {"error": "No context available"}
-                
-                context_summary = interview.context.get('context_summary', 'No context available')
-                
-                answers_summary = ""
-                for i, ans in enumerate(previous_answers[-3:], 1):
-                    q = ans.get('question', 'N/A')
-                    a = ans.get('answer', 'N/A')[:200]  
-                    answers_summary += f"Q{i}: {q}\nA{i}: {a}...\n\n"
-                
-                prompt = f"""Generate the next interview question based on this context:
-
-                Job Role: {context_summary}
-
-                Previous Q&A:
-                {answers_summary if answers_summary else "This is the first question."}
-
-                Generate a relevant follow-up question that:
-                - Builds on the candidate's previous answers
-                - Deepens understanding of their experience/skills
-                - Is specific to the role
-                - Is professional and conversational
-
-                Return ONLY a JSON object with "question" and "text" fields (both contain the same question text).
-
-                Return only the JSON object, no extra text."""
-                
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=200,
-                    temperature=0.5
-                )
-                usage = getattr(response, "usage", None)
-                usage_dict = {}
-                if usage:
-                    usage_dict = {
-                        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
-                        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
-                        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
-                    }
-
-                question_text = response.choices[0].message.content
-                question = self._parse_json(question_text)
-                
-                if isinstance(question, list):
-                    question = question[0] if question else {}
-                
-                question['id'] = str(uuid.uuid4())
-                if 'text' not in question:
-                    question['text'] = question.get('question', '')
-                if usage_dict:
-                    question["_usage"] = usage_dict
-                return question
+            context_summary = await self._load_context_summary(interview_id)
+            if context_summary is None:
+                return {"error": "No context available"}
+            
+            content, usage_dict = await self._complete(
+                "next_dynamic_question",
+                context_summary=context_summary,
+                answers_summary=self._answers_summary(previous_answers),
+                interactive=interactive,
+            )
+            question = self._parse_json(content)
+            return self._finalize_question(question, usage_dict)
                 
+        except LLMDeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Error generating next dynamic question: {str(e)}", exc_info=True)
             return {}
 
+    async def stream_dynamic_question(self, call_type: str, **values) -> AsyncIterator[Dict]:
+        """
+        Stream a dynamic question generation. Yields {"delta": str} events with the question
+        text as it is decoded from the partial JSON, then a final {"question": dict} event
+        shaped like the non-streaming result.
+        """
+        template = get_template(call_type)
+        decision = model_router.choose(call_type)
+        request = {
+            "messages": template.render(**values),
+            "max_tokens": decision.max_tokens or template.max_tokens,
+            "temperature": template.temperature,
+            "stream": True,
+        }
+        start = time.perf_counter()
+        try:
+            # The deadline bounds time to the first byte only; once text is flowing it cannot be swapped out
+            stream, decision = await self._open_stream(call_type, decision, request)
+        except asyncio.TimeoutError:
+            model_router.record_deadline_exceeded(call_type)
+            raise LLMDeadlineExceeded(call_type, decision.route.deadline_seconds)
+
+        reader = JsonStringFieldReader("question")
+        raw_parts = []
+        usage_dict = {}
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage:
+                usage_dict = self._usage_dict(usage)
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            raw_parts.append(content)
+            delta = reader.feed(content)
+            if delta:
+                yield {"delta": delta}
+
+        model_router.record(call_type, decision, (time.perf_counter() - start) * 1000, usage=usage_dict)
+
+        try:
+            question = self._parse_json("".join(raw_parts))
+        except ValueError:
+            if not reader.value:
+                raise
+            question = {"question": reader.value}
+        yield {"question": self._finalize_question(question, usage_dict)}
+
+    async def _open_stream(self, call_type: str, decision: RouteDecision, request: Dict) -> Tuple[object, RouteDecision]:
+        async def open_stream():
+            try:
+                return await self._routed_create(call_type, decision, {**request, "stream_options": {"include_usage": True}})
+            except openai.BadRequestError:
+                # Older API versions reject stream_options; stream without usage accounting
+                return await self._routed_create(call_type, decision, request)
+
+        if not decision.route.deadline_seconds:
+            return await open_stream()
+        return await asyncio.wait_for(open_stream(), timeout=decision.route.deadline_seconds)
+
+    async def stream_first_dynamic_question(self, context_summary: str) -> AsyncIterator[Dict]:
+        async for event in self.stream_dynamic_question("first_dynamic_question", context_summary=context_summary):
+            yield event
+
+    async def stream_next_dynamic_question(self, interview_id: str, previous_answers: List[Dict]) -> AsyncIterator[Dict]:
+        context_summary = await self._load_context_summary(interview_id)
+        if context_summary is None:
+            raise ValueError("No context available")
+        events = self.stream_dynamic_question(
+            "next_dynamic_question",
+            context_summary=context_summary,
+            answers_summary=self._answers_summary(previous_answers),
+        )
+        async for event in events:
+            yield event
+
     async def analyze_response(self, interview_id: str, transcript: str, question_context: Dict) -> Tuple[Dict, Dict]:
         """Analyze a single candidate answer - simplified to reduce tokens"""
         try:
             question = question_context.get('question', '')
-            system_prompt = "You are an expert in analyzing interview answers."
-            user_prompt = f"""Question: {question}\nAnswer: {transcript}\n\nEvaluate (1-10 scale) and return JSON:\n{{"relevance_score": int, "completeness_score": int, "clarity_score": int, "overall_score": int, "strengths": [str], "weaknesses": [str], "suggestions": [str]}}"""
-            
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=300,
-                temperature=0.3
-            )
-
-            usage = getattr(response, "usage", None)
-            usage_dict = {}
-            if usage:
-                usage_dict = {
-                    "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
-                    "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
-                    "total_tokens": getattr(usage, "total_tokens", 0) or 0,
-                }
-
-            return self._parse_json(response.choices[0].message.content), usage_dict
+            content, usage_dict = await self._complete("analyze_answer", question=question, answer=transcript)
+            return self._parse_json(content), usage_dict
         except Exception as e:
             logger.error(f"Error analyzing response: {str(e)}", exc_info=True)
             raise
@@ -344,30 +554,15 @@ class LLMService:
     async def generate_insights(self, call_summaries: List[str], interview_name: str, job_description: str, interview_description: str) -> List[str]:
         """Generate insights from call summaries - Followup AI style"""
         try:
-            system_prompt = "You are an expert in uncovering deeper insights from interview question and answer sets."
-            
-            user_prompt = f"""Generate 3 insights from call summaries highlighting user feedback. Each insight max 25 words. No user names.
-
-            Call Summaries: {chr(10).join(f"- {s}" for s in call_summaries)}
-
-            Interview Title: {interview_name}
-            Job Description: {job_description}
-            Interview Description: {interview_description}
-
-            Output JSON: {{"insights": [string, string, string]}}"""
-            
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=300,
-                temperature=0.5
+            content, _ = await self._complete(
+                "insights",
+                interview_name=interview_name,
+                job_description=job_description,
+                interview_description=interview_description,
+                call_summaries="\n".join(f"- {s}" for s in call_summaries),
             )
             
-            insights = self._parse_json(response.choices[0].message.content).get("insights", [])
+            insights = self._parse_json(content).get("insights", [])
             if not isinstance(insights, list):
                 insights = [insights] if insights else []
             
@@ -377,6 +572,50 @@ class LLMService:
             logger.error(f"Error generating insights: {str(e)}", exc_info=True)
             return []
 
+    def _normalize_final_analysis(self, analysis: Dict) -> Dict:
+        communication = analysis.get("communication") if isinstance(analysis.get("communication"), dict) else {}
+        return {
+            "overall_score": analysis.get("overallScore", 0),
+            "overall_feedback": ' '.join(analysis.get("overallFeedback", "").split()[:60]),
+            "communication_score": communication.get("score", 0),
+            "communication_feedback": ' '.join((communication.get("feedback", "") or "").split()[:60]),
+            "satisfaction_score": analysis.get("satisfactionScore", 0),
+            "question_summaries": analysis.get("questionSummaries", []),
+            "soft_skill_summary": ' '.join(analysis.get("softSkillSummary", "").split()[:15]),
+        }
+
+    def final_analysis_request(self, qa_history: List[Dict], batched: bool = False) -> Dict:
+        """
+        Single-call final analysis body for offline batch execution (no map-reduce: nobody is waiting).
+        batched=True scores every answer too (see evaluate_interview).
+        """
+        if batched:
+            return self.build_request(
+                "batched_evaluation",
+                max_tokens=1500 + 150 * len(qa_history),
+                transcript=serialize_transcript(qa_history, start=0),
+            )
+        return self.build_request("final_analysis", transcript=serialize_transcript(qa_history))
+
+    def parse_final_analysis(self, content: str) -> Dict:
+        return self._normalize_final_analysis(self._parse_json(content))
+
+    def parse_batched_evaluation(self, content: str, answer_count: int) -> Tuple[Dict, List[Dict]]:
+        analysis = self._parse_json(content)
+        if not isinstance(analysis, dict):
+            raise ValueError("Batched evaluation did not return a JSON object")
+
+        per_answer: List[Dict] = [{} for _ in range(answer_count)]
+        evaluations = analysis.get("answerEvaluations", [])
+        for position, evaluation in enumerate(evaluations if isinstance(evaluations, list) else []):
+            if not isinstance(evaluation, dict):
+                continue
+            index = evaluation.pop("index", position)
+            if isinstance(index, int) and 0 <= index < len(per_answer):
+                per_answer[index] = evaluation
+
+        return self._normalize_final_analysis(analysis), per_answer
+
     async def generate_final_analysis(self, interview_id: str, qa_history: List[Dict]) -> Tuple[Dict, Dict]:
         """Generate final analysis - Followup AI style"""
         try: 
@@ -385,123 +624,159 @@ class LLMService:
                 if not interview:
                     return {"error": "Interview not found"}, {}
                 
-                # # Build transcript
-                # transcript = "\n".join([
-                #     f"{'Interviewer' if 'question' in qa else 'Candidate'}: {qa.get('question') or qa.get('answer', '')}"
-                #     for qa in qa_history
-                #     if qa.get('question') or qa.get('answer')
-                # ])
-                
-                # questions_list = interview.llm_generated_questions.get('questions', []) if isinstance(interview.llm_generated_questions, dict) else []
-                # main_questions = [q.get('question', q.get('text', '')) for q in questions_list if isinstance(q, dict)]
-                # main_questions_text = "\n".join([f"{i+1}. {q}" for i, q in enumerate(main_questions)])
-                
-                system_prompt = "You are an expert in analyzing interview transcripts. You must only use the main questions provided and not generate or infer additional questions."
+                transcript = serialize_transcript(qa_history)
+                if estimate_tokens(transcript) > self.map_reduce_threshold_tokens:
+                    return await self._map_reduce_final_analysis(qa_history)
+
+                content, usage_dict = await self._complete("final_analysis", transcript=transcript)
+                return self.parse_final_analysis(content), usage_dict
                 
-                user_prompt = f"""Analyse the following interview qa summary and provide structured feedback:
-                ###
-                QA Summary: {qa_history}
-                Based on this qa summary generate the following analytics in JSON format:
-
-                1. Overall Score (0-100) and Overall Feedback (60 words) - take into account the following factors:
-
-                - Communication Skills: Evaluate the use of language, grammar, and vocabulary. Assess if the interviewee communicated effectively and clearly.
-                - Time Taken to Answer: Consider if the interviewee answered promptly or took too long. Note if they were concise or tended to ramble.
-                - Confidence: Assess the interviewee's confidence level. Were they assertive and self-assured, or did they seem hesitant and unsure?
-                - Clarity: Evaluate the clarity of their answers. Were their responses well-structured and easy to understand?
-                - Attitude: Consider the interviewee's attitude towards the interview and questions. Were they positive, respectful, and engaged?
-                - Relevance of Answers: Determine if the interviewee's responses are relevant to the questions asked. Assess if they stayed on topic or veered off track.
-                - Depth of Knowledge: Evaluate the interviewee's depth of understanding and knowledge in the subject matter. Look for detailed and insightful answers.
-                - Problem-Solving Ability: Consider how the interviewee approaches problem-solving questions. Assess their logical reasoning and analytical skills.
-                - Examples and Evidence: Note if the interviewee provides concrete examples or evidence to support their answers. This can indicate experience and credibility.
-                - Listening Skills: Look for signs that the interviewee is actively listening and responding appropriately to follow-up questions.
-                - Consistency: Evaluate if the interviewee's answers are consistent throughout the interview or if they contradict themselves.
-                - Adaptability: Assess how well the interviewee adapts to different types of questions, including unexpected or challenging ones.
-
-                2. Communication Skills: Score (0-10) and Feedback (60 words). Rating system and guidelines for communication skills is as following.
-
-                    - 10: Fully operational command, use of English is appropriate, accurate, fluent, shows complete understanding.
-                    - 09: Fully operational command with occasional inaccuracies and inappropriate usage. May misunderstand unfamiliar situations but handles complex arguments well.
-                    - 08: Operational command with occasional inaccuracies, inappropriate usage, and misunderstandings. Handles complex language and detailed reasoning well.
-                    - 07: Effective command despite some inaccuracies, inappropriate usage, and misunderstandings. Can use and understand reasonably complex language, especially in familiar situations.
-                    - 06: Partial command, copes with overall meaning, frequent mistakes. Handles basic communication in their field.
-                    - 05: Basic competence limited to familiar situations with frequent problems in understanding and expression.
-                    - 04: Understands only general meaning in very familiar situations, with frequent communication breakdowns.
-                    - 03: Has great difficulty understanding spoken English.
-                    - 02: Has no ability to use the language except a few isolated words.
-                    - 01: Did not answer the questions.
-
-                3. Satisfaction Score (0-10): Evaluate the candidate's overall satisfaction and engagement level based on their responses, enthusiasm, and interaction quality throughout the interview. Consider factors such as:
-                    - Level of enthusiasm and interest shown
-                    - Engagement with the interview process
-                    - Positive attitude and professionalism
-                    - Willingness to participate and provide detailed answers
-                    - Overall impression of candidate satisfaction with the opportunity
-
-                4. Summary for each main interview question (use the main questions listed above):
-
-                - Use ONLY the main questions provided above, it should output all the questions with the numbers even if it's not found in the transcript.
-                - Follow the below rules when outputing the question and summary
-                    - If a main interview question isn't found in the transcript, then output the main question and give the summary as "Not Asked"
-                    - If a main interview question is found in the transcript but an answer couldn't be found, then output the main question and give the summary as "Not Answered"
-                    - If a main interview question is found in the transcript and an answer can also be found, then,
-
-                        - For each main question (q), provide a summary that includes:
-                            a) The candidate's response to the main question
-                            b) Any follow-up questions that were asked related to this main question and their answers
-                        - The summary should be a cohesive paragraph encompassing all related information for each main question
-
-                5. Create a 10 to 15 words summary regarding the soft skills considering factors such as confidence, leadership, adaptability, critical thinking and decision making.
-
-                Ensure the output is in valid JSON format with the following structure:
-
-                {{
-                "overallScore": number,
-                "overallFeedback": string,
-                "communication": {{ "score": number, "feedback": string }},
-                "satisfactionScore": number,
-                "questionSummaries": [{{ "question": string, "summary": string }}],
-                "softSkillSummary": string
-                }}
-
-                IMPORTANT: Only use the main questions provided. Do not generate or infer additional questions such as follow-up questions."""
-                                                
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    max_tokens=1500,
-                    temperature=0.3
+        except Exception as e:
+            logger.error(f"Error generating final analysis: {str(e)}", exc_info=True)
+            raise
+
+    def final_analysis_call_count(self, qa_history: List[Dict]) -> int:
+        """LLM calls generate_final_analysis makes for this transcript (map calls plus the reduce when it is long)."""
+        if estimate_tokens(serialize_transcript(qa_history)) > self.map_reduce_threshold_tokens:
+            return len(self._chunk_for_map(qa_history)) + 1
+        return 1
+
+    def _chunk_for_map(self, qa_history: List[Dict]) -> List[Tuple[int, List[Dict]]]:
+        """Split qa_history into consecutive (start_number, items) chunks of about map_chunk_tokens each."""
+        chunks = []
+        current: List[Dict] = []
+        current_tokens = 0
+        start = 1
+        number = 1
+        for qa in qa_history:
+            if not isinstance(qa, dict):
+                continue
+            qa_tokens = estimate_tokens(serialize_transcript([qa]))
+            if current and current_tokens + qa_tokens > self.map_chunk_tokens:
+                chunks.append((start, current))
+                current, current_tokens, start = [], 0, number
+            current.append(qa)
+            current_tokens += qa_tokens
+            number += 1
+        if current:
+            chunks.append((start, current))
+        return chunks
+
+    async def _map_reduce_final_analysis(self, qa_history: List[Dict]) -> Tuple[Dict, Dict]:
+        """
+        Final analysis for long interviews: question summaries are produced per chunk in parallel
+        (map, bounded by map_concurrency) and a small reduce call scores the condensed interview,
+        so no single prompt grows with the interview length.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.map_concurrency))
+
+        async def summarize_chunk(start: int, items: List[Dict]) -> Tuple[Dict, Dict]:
+            async with semaphore:
+                content, usage = await self._complete(
+                    "final_analysis_map", transcript=serialize_transcript(items, start=start)
                 )
+            parsed = self._parse_json(content)
+            return (parsed if isinstance(parsed, dict) else {}), usage
+
+        chunks = self._chunk_for_map(qa_history)
+        mapped = await asyncio.gather(*(summarize_chunk(start, items) for start, items in chunks))
+
+        question_summaries: List[Dict] = []
+        observations: List[str] = []
+        usages = []
+        for (start, items), (partial, usage) in zip(chunks, mapped):
+            usages.append(usage)
+            summaries = partial.get("questionSummaries", [])
+            question_summaries.extend(summary for summary in (summaries if isinstance(summaries, list) else []) if isinstance(summary, dict))
+            if partial.get("observations"):
+                observations.append(f"- Q{start}-Q{start + len(items) - 1}: {' '.join(str(partial['observations']).split())}")
+
+        content, usage = await self._complete(
+            "final_analysis_reduce",
+            question_summaries=self._format_question_summaries(question_summaries),
+            observations="\n".join(observations) or "None",
+        )
+        usages.append(usage)
+        analysis = self._parse_json(content)
+        if not isinstance(analysis, dict):
+            raise ValueError("Final analysis reduce step did not return a JSON object")
+        analysis["questionSummaries"] = question_summaries
+
+        usage_dict = self._merge_usage(usages)
+        usage_dict["map_reduce_calls"] = len(usages)
+        logger.debug(f"Map-reduce final analysis: {len(qa_history)} answers in {len(chunks)} chunk(s)")
+        return self._normalize_final_analysis(analysis), usage_dict
+
+    def _format_question_summaries(self, question_summaries: List[Dict]) -> str:
+        return "\n".join(
+            f"{i}. {summary.get('question', '')}\n   {summary.get('summary', '')}"
+            for i, summary in enumerate(question_summaries, 1)
+        )
 
-                usage = getattr(response, "usage", None)
-                usage_dict = {}
-                if usage:
-                    usage_dict = {
-                        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
-                        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
-                        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
-                    }
+    def _merge_usage(self, usages: List[Dict]) -> Dict:
+        merged: Dict[str, int] = {}
+        for usage in usages:
+            for key, value in (usage or {}).items():
+                merged[key] = merged.get(key, 0) + (value or 0)
+        return merged
+
+    async def fold_answer(self, running_state: Dict, question: str, answer: str, number: int) -> Tuple[Dict, Dict]:
+        """
+        Incremental evaluation step: score one answer and fold it into the rolling summary.
+        Returns ({"answerEvaluation", "questionSummary", "runningNotes", "runningScores"}, usage).
+        """
+        scores = running_state.get("scores") or {}
+        content, usage_dict = await self._complete(
+            "fold_answer",
+            answered=len(running_state.get("folded") or []),
+            running_scores=json.dumps(scores) if scores else "None yet",
+            running_notes=running_state.get("notes") or "None yet",
+            transcript=serialize_transcript([{"question": question, "answer": answer}], start=number),
+        )
+        folded = self._parse_json(content)
+        if not isinstance(folded, dict):
+            raise ValueError("Incremental evaluation did not return a JSON object")
+        return folded, usage_dict
+
+    async def finalize_running_evaluation(self, question_summaries: List[Dict], notes: str, scores: Dict) -> Tuple[Dict, Dict]:
+        """Turn a complete running evaluation into the final analysis with one small call."""
+        observations = [f"- {' '.join(notes.split())}"] if notes else []
+        if scores:
+            observations.append(
+                f"- Running scores after {len(question_summaries)} answers: overall {scores.get('overall', 'n/a')}/100, "
+                f"communication {scores.get('communication', 'n/a')}/10, satisfaction {scores.get('satisfaction', 'n/a')}/10"
+            )
+        content, usage_dict = await self._complete(
+            "final_analysis_reduce",
+            question_summaries=self._format_question_summaries(question_summaries),
+            observations="\n".join(observations) or "None",
+        )
+        analysis = self._parse_json(content)
+        if not isinstance(analysis, dict):
+            raise ValueError("Running evaluation finalize step did not return a JSON object")
+        analysis["questionSummaries"] = question_summaries
+        return self._normalize_final_analysis(analysis), usage_dict
+
+    async def evaluate_interview(self, interview_id: str, qa_history: List[Dict]) -> Tuple[Dict, List[Dict], Dict]:
+        """
+        Batched evaluation: score every answer and produce the final analysis in one call.
+        Returns (final_analysis, per_answer_analyses, usage); per_answer_analyses[i] has the
+        same fields as analyze_response() for qa_history[i].
+        """
+        try:
+            answers_block = serialize_transcript(qa_history, start=0)
+
+            content, usage_dict = await self._complete(
+                "batched_evaluation",
+                max_tokens=1500 + 150 * len(qa_history),
+                transcript=answers_block,
+            )
+
+            final_analysis, per_answer = self.parse_batched_evaluation(content, len(qa_history))
+            return final_analysis, per_answer, usage_dict
 
-                analysis = self._parse_json(response.choices[0].message.content)
-                
-                result = {
-                    "overall_score": analysis.get("overallScore", 0),
-                    "overall_feedback": ' '.join(analysis.get("overallFeedback", "").split()[:60]),
-                    "communication_score": analysis.get("communication", {}).get("score", 0) if isinstance(analysis.get("communication"), dict) else 0,
-                    "communication_feedback": ' '.join((analysis.get("communication", {}).get("feedback", "") if isinstance(analysis.get("communication"), dict) else "").split()[:60]),
-                    "satisfaction_score": analysis.get("satisfactionScore", 0),
-                    "question_summaries": analysis.get("questionSummaries", []),
-                    "soft_skill_summary": ' '.join(analysis.get("softSkillSummary", "").split()[:15]),
-                }
-                
-                return result, usage_dict
-                
         except Exception as e:
-            logger.error(f"Error generating final analysis: {str(e)}", exc_info=True)
+            logger.error(f"Error in batched interview evaluation: {str(e)}", exc_info=True)
             raise
     
 
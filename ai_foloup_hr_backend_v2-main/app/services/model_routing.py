@@ -0,0 +1,331 @@
+# Per-call-type LLM routing (deployment, limits, SLO-based fallback) and per-route metrics
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+from config_loader import load_config
+from utils.cost_utils import llm_call_cost
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LATENCY_WINDOW = 200
+RECENT_LATENCIES_KEPT = 500
+_STATS_KEY = "llm:route_stats:{call_type}"
+_LATENCY_KEY = "llm:route_latency:{call_type}:{deployment}"
+
+
+class LLMDeadlineExceeded(Exception):
+    """An interactive call type did not answer within its route's deadline_seconds."""
+
+    def __init__(self, call_type: str, deadline_seconds: float):
+        super().__init__(f"LLM call '{call_type}' exceeded its {deadline_seconds:g}s deadline")
+        self.call_type = call_type
+        self.deadline_seconds = deadline_seconds
+
+
+@dataclass(frozen=True)
+class Route:
+    call_type: str
+    deployment: str
+    fallback_deployment: Optional[str]
+    max_tokens: Optional[int]
+    timeout_seconds: float
+    slo_p95_ms: Optional[float]
+    hedge_percentile: Optional[float]
+    deadline_seconds: Optional[float]
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    route: Route
+    deployment: str
+    is_fallback: bool
+
+    @property
+    def max_tokens(self) -> Optional[int]:
+        return self.route.max_tokens
+
+    @property
+    def timeout_seconds(self) -> float:
+        return self.route.timeout_seconds
+
+
+def percentile(values, pct: float) -> Optional[float]:
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+class ModelRouter:
+    """
+    Maps each LLM call type (prompt template name, "jd_summary", ...) to a deployment.
+
+    Config (llm.routes in config.yaml): a `default` entry plus optional per-call-type entries with
+    deployment, fallback_deployment, max_tokens, timeout_seconds and slo_p95_ms. Unset fields inherit
+    from `default`, whose deployment defaults to llm.deployment / llm.model.
+
+    When a route has an SLO and a fallback, calls move to the fallback deployment while the primary's
+    p95 latency (this process, last LATENCY_WINDOW calls) is above the SLO. After degraded_cooldown_seconds
+    the primary's window is reset and it is tried again.
+
+    Interactive routes can also set hedge_percentile (send a duplicate request once the first has been
+    outstanding longer than that latency percentile) and deadline_seconds (give up and let the caller
+    serve a fallback).
+    """
+
+    def __init__(self):
+        llm_config = load_config().get('llm', {}) or {}
+        routes_config = llm_config.get('routes', {}) or {}
+        default_deployment = llm_config.get('model', 'gpt-4o-mini')
+        if str(llm_config.get('provider', 'openai')).lower() in ('azure', 'azure_openai', 'azure-openai'):
+            default_deployment = llm_config.get('deployment') or default_deployment
+        self.min_samples = int(routes_config.get('min_samples', 20))
+        self.degraded_cooldown_seconds = float(routes_config.get('degraded_cooldown_seconds', 120))
+        self.hedge_default_delay_ms = float(routes_config.get('hedge_default_delay_ms', 2000))
+        self.hedge_min_delay_ms = float(routes_config.get('hedge_min_delay_ms', 300))
+        self._stats_writes = set()
+        defaults = {
+            "deployment": default_deployment,
+            "fallback_deployment": None,
+            "max_tokens": None,
+            "timeout_seconds": 60,
+            "slo_p95_ms": None,
+            "hedge_percentile": None,
+            "deadline_seconds": None,
+        }
+        defaults.update({k: v for k, v in (routes_config.get('default') or {}).items() if v is not None})
+        self._defaults = defaults
+        self._routes: Dict[str, Route] = {}
+        for call_type, overrides in routes_config.items():
+            if isinstance(overrides, dict) and call_type != 'default':
+                self._routes[call_type] = self._build_route(call_type, overrides)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._degraded_since: Dict[str, float] = {}
+
+    def _build_route(self, call_type: str, overrides: Dict) -> Route:
+        merged = dict(self._defaults)
+        merged.update({k: v for k, v in (overrides or {}).items() if v is not None})
+        return Route(
+            call_type=call_type,
+            deployment=str(merged["deployment"]),
+            fallback_deployment=merged.get("fallback_deployment") or None,
+            max_tokens=int(merged["max_tokens"]) if merged.get("max_tokens") else None,
+            timeout_seconds=float(merged["timeout_seconds"]),
+            slo_p95_ms=float(merged["slo_p95_ms"]) if merged.get("slo_p95_ms") else None,
+            hedge_percentile=float(merged["hedge_percentile"]) if merged.get("hedge_percentile") else None,
+            deadline_seconds=float(merged["deadline_seconds"]) if merged.get("deadline_seconds") else None,
+        )
+
+    def route_for(self, call_type: str) -> Route:
+        route = self._routes.get(call_type)
+        if route is None:
+            route = self._build_route(call_type, {})
+            self._routes[call_type] = route
+        return route
+
+    def _window(self, call_type: str, deployment: str) -> Deque[float]:
+        return self._latencies.setdefault(f"{call_type}:{deployment}", deque(maxlen=LATENCY_WINDOW))
+
+    def primary_p95_ms(self, call_type: str) -> Optional[float]:
+        route = self.route_for(call_type)
+        window = self._window(call_type, route.deployment)
+        if len(window) < self.min_samples:
+            return None
+        return percentile(window, 95)
+
+    def choose(self, call_type: str) -> RouteDecision:
+        route = self.route_for(call_type)
+        if not route.fallback_deployment or not route.slo_p95_ms:
+            return RouteDecision(route, route.deployment, False)
+
+        degraded_since = self._degraded_since.get(call_type)
+        if degraded_since is not None and time.monotonic() - degraded_since >= self.degraded_cooldown_seconds:
+            # Give the primary a fresh chance: its old samples no longer say much
+            self._window(call_type, route.deployment).clear()
+            self._degraded_since.pop(call_type, None)
+            logger.info(f"LLM route '{call_type}' retrying primary deployment {route.deployment}")
+            return RouteDecision(route, route.deployment, False)
+
+        p95 = self.primary_p95_ms(call_type)
+        if degraded_since is not None or (p95 is not None and p95 > route.slo_p95_ms):
+            if degraded_since is None:
+                self._degraded_since[call_type] = time.monotonic()
+                logger.warning(
+                    f"LLM route '{call_type}' p95 {p95:.0f}ms above SLO {route.slo_p95_ms:.0f}ms, "
+                    f"switching to fallback deployment {route.fallback_deployment}"
+                )
+            return RouteDecision(route, route.fallback_deployment, True)
+        return RouteDecision(route, route.deployment, False)
+
+    def fallback_for(self, decision: RouteDecision) -> Optional[RouteDecision]:
+        """Decision to retry a failed primary call on, or None when there is nowhere to go."""
+        if decision.is_fallback or not decision.route.fallback_deployment:
+            return None
+        return RouteDecision(decision.route, decision.route.fallback_deployment, True)
+
+    def hedge_delay_seconds(self, decision: RouteDecision) -> Optional[float]:
+        """How long to wait for the first request before hedging, or None if the route does not hedge."""
+        pct = decision.route.hedge_percentile
+        if not pct:
+            return None
+        window = self._window(decision.route.call_type, decision.deployment)
+        if len(window) < self.min_samples:
+            delay_ms = self.hedge_default_delay_ms
+        else:
+            delay_ms = max(self.hedge_min_delay_ms, percentile(window, pct))
+        return delay_ms / 1000
+
+    def _in_background(self, coro) -> None:
+        # Stats writes never add a Redis round trip (or a connect timeout) to the caller's latency
+        task = asyncio.create_task(coro)
+        self._stats_writes.add(task)
+        task.add_done_callback(self._stats_writes.discard)
+
+    def record(self, call_type: str, decision: RouteDecision, latency_ms: float,
+               usage: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        """
+        Record one call. The in-process window, which drives routing, is updated right away;
+        the Redis aggregates for export are written in the background.
+        """
+        if not error:
+            self._window(call_type, decision.deployment).append(latency_ms)
+        self._in_background(self._write_call_stats(call_type, decision, latency_ms, usage, error))
+
+    async def _write_call_stats(self, call_type: str, decision: RouteDecision, latency_ms: float,
+                                usage: Optional[Dict], error: Optional[str]) -> None:
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
+        completion_tokens = int(usage.get("completion_tokens", 0) or 0)
+        cached_tokens = int(usage.get("cached_tokens", 0) or 0)
+        try:
+            redis = await get_redis()
+            stats_key = _STATS_KEY.format(call_type=call_type)
+            latency_key = _LATENCY_KEY.format(call_type=call_type, deployment=decision.deployment)
+            pipe = redis.pipeline()
+            pipe.hincrby(stats_key, "calls", 1)
+            pipe.hincrby(stats_key, f"calls:{decision.deployment}", 1)
+            if decision.is_fallback:
+                pipe.hincrby(stats_key, "fallback_calls", 1)
+            if error:
+                pipe.hincrby(stats_key, "errors", 1)
+            else:
+                pipe.lpush(latency_key, f"{latency_ms:.1f}")
+                pipe.ltrim(latency_key, 0, RECENT_LATENCIES_KEPT - 1)
+            pipe.hincrby(stats_key, "prompt_tokens", prompt_tokens)
+            pipe.hincrby(stats_key, "completion_tokens", completion_tokens)
+            pipe.hincrby(stats_key, "cached_tokens", cached_tokens)
+            pipe.hincrbyfloat(stats_key, "cost", llm_call_cost(prompt_tokens, completion_tokens, cached_tokens))
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Failed to record LLM route stats for '{call_type}': {e}")
+
+    def record_hedge(self, call_type: str, hedged: bool, hedge_won: bool = False,
+                     usage: Optional[Dict] = None) -> None:
+        """
+        Count one hedge-eligible request (in the background). The losing duplicate is cancelled before its
+        usage is known, so its cost is estimated from the winner's usage (the provider bills the prompt either way).
+        """
+        self._in_background(self._write_hedge_stats(call_type, hedged, hedge_won, usage))
+
+    async def _write_hedge_stats(self, call_type: str, hedged: bool, hedge_won: bool, usage: Optional[Dict]) -> None:
+        usage = usage or {}
+        try:
+            redis = await get_redis()
+            stats_key = _STATS_KEY.format(call_type=call_type)
+            pipe = redis.pipeline()
+            pipe.hincrby(stats_key, "hedge_eligible", 1)
+            if hedged:
+                pipe.hincrby(stats_key, "hedged", 1)
+                if hedge_won:
+                    pipe.hincrby(stats_key, "hedge_wins", 1)
+                prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
+                completion_tokens = int(usage.get("completion_tokens", 0) or 0)
+                pipe.hincrby(stats_key, "hedge_duplicate_tokens", prompt_tokens + completion_tokens)
+                pipe.hincrbyfloat(stats_key, "hedge_duplicate_cost", llm_call_cost(prompt_tokens, completion_tokens))
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Failed to record LLM hedge stats for '{call_type}': {e}")
+
+    def record_deadline_exceeded(self, call_type: str) -> None:
+        self._in_background(self._write_deadline_exceeded(call_type))
+
+    async def _write_deadline_exceeded(self, call_type: str) -> None:
+        try:
+            redis = await get_redis()
+            await redis.hincrby(_STATS_KEY.format(call_type=call_type), "deadline_exceeded", 1)
+        except Exception as e:
+            logger.debug(f"Failed to record LLM deadline for '{call_type}': {e}")
+
+    async def get_stats(self) -> Dict:
+        redis = await get_redis()
+        call_types = set(self._routes)
+        async for raw_key in redis.scan_iter(match=_STATS_KEY.format(call_type="*")):
+            call_types.add(_decode(raw_key).split(":", 2)[2])
+
+        routes = {}
+        for call_type in sorted(call_types):
+            route = self.route_for(call_type)
+            raw = await redis.hgetall(_STATS_KEY.format(call_type=call_type))
+            counters = {_decode(k): _decode(v) for k, v in raw.items()}
+            calls = int(counters.get("calls", 0))
+            deployments = {}
+            for deployment in filter(None, {route.deployment, route.fallback_deployment}):
+                recent = [float(_decode(v)) for v in await redis.lrange(
+                    _LATENCY_KEY.format(call_type=call_type, deployment=deployment), 0, -1
+                )]
+                deployments[deployment] = {
+                    "calls": int(counters.get(f"calls:{deployment}", 0)),
+                    "p50_ms": percentile(recent, 50),
+                    "p95_ms": percentile(recent, 95),
+                    "samples": len(recent),
+                }
+            cost = float(counters.get("cost", 0) or 0)
+            hedge_eligible = int(counters.get("hedge_eligible", 0))
+            hedged = int(counters.get("hedged", 0))
+            routes[call_type] = {
+                "deployment": route.deployment,
+                "fallback_deployment": route.fallback_deployment,
+                "max_tokens": route.max_tokens,
+                "timeout_seconds": route.timeout_seconds,
+                "slo_p95_ms": route.slo_p95_ms,
+                "hedge_percentile": route.hedge_percentile,
+                "deadline_seconds": route.deadline_seconds,
+                "degraded": call_type in self._degraded_since,
+                "calls": calls,
+                "fallback_calls": int(counters.get("fallback_calls", 0)),
+                "errors": int(counters.get("errors", 0)),
+                "prompt_tokens": int(counters.get("prompt_tokens", 0)),
+                "completion_tokens": int(counters.get("completion_tokens", 0)),
+                "cached_tokens": int(counters.get("cached_tokens", 0)),
+                "cost": round(cost, 6),
+                "avg_cost_per_call": round(cost / calls, 8) if calls else 0.0,
+                "hedged": hedged,
+                "hedge_rate": round(hedged / hedge_eligible, 4) if hedge_eligible else 0.0,
+                "hedge_wins": int(counters.get("hedge_wins", 0)),
+                "hedge_duplicate_tokens": int(counters.get("hedge_duplicate_tokens", 0)),
+                "hedge_duplicate_cost": round(float(counters.get("hedge_duplicate_cost", 0) or 0), 6),
+                "deadline_exceeded": int(counters.get("deadline_exceeded", 0)),
+                "deployments": deployments,
+            }
+        return routes
+
+    async def reset_stats(self) -> None:
+        redis = await get_redis()
+        keys = [key async for key in redis.scan_iter(match="llm:route_*")]
+        if keys:
+            await redis.delete(*keys)
+        self._latencies.clear()
+
+
+model_router = ModelRouter()
@@ -0,0 +1,412 @@
+# Prompt templates for every LLM call type (static instructions first, request data last)
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Scoring rubric sections shared by the final analysis, the batched evaluation and the map-reduce path
+SCORING_RUBRIC = """1. Overall Score (0-100) and Overall Feedback (60 words) - take into account the following factors:
+
+- Communication Skills: Evaluate the use of language, grammar, and vocabulary. Assess if the interviewee communicated effectively and clearly.
+- Time Taken to Answer: Consider if the interviewee answered promptly or took too long. Note if they were concise or tended to ramble.
+- Confidence: Assess the interviewee's confidence level. Were they assertive and self-assured, or did they seem hesitant and unsure?
+- Clarity: Evaluate the clarity of their answers. Were their responses well-structured and easy to understand?
+- Attitude: Consider the interviewee's attitude towards the interview and questions. Were they positive, respectful, and engaged?
+- Relevance of Answers: Determine if the interviewee's responses are relevant to the questions asked. Assess if they stayed on topic or veered off track.
+- Depth of Knowledge: Evaluate the interviewee's depth of understanding and knowledge in the subject matter. Look for detailed and insightful answers.
+- Problem-Solving Ability: Consider how the interviewee approaches problem-solving questions. Assess their logical reasoning and analytical skills.
+- Examples and Evidence: Note if the interviewee provides concrete examples or evidence to support their answers. This can indicate experience and credibility.
+- Listening Skills: Look for signs that the interviewee is actively listening and responding appropriately to follow-up questions.
+- Consistency: Evaluate if the interviewee's answers are consistent throughout the interview or if they contradict themselves.
+- Adaptability: Assess how well the interviewee adapts to different types of questions, including unexpected or challenging ones.
+
+2. Communication Skills: Score (0-10) and Feedback (60 words). Rating system and guidelines for communication skills is as following.
+
+    - 10: Fully operational command, use of English is appropriate, accurate, fluent, shows complete understanding.
+    - 09: Fully operational command with occasional inaccuracies and inappropriate usage. May misunderstand unfamiliar situations but handles complex arguments well.
+    - 08: Operational command with occasional inaccuracies, inappropriate usage, and misunderstandings. Handles complex language and detailed reasoning well.
+    - 07: Effective command despite some inaccuracies, inappropriate usage, and misunderstandings. Can use and understand reasonably complex language, especially in familiar situations.
+    - 06: Partial command, copes with overall meaning, frequent mistakes. Handles basic communication in their field.
+    - 05: Basic competence limited to familiar situations with frequent problems in understanding and expression.
+    - 04: Understands only general meaning in very familiar situations, with frequent communication breakdowns.
+    - 03: Has great difficulty understanding spoken English.
+    - 02: Has no ability to use the language except a few isolated words.
+    - 01: Did not answer the questions.
+
+3. Satisfaction Score (0-10): Evaluate the candidate's overall satisfaction and engagement level based on their responses, enthusiasm, and interaction quality throughout the interview. Consider factors such as:
+    - Level of enthusiasm and interest shown
+    - Engagement with the interview process
+    - Positive attitude and professionalism
+    - Willingness to participate and provide detailed answers
+    - Overall impression of candidate satisfaction with the opportunity
+
+"""
+
+QUESTION_SUMMARY_RUBRIC = """4. Summary for each main interview question (use the main questions from the transcript):
+
+- Use ONLY the main questions provided in the transcript, it should output all the questions with the numbers even if it's not found in the transcript.
+- Follow the below rules when outputing the question and summary
+    - If a main interview question isn't found in the transcript, then output the main question and give the summary as "Not Asked"
+    - If a main interview question is found in the transcript but an answer couldn't be found, then output the main question and give the summary as "Not Answered"
+    - If a main interview question is found in the transcript and an answer can also be found, then,
+
+        - For each main question (q), provide a summary that includes:
+            a) The candidate's response to the main question
+            b) Any follow-up questions that were asked related to this main question and their answers
+        - The summary should be a cohesive paragraph encompassing all related information for each main question
+
+"""
+
+SOFT_SKILL_RUBRIC = """5. Create a 10 to 15 words summary regarding the soft skills considering factors such as confidence, leadership, adaptability, critical thinking and decision making.
+
+"""
+
+FINAL_ANALYSIS_OUTPUT = """Ensure the output is in valid JSON format with the following structure:
+
+{
+"overallScore": number,
+"overallFeedback": string,
+"communication": { "score": number, "feedback": string },
+"satisfactionScore": number,
+"questionSummaries": [{ "question": string, "summary": string }],
+"softSkillSummary": string
+}
+
+IMPORTANT: Only use the main questions provided. Do not generate or infer additional questions such as follow-up questions."""
+
+FINAL_ANALYSIS_GUIDE = SCORING_RUBRIC + QUESTION_SUMMARY_RUBRIC + SOFT_SKILL_RUBRIC + FINAL_ANALYSIS_OUTPUT
+
+QUESTION_DESIGNER_INTRO = """Imagine you are an interviewer specialized in designing interview questions to help hiring managers find candidates with strong technical expertise and project experience, making it easier to identify the ideal fit for the role."""
+
+# Shared by the predefined question call and the fused interview-setup call
+QUESTION_GUIDELINES = """Follow these detailed guidelines when crafting the questions:
+- Focus on evaluating the candidate's technical knowledge and their experience working on relevant projects. Questions should aim to gauge depth of expertise, problem-solving ability, and hands-on project experience. These aspects carry the most weight.
+- Include questions designed to assess problem-solving skills through practical examples. For instance, how the candidate has tackled challenges in previous projects, and their approach to complex technical issues.
+- Soft skills such as communication, teamwork, and adaptability should be addressed, but given less emphasis compared to technical and problem-solving abilities.
+- Maintain a professional yet approachable tone, ensuring candidates feel comfortable while demonstrating their knowledge.
+- Ask concise and precise open-ended questions that encourage detailed responses. Each question should be 30 words or less for clarity."""
+
+INTERVIEW_DESCRIPTION_GUIDE = """Moreover generate a 50 word or less second-person description about the interview to be shown to the user. It should be in the field 'description'.
+
+CRITICAL REQUIREMENTS FOR DESCRIPTION:
+- Do NOT repeat or paraphrase the objective verbatim
+- Description should be DISTINCT and DIFFERENT from the objective
+- Description should be more conversational and user-friendly (e.g., "In this interview, you'll discuss..." or "This interview focuses on exploring...")
+- If objective is formal/technical, description should be more accessible and clear
+- Description should explain what the candidate will experience, not what the interviewer wants to assess
+- Make it clear to the respondent who's taking the interview what to expect
+- If the objective already explains what will be discussed, the description should add context about format, approach, or what the candidate should prepare"""
+
+ANSWER_EVALUATION_FIELDS = """{"relevance_score": int, "completeness_score": int, "clarity_score": int, "overall_score": int, "strengths": [str], "weaknesses": [str], "suggestions": [str]}"""
+
+TRANSCRIPT_ANALYST = "You are an expert in analyzing interview transcripts. You must only use the main questions provided and not generate or infer additional questions."
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    One LLM call type. `system` and `instructions` never contain request data, so every request
+    of this type starts with the same bytes and qualifies for the provider's prompt-prefix cache;
+    only `data` (a str.format template) varies and is always rendered last.
+    """
+    name: str
+    system: str
+    instructions: str
+    data: str
+    max_tokens: int
+    temperature: float
+    json_response: bool = True
+
+    def render(self, **values) -> List[Dict]:
+        user_content = f"{self.instructions}\n\n###\n{self.data.format(**values)}"
+        messages = [{"role": "user", "content": user_content}]
+        if self.system:
+            messages.insert(0, {"role": "system", "content": self.system})
+        return messages
+
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def _register(template: PromptTemplate) -> PromptTemplate:
+    PROMPT_TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name: str) -> PromptTemplate:
+    try:
+        return PROMPT_TEMPLATES[name]
+    except KeyError:
+        raise KeyError(f"Unknown prompt template '{name}'. Available: {', '.join(sorted(PROMPT_TEMPLATES))}")
+
+
+_register(PromptTemplate(
+    name="predefined_questions",
+    system="You are an expert in coming up with follow up questions to uncover deeper insights.",
+    instructions=QUESTION_DESIGNER_INTRO + """
+
+""" + QUESTION_GUIDELINES + """
+
+Generate exactly the number of questions requested below, using the interview title, job description and context given below.
+
+""" + INTERVIEW_DESCRIPTION_GUIDE + """
+
+The field 'questions' should take the format of an array of objects with the following key: question.
+
+Strictly output only a JSON object with the keys 'questions' and 'description'.""",
+    data="""Interview Title: {interview_name}
+Job Description: {job_description}
+Number of questions to be generated: {question_count}
+
+Context:
+{context_summary}
+
+Questions already chosen for this interview (do not repeat or rephrase them):
+{existing_questions}""",
+    max_tokens=1000,
+    temperature=0.4,
+))
+
+# Background fill of an interview's question pool (services/question_pool_service.py)
+_register(PromptTemplate(
+    name="question_pool",
+    system="You are an expert in coming up with follow up questions to uncover deeper insights.",
+    instructions=QUESTION_DESIGNER_INTRO + """
+
+You are adding questions to a pool from which each candidate's interview is drawn, so every question must stand on its own and no two questions may ask about the same thing.
+
+""" + QUESTION_GUIDELINES + """
+
+Label every question with exactly one category:
+- "technical": technical knowledge and depth of expertise
+- "project_experience": hands-on experience on relevant projects
+- "problem_solving": how the candidate approaches and solves problems, with practical examples
+- "soft_skills": communication, teamwork and adaptability
+
+Generate exactly the number of questions requested below for each category, using the interview title, job description and context given below. Do not repeat or rephrase any of the existing questions listed.
+
+The field 'questions' should take the format of an array of objects with the keys: question, category.
+
+Strictly output only a JSON object with the key 'questions'.""",
+    data="""Interview Title: {interview_name}
+Job Description: {job_description}
+Questions to generate per category: {category_counts}
+
+Context:
+{context_summary}
+
+Existing questions:
+{existing_questions}""",
+    max_tokens=1500,
+    temperature=0.7,
+))
+
+# Interview setup in one call: the JD summary (same keys as summarize_jd) plus the predefined questions
+_register(PromptTemplate(
+    name="jd_summary_and_questions",
+    system="You are an expert in coming up with follow up questions to uncover deeper insights.",
+    instructions=QUESTION_DESIGNER_INTRO + """
+
+First extract the key details of the job description given below into the field 'summary', an object with these exact keys:
+{
+    "summary_text": "One paragraph summary of the role",
+    "skills": ["skill1", "skill2", "skill3"],
+    "experience_years": 5,
+    "role_focus": "backend/frontend/fullstack",
+    "keywords": ["keyword1", "keyword2"],
+    "education": "Degree information if mentioned"
+}
+
+Then generate exactly the number of questions requested below for the interview, based on the job description and your summary.
+
+""" + QUESTION_GUIDELINES + """
+
+""" + INTERVIEW_DESCRIPTION_GUIDE + """
+
+The field 'questions' should take the format of an array of objects with the following key: question.
+
+Strictly output only a JSON object with the keys 'summary', 'questions' and 'description'.""",
+    data="""Interview Title: {interview_name}
+Number of questions to be generated: {question_count}
+
+Job Description:
+{job_description}""",
+    max_tokens=1400,
+    temperature=0.4,
+))
+
+_register(PromptTemplate(
+    name="first_dynamic_question",
+    system="",
+    instructions="""Generate the first interview question for the role described below.
+
+The question should:
+- Welcome the candidate warmly
+- Ask about their background/experience
+- Be conversational and professional
+- Be appropriate for the role level
+
+Return ONLY a JSON object with "question" and "text" fields (both should be the same question text).
+
+Return only the JSON object, no extra text.""",
+    data="""Role:
+{context_summary}""",
+    max_tokens=200,
+    temperature=0.4,
+    json_response=False,
+))
+
+_register(PromptTemplate(
+    name="next_dynamic_question",
+    system="",
+    instructions="""Generate the next interview question based on the job role and previous Q&A given below.
+
+Generate a relevant follow-up question that:
+- Builds on the candidate's previous answers
+- Deepens understanding of their experience/skills
+- Is specific to the role
+- Is professional and conversational
+
+Return ONLY a JSON object with "question" and "text" fields (both contain the same question text).
+
+Return only the JSON object, no extra text.""",
+    data="""Job Role: {context_summary}
+
+Previous Q&A:
+{answers_summary}""",
+    max_tokens=200,
+    temperature=0.5,
+    json_response=False,
+))
+
+_register(PromptTemplate(
+    name="analyze_answer",
+    system="You are an expert in analyzing interview answers.",
+    instructions=f"""Evaluate the answer given below on a 1-10 scale and return JSON:
+{ANSWER_EVALUATION_FIELDS}""",
+    data="""Question: {question}
+Answer: {answer}""",
+    max_tokens=300,
+    temperature=0.3,
+))
+
+_register(PromptTemplate(
+    name="insights",
+    system="You are an expert in uncovering deeper insights from interview question and answer sets.",
+    instructions="""Generate 3 insights from the call summaries given below, highlighting user feedback. Each insight max 25 words. No user names.
+
+Output JSON: {"insights": [string, string, string]}""",
+    data="""Interview Title: {interview_name}
+Job Description: {job_description}
+Interview Description: {interview_description}
+
+Call Summaries:
+{call_summaries}""",
+    max_tokens=300,
+    temperature=0.5,
+))
+
+_register(PromptTemplate(
+    name="final_analysis",
+    system=TRANSCRIPT_ANALYST,
+    instructions=f"""Analyse the interview qa summary given at the end and provide structured feedback.
+Based on the qa summary generate the following analytics in JSON format:
+
+{FINAL_ANALYSIS_GUIDE}""",
+    data="""QA Summary:
+{transcript}""",
+    max_tokens=1500,
+    temperature=0.3,
+))
+
+_register(PromptTemplate(
+    name="batched_evaluation",
+    system=TRANSCRIPT_ANALYST,
+    instructions=f"""Analyse the interview answers given at the end (Q/A pairs numbered by index) and provide structured feedback.
+
+Part A - evaluate every answer individually on a 1-10 scale. Output the field 'answerEvaluations' as an array with one object per index:
+{{"index": int, "relevance_score": int, "completeness_score": int, "clarity_score": int, "overall_score": int, "strengths": [str], "weaknesses": [str], "suggestions": [str]}}
+
+Part B - based on all answers generate the following analytics and add them to the same JSON object:
+
+{FINAL_ANALYSIS_GUIDE}""",
+    data="""Answers:
+{transcript}""",
+    max_tokens=1500,
+    temperature=0.3,
+))
+
+_register(PromptTemplate(
+    name="final_analysis_map",
+    system=TRANSCRIPT_ANALYST,
+    instructions=f"""You are given one part of a longer interview (numbered Q/A pairs at the end). The overall scores are computed later from your output, so do not score the candidate here.
+
+For every numbered question in this part, write a summary following these rules:
+
+{QUESTION_SUMMARY_RUBRIC}Also add the field 'observations': at most 60 words of evidence from this part about the candidate's communication, confidence, clarity, depth of knowledge, problem solving and attitude.
+
+Ensure the output is in valid JSON format with the following structure:
+
+{{
+"questionSummaries": [{{ "question": string, "summary": string }}],
+"observations": string
+}}""",
+    data="""QA Summary (part):
+{transcript}""",
+    max_tokens=900,
+    temperature=0.3,
+))
+
+_register(PromptTemplate(
+    name="final_analysis_reduce",
+    system=TRANSCRIPT_ANALYST,
+    instructions=f"""The interview given at the end has already been condensed into per-question summaries and observations. Based on them generate the following analytics in JSON format:
+
+{SCORING_RUBRIC}{SOFT_SKILL_RUBRIC}Ensure the output is in valid JSON format with the following structure:
+
+{{
+"overallScore": number,
+"overallFeedback": string,
+"communication": {{ "score": number, "feedback": string }},
+"satisfactionScore": number,
+"softSkillSummary": string
+}}""",
+    data="""Question summaries:
+{question_summaries}
+
+Observations:
+{observations}""",
+    max_tokens=600,
+    temperature=0.3,
+))
+
+_register(PromptTemplate(
+    name="fold_answer",
+    system=TRANSCRIPT_ANALYST,
+    instructions=f"""You keep a running evaluation of an interview that is still in progress. You are given the running state so far and the newest question/answer pair (at the end).
+
+1. Evaluate the new answer on its own on a 1-10 scale in the field 'answerEvaluation':
+{ANSWER_EVALUATION_FIELDS}
+
+2. Summarize the new answer in the field 'questionSummary' (at most 60 words): the candidate's response to the question, or "Not Answered" if there is no real answer.
+
+3. Update the running state so it reflects every answer so far, not only the new one:
+- 'runningNotes': at most 120 words of cumulative evidence about communication, confidence, clarity, depth of knowledge, problem solving, attitude and consistency. Keep earlier evidence that still matters.
+- 'runningScores': overall (0-100), communication (0-10) and satisfaction (0-10) for the interview so far, using these guidelines:
+
+{SCORING_RUBRIC}Ensure the output is in valid JSON format with the following structure:
+
+{{
+"answerEvaluation": object,
+"questionSummary": string,
+"runningNotes": string,
+"runningScores": {{ "overall": number, "communication": number, "satisfaction": number }}
+}}""",
+    data="""Answers evaluated so far: {answered}
+Running scores: {running_scores}
+Running notes: {running_notes}
+
+New answer:
+{transcript}""",
+    max_tokens=500,
+    temperature=0.3,
+))
@@ -0,0 +1,315 @@
+# Organization question bank: reuse questions from interviews with a closely matching JD
+
+import asyncio
+import math
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select, update
+from config_loader import load_config
+from db import AsyncSessionLocal
+from models import Interview, QuestionBankEntry, User
+from utils.content_cache import text_key
+from utils.interview_utils import question_text
+from utils.redis_utils import get_redis
+from utils.text_vectors import DEFAULT_DIM, SimilarityIndex, hashing_vector, vector_from_bytes, vector_to_bytes
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_bank_config = load_config().get("question_bank", {}) or {}
+BANK_ENABLED = bool(_bank_config.get("enabled", True))
+DIM = int(_bank_config.get("dim", DEFAULT_DIM))
+# JD cosine similarity from which a previous interview's questions are considered at all
+REUSE_THRESHOLD = float(_bank_config.get("reuse_threshold", 0.6))
+# From this similarity the whole request may come from the bank; below it at most PARTIAL_FRACTION
+FULL_REUSE_THRESHOLD = float(_bank_config.get("full_reuse_threshold", 0.85))
+PARTIAL_FRACTION = float(_bank_config.get("partial_fraction", 0.5))
+# Two questions at or above this similarity are treated as the same question
+DUPLICATE_THRESHOLD = float(_bank_config.get("duplicate_threshold", 0.9))
+MAX_ENTRIES = int(_bank_config.get("max_entries", 20000))
+INDEX_TTL_SECONDS = int(_bank_config.get("index_ttl_seconds", 300))
+SIMILAR_INTERVIEWS = 10
+STATS_KEY = "question_bank:stats"
+
+
+@dataclass
+class _ScopeIndex:
+    built_at: float
+    entry_ids: List[uuid.UUID] = field(default_factory=list)
+    entry_texts: List[str] = field(default_factory=list)
+    entry_interviews: List[Optional[str]] = field(default_factory=list)
+    text_hashes: set = field(default_factory=set)
+    questions: SimilarityIndex = None
+    interview_ids: List[str] = field(default_factory=list)
+    jds: SimilarityIndex = None
+
+
+def _jd_text(job_description: Optional[str], context) -> str:
+    context = context if isinstance(context, dict) else {}
+    parts = [job_description or "", context.get("summary_text") or "", " ".join(context.get("skills") or [])]
+    return "\n".join(p for p in parts if p)
+
+
+class QuestionBankService:
+    """
+    Every generated or manual question is stored in question_bank with a hashed vector. Per
+    organization (the interview's, else its creator's) an in-memory index holds the question vectors
+    and the JD vectors of the interviews they came from. Local inserts are appended to it; it is
+    rebuilt from the database every INDEX_TTL_SECONDS. Interviews without an organization neither
+    reuse nor contribute questions, so nothing is shared across tenants.
+
+    match() picks questions from interviews whose JD is similar to the new one, ranked by that
+    similarity and by the question's own relevance to the new JD, skipping near-duplicates.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, _ScopeIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._user_organizations: Dict[str, Optional[str]] = {}
+
+    async def _scope(self, interview) -> Optional[str]:
+        """The interview's organization id, falling back to its creator's; None if it has neither."""
+        if interview.organization_id:
+            return str(interview.organization_id)
+        if not interview.user_id:
+            return None
+        user_id = str(interview.user_id)
+        if user_id not in self._user_organizations:
+            async with AsyncSessionLocal() as db:
+                organization_id = (await db.execute(
+                    select(User.organization_id).where(User.id == interview.user_id)
+                )).scalar_one_or_none()
+            self._user_organizations[user_id] = str(organization_id) if organization_id else None
+        return self._user_organizations[user_id]
+
+    async def _index(self, scope: str) -> _ScopeIndex:
+        index = self._indexes.get(scope)
+        if index and time.monotonic() - index.built_at < INDEX_TTL_SECONDS:
+            return index
+        lock = self._locks.setdefault(scope, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(scope)
+            if index and time.monotonic() - index.built_at < INDEX_TTL_SECONDS:
+                return index
+            index = await self._build(scope)
+            self._indexes[scope] = index
+            return index
+
+    async def _build(self, scope: str) -> _ScopeIndex:
+        async with AsyncSessionLocal() as db:
+            query = select(
+                QuestionBankEntry.id, QuestionBankEntry.question, QuestionBankEntry.interview_id,
+                QuestionBankEntry.text_hash, QuestionBankEntry.vector,
+            )
+            query = query.where(QuestionBankEntry.organization_id == uuid.UUID(scope))
+            rows = (await db.execute(query.order_by(QuestionBankEntry.created_at.desc()).limit(MAX_ENTRIES))).all()
+            interview_ids = sorted({row.interview_id for row in rows if row.interview_id})
+            interviews = (await db.execute(
+                select(Interview.id, Interview.job_description, Interview.context).where(Interview.id.in_(interview_ids))
+            )).all() if interview_ids else []
+
+        def build() -> _ScopeIndex:
+            return _ScopeIndex(
+                built_at=time.monotonic(),
+                entry_ids=[row.id for row in rows],
+                entry_texts=[row.question for row in rows],
+                entry_interviews=[str(row.interview_id) if row.interview_id else None for row in rows],
+                text_hashes={row.text_hash for row in rows},
+                questions=SimilarityIndex([vector_from_bytes(row.vector, DIM) for row in rows], DIM),
+                interview_ids=[str(i.id) for i in interviews],
+                jds=SimilarityIndex([hashing_vector(_jd_text(i.job_description, i.context), DIM) for i in interviews], DIM),
+            )
+
+        index = await asyncio.to_thread(build)
+        logger.debug(f"Question bank index for scope {scope}: {len(index.questions)} questions, {len(index.jds)} JDs")
+        return index
+
+    async def match(self, interview, count: int, exclude: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Up to `count` questions for this interview from the bank (normalized, fresh ids); fewer or none
+        when no previous JD is similar enough. Records hit-rate statistics.
+        """
+        if not BANK_ENABLED or count <= 0:
+            return []
+        try:
+            scope = await self._scope(interview)
+            if scope is None:
+                return []
+            index = await self._index(scope)
+            picked, entry_ids = await asyncio.to_thread(self._select, index, interview, count, exclude or [])
+        except Exception as e:
+            logger.warning(f"Question bank lookup failed for interview {interview.id}: {e}")
+            return []
+
+        await self._record_stats(count, len(picked))
+        if entry_ids:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(QuestionBankEntry)
+                        .where(QuestionBankEntry.id.in_(entry_ids))
+                        .values(use_count=QuestionBankEntry.use_count + 1)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Failed to update question bank use counts: {e}")
+        return picked
+
+    def _select(self, index: _ScopeIndex, interview, count: int, exclude: List[str]) -> Tuple[List[Dict], List[uuid.UUID]]:
+        if not len(index.jds) or not len(index.questions):
+            return [], []
+        jd_vector = hashing_vector(_jd_text(interview.job_description, interview.context), DIM)
+        similar = {
+            index.interview_ids[i]: score
+            for i, score in index.jds.top(jd_vector, SIMILAR_INTERVIEWS + 1, REUSE_THRESHOLD)
+            if index.interview_ids[i] != str(interview.id)
+        }
+        if not similar:
+            return [], []
+        limit = count if max(similar.values()) >= FULL_REUSE_THRESHOLD else math.floor(count * PARTIAL_FRACTION)
+        if limit <= 0:
+            return [], []
+
+        candidates = [i for i, source in enumerate(index.entry_interviews) if source in similar]
+        relevance = index.questions.scores(jd_vector)
+        ranked = sorted(
+            candidates,
+            key=lambda i: 0.5 * similar[index.entry_interviews[i]] + 0.5 * float(relevance[i]),
+            reverse=True,
+        )
+
+        taken = [index.questions.transform(hashing_vector(text, DIM)) for text in exclude]
+        picked: List[Dict] = []
+        entry_ids: List[uuid.UUID] = []
+        for i in ranked:
+            row = index.questions.matrix[i]
+            if any(float(row @ other) >= DUPLICATE_THRESHOLD for other in taken):
+                continue
+            taken.append(row)
+            picked.append({"id": str(uuid.uuid4()), "question": index.entry_texts[i]})
+            entry_ids.append(index.entry_ids[i])
+            if len(picked) >= limit:
+                break
+        return picked, entry_ids
+
+    async def add_questions(self, interview, questions: List[Dict], source: str = "generated") -> int:
+        """Store questions not already in the bank (exact or near-duplicate). Returns how many were added."""
+        if not BANK_ENABLED or not questions:
+            return 0
+        try:
+            scope = await self._scope(interview)
+            if scope is None:
+                return 0
+            index = await self._index(scope)
+            rows = await asyncio.to_thread(self._new_rows, index, interview, scope, questions, source)
+            if not rows:
+                return 0
+            async with AsyncSessionLocal() as db:
+                db.add_all([QuestionBankEntry(**row) for row in rows])
+                await db.commit()
+            # Matchable right away without re-reading the scope from the database
+            await self._append_to_index(scope, interview, rows)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Failed to add questions to the bank for interview {interview.id}: {e}")
+            return 0
+
+    async def _append_to_index(self, scope: str, interview, rows: List[Dict]) -> None:
+        async with self._locks.setdefault(scope, asyncio.Lock()):
+            index = self._indexes.get(scope)
+            if index is None:
+                return
+
+            def extend() -> _ScopeIndex:
+                # A new index object: matches running in threads keep a consistent view of the old one
+                interview_id = str(interview.id)
+                is_new_interview = interview_id not in index.interview_ids
+                jd_vectors = [hashing_vector(_jd_text(interview.job_description, interview.context), DIM)] if is_new_interview else []
+                return replace(
+                    index,
+                    entry_ids=index.entry_ids + [row["id"] for row in rows],
+                    entry_texts=index.entry_texts + [row["question"] for row in rows],
+                    entry_interviews=index.entry_interviews + [interview_id] * len(rows),
+                    text_hashes=index.text_hashes | {row["text_hash"] for row in rows},
+                    questions=index.questions.extended([vector_from_bytes(row["vector"], DIM) for row in rows]),
+                    interview_ids=index.interview_ids + ([interview_id] if is_new_interview else []),
+                    jds=index.jds.extended(jd_vectors),
+                )
+
+            self._indexes[scope] = await asyncio.to_thread(extend)
+
+    def _new_rows(self, index: _ScopeIndex, interview, scope: str, questions: List[Dict], source: str) -> List[Dict]:
+        rows = []
+        seen = set(index.text_hashes)
+        added_vectors: List[np.ndarray] = []
+        for question in questions:
+            text = (question_text(question) or "").strip()
+            if not text:
+                continue
+            digest = text_key(text)
+            if digest in seen:
+                continue
+            vector = hashing_vector(text, DIM)
+            weighted = index.questions.transform(vector)
+            scores = index.questions.scores(vector)
+            if (scores.size and float(scores.max()) >= DUPLICATE_THRESHOLD) or \
+                    any(float(weighted @ other) >= DUPLICATE_THRESHOLD for other in added_vectors):
+                continue
+            seen.add(digest)
+            added_vectors.append(weighted)
+            rows.append({
+                "id": uuid.uuid4(),
+                "organization_id": uuid.UUID(scope),
+                "interview_id": interview.id,
+                "question": text,
+                "text_hash": digest,
+                "source": source,
+                "vector": vector_to_bytes(vector),
+            })
+        return rows
+
+    async def _record_stats(self, requested: int, from_bank: int) -> None:
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            pipe.hincrby(STATS_KEY, "requests", 1)
+            pipe.hincrby(STATS_KEY, "questions_requested", requested)
+            if from_bank:
+                pipe.hincrby(STATS_KEY, "hits", 1)
+                pipe.hincrby(STATS_KEY, "questions_from_bank", from_bank)
+            if from_bank >= requested:
+                pipe.hincrby(STATS_KEY, "generation_calls_avoided", 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record question bank stats: {e}")
+
+    async def get_stats(self) -> Dict:
+        redis = await get_redis()
+        raw = await redis.hgetall(STATS_KEY)
+        stats = {(k.decode("utf-8") if isinstance(k, bytes) else k): int(v) for k, v in raw.items()}
+        requests = stats.get("requests", 0)
+        requested = stats.get("questions_requested", 0)
+        async with AsyncSessionLocal() as db:
+            entries = (await db.execute(select(func.count(QuestionBankEntry.id)))).scalar() or 0
+        return {
+            "enabled": BANK_ENABLED,
+            "entries": entries,
+            "requests": requests,
+            "hits": stats.get("hits", 0),
+            "hit_rate": round(stats.get("hits", 0) / requests, 4) if requests else 0.0,
+            "questions_requested": requested,
+            "questions_from_bank": stats.get("questions_from_bank", 0),
+            "question_reuse_rate": round(stats.get("questions_from_bank", 0) / requested, 4) if requested else 0.0,
+            "generation_calls_avoided": stats.get("generation_calls_avoided", 0),
+            "indexed_scopes": {scope: len(index.questions) for scope, index in self._indexes.items()},
+        }
+
+    async def reset_stats(self) -> None:
+        redis = await get_redis()
+        await redis.delete(STATS_KEY)
+
+
+question_bank_service = QuestionBankService()
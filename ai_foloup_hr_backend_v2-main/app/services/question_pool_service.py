@@ -0,0 +1,303 @@
+# Per-interview question pools: background generation, deterministic per-response sampling, TTS warm-up
+
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from config_loader import load_config
+from db import AsyncSessionLocal
+from models import Interview, ResponseQuestion
+from services.llm_service import llm_service
+from services.summarization_service import summarization_service
+from utils.content_cache import normalize_text
+from utils.interview_utils import get_questions_list, get_voice_id, normalize_question, warm_tts
+from utils.job_queue import enqueue, register_handler
+from utils.redis_utils import acquire_lock, get_redis, release_lock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+POOL_QUEUE = "analysis"
+
+_pool_config = load_config().get("question_pool", {}) or {}
+# Opt-in: pooled candidates are asked questions HR never reviewed, not the interview's own set
+POOL_ENABLED = bool(_pool_config.get("enabled", False))
+# Pool size is SIZE_MULTIPLIER x question_count, clamped to [MIN_SIZE, MAX_SIZE]
+SIZE_MULTIPLIER = float(_pool_config.get("size_multiplier", 3))
+MIN_SIZE = int(_pool_config.get("min_size", 10))
+MAX_SIZE = int(_pool_config.get("max_size", 60))
+# A question is replaced once this many candidates have been asked it
+RETIRE_AFTER_SERVES = int(_pool_config.get("retire_after_serves", 25))
+# Refill once fewer than LOW_WATER_MULTIPLIER x question_count questions are still in rotation
+LOW_WATER_MULTIPLIER = float(_pool_config.get("low_water_multiplier", 2))
+GENERATION_BATCH = int(_pool_config.get("generation_batch", 12))
+PRECOMPUTE_TTS = bool(_pool_config.get("precompute_tts", True))
+# Share of each sampled set per category; mirrors the emphasis of the question-writing guidelines
+CATEGORY_WEIGHTS: Dict[str, float] = dict(_pool_config.get("category_weights") or {
+    "technical": 0.4,
+    "project_experience": 0.25,
+    "problem_solving": 0.25,
+    "soft_skills": 0.1,
+})
+FILL_LOCK_SECONDS = 300
+FILL_DEDUP_SECONDS = 60
+MAX_FILL_ROUNDS = 4
+USAGE_KEPT = 20
+TTS_CONCURRENCY = 4
+# llm_generated_questions["source"] of a question set HR edited by hand: every candidate gets exactly
+# that set, so the interview is not pooled until its questions are generated again
+HR_EDITED_SOURCE = "hr_edited"
+
+
+def _served_key(interview_id: str) -> str:
+    return f"question_pool:served:{interview_id}"
+
+def _retired_key(interview_id: str) -> str:
+    return f"question_pool:retired:{interview_id}"
+
+
+def _quotas(count: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """Split `count` across categories by weight (largest remainder), at least one each when it fits."""
+    weights = {c: w for c, w in weights.items() if w > 0}
+    if not weights or count <= 0:
+        return {}
+    total = sum(weights.values())
+    base = 1 if count >= len(weights) else 0
+    spare = count - base * len(weights)
+    exact = {c: spare * w / total for c, w in weights.items()}
+    quotas = {c: base + int(exact[c]) for c in weights}
+    remainder = count - sum(quotas.values())
+    for c in sorted(weights, key=lambda c: exact[c] - int(exact[c]), reverse=True)[:remainder]:
+        quotas[c] += 1
+    return quotas
+
+
+def sample_questions(pool: List[Dict], count: int, seed: str) -> List[Dict]:
+    """
+    Draw `count` questions from the pool with per-category quotas. The same (pool, count, seed)
+    always gives the same set, so a response's set can be recomputed from its id.
+    """
+    rng = random.Random(seed)
+    by_category: Dict[str, List[Dict]] = {}
+    for question in pool:
+        by_category.setdefault(question.get("category") or "technical", []).append(question)
+    quotas = _quotas(count, {c: w for c, w in CATEGORY_WEIGHTS.items() if by_category.get(c)})
+
+    chosen: Dict[str, List[Dict]] = {}
+    for category, quota in quotas.items():
+        candidates = list(by_category[category])
+        rng.shuffle(candidates)
+        chosen[category] = candidates[:quota]
+
+    picked_ids = {q["id"] for questions in chosen.values() for q in questions}
+    if len(picked_ids) < count:
+        # Categories short of their quota are topped up from the rest of the pool
+        rest = [q for q in pool if q["id"] not in picked_ids]
+        rng.shuffle(rest)
+        for question in rest[:count - len(picked_ids)]:
+            chosen.setdefault(question.get("category") or "technical", []).append(question)
+
+    # Interview flow follows the category order: technical depth first, soft skills last
+    order = list(CATEGORY_WEIGHTS) + [c for c in chosen if c not in CATEGORY_WEIGHTS]
+    return [q for category in order for q in chosen.get(category, [])]
+
+
+class QuestionPoolService:
+    """
+    Interview.question_pool holds a pre-generated pool of predefined questions:
+
+        {"questions": [{"id", "question", "category"}], "target_size", "generated_at", "_usage": [...]}
+
+    Each response gets its own set, sampled from the pool with the response id as seed and
+    stored in response_question at start-interview, so selection needs no LLM call. Serve counts
+    live in Redis; questions asked RETIRE_AFTER_SERVES times are swapped out by the next refill.
+    """
+
+    def hr_edited(self, interview) -> bool:
+        prepared = interview.llm_generated_questions
+        return isinstance(prepared, dict) and prepared.get("source") == HR_EDITED_SOURCE
+
+    def eligible(self, interview) -> bool:
+        # Same condition under which /generate-questions generates the interview's questions,
+        # as long as HR has not replaced the generated set with their own
+        return (
+            POOL_ENABLED
+            and interview.question_mode == "predefined"
+            and bool(interview.auto_question_generate or not interview.manual_questions)
+            and not self.hr_edited(interview)
+        )
+
+    def target_size(self, interview) -> int:
+        return max(MIN_SIZE, min(MAX_SIZE, int(round((interview.question_count or 5) * SIZE_MULTIPLIER))))
+
+    def pool_questions(self, interview) -> List[Dict]:
+        pool = interview.question_pool if isinstance(interview.question_pool, dict) else {}
+        return list(pool.get("questions") or [])
+
+    async def schedule_fill(self, interview_id: str) -> None:
+        try:
+            redis = await get_redis()
+            if not await redis.set(f"question_pool:scheduled:{interview_id}", b"1", nx=True, ex=FILL_DEDUP_SECONDS):
+                return
+            await enqueue(POOL_QUEUE, "fill_question_pool", {"interview_id": str(interview_id)})
+        except Exception as e:
+            logger.warning(f"Failed to schedule question pool fill for interview {interview_id}: {e}")
+
+    def sample_for_interview(self, interview, count: int) -> Optional[List[Dict]]:
+        """A fresh set for the interview itself (e.g. /generate-questions), or None if the pool is too small."""
+        pool = self.pool_questions(interview)
+        if not self.eligible(interview) or count <= 0 or len(pool) < count:
+            return None
+        return [normalize_question(q) for q in sample_questions(pool, count, uuid.uuid4().hex)]
+
+    async def assign_response_questions(self, db, interview, response_id) -> Optional[List[Dict]]:
+        """
+        Sample this response's set from the pool and insert it into response_question (committed by
+        the caller). Returns None, leaving the interview's own set in use, when there is no usable pool.
+        """
+        if not self.eligible(interview):
+            return None
+        count = len(get_questions_list(interview)) or interview.question_count or 0
+        pool = self.pool_questions(interview)
+        if count <= 0 or len(pool) < count:
+            if interview.llm_generated_questions:
+                await self.schedule_fill(str(interview.id))
+            return None
+
+        questions = [normalize_question(q) for q in sample_questions(pool, count, str(response_id))]
+        await db.execute(
+            pg_insert(ResponseQuestion)
+            .values([
+                {"response_id": response_id, "position": position, "question": question}
+                for position, question in enumerate(questions)
+            ])
+            .on_conflict_do_nothing(index_elements=["response_id", "position"])
+        )
+        await self._record_serves(interview, [q["id"] for q in questions], len(pool), count)
+        return questions
+
+    async def _record_serves(self, interview, question_ids: List[str], pool_size: int, count: int) -> None:
+        interview_id = str(interview.id)
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            for question_id in question_ids:
+                pipe.hincrby(_served_key(interview_id), question_id, 1)
+            served = await pipe.execute()
+            newly_retired = sum(1 for serves in served if serves == RETIRE_AFTER_SERVES)
+            retired = await redis.incrby(_retired_key(interview_id), newly_retired) if newly_retired else \
+                int(await redis.get(_retired_key(interview_id)) or 0)
+            if pool_size - retired < count * LOW_WATER_MULTIPLIER:
+                await self.schedule_fill(interview_id)
+        except Exception as e:
+            logger.warning(f"Failed to record question pool serves for interview {interview_id}: {e}")
+
+    async def fill(self, interview_id: str) -> Optional[Dict]:
+        token = await acquire_lock(f"question_pool:{interview_id}", FILL_LOCK_SECONDS)
+        if not token:
+            return None
+        try:
+            return await self._fill_locked(interview_id)
+        finally:
+            await release_lock(f"question_pool:{interview_id}", token)
+
+    async def _fill_locked(self, interview_id: str) -> Optional[Dict]:
+        async with AsyncSessionLocal() as db:
+            interview = (await db.execute(select(Interview).where(Interview.id == interview_id))).scalar_one_or_none()
+            if not interview or not self.eligible(interview) or not interview.context:
+                return None
+            pool = dict(interview.question_pool) if isinstance(interview.question_pool, dict) else {}
+            question_count = interview.question_count
+            job_description = interview.job_description
+            interview_name = interview.name or ""
+            context_summary = summarization_service.get_context_for_llm(interview.context)
+            target = self.target_size(interview)
+            voice_id = await get_voice_id(db, interview) if PRECOMPUTE_TTS else None
+
+        redis = await get_redis()
+        served = {
+            (k.decode("utf-8") if isinstance(k, bytes) else k): int(v)
+            for k, v in (await redis.hgetall(_served_key(interview_id))).items()
+        }
+        kept = [q for q in pool.get("questions") or [] if served.get(q["id"], 0) < RETIRE_AFTER_SERVES]
+        retired_ids = [q["id"] for q in pool.get("questions") or [] if served.get(q["id"], 0) >= RETIRE_AFTER_SERVES]
+        seen = {normalize_text(q["question"]) for q in kept}
+        added: List[Dict] = []
+        usages = list(pool.get("_usage") or [])
+
+        for _ in range(MAX_FILL_ROUNDS):
+            need = min(target - len(kept) - len(added), GENERATION_BATCH)
+            if need <= 0:
+                break
+            generated, usage = await llm_service.generate_pool_questions(
+                context_summary, _quotas(need, CATEGORY_WEIGHTS), [q["question"] for q in kept + added],
+                job_description or "", interview_name,
+            )
+            if usage:
+                usages.append(usage)
+            fresh = [q for q in generated if normalize_text(q["question"]) not in seen][:need]
+            if not fresh:
+                break
+            seen.update(normalize_text(q["question"]) for q in fresh)
+            added.extend(fresh)
+
+        if not added and not retired_ids:
+            return pool
+
+        pool = {
+            "questions": kept + added,
+            "target_size": target,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "_usage": usages[-USAGE_KEPT:],
+        }
+        async with AsyncSessionLocal() as db:
+            # Only if HR has not changed the set-up since the pool was read (edits reset the pool)
+            result = await db.execute(
+                update(Interview)
+                .where(Interview.id == interview_id)
+                .where(Interview.question_mode == "predefined")
+                .where(Interview.llm_generated_questions["source"].astext.is_distinct_from(HR_EDITED_SOURCE))
+                .where(Interview.question_count == question_count)
+                .where(Interview.job_description.is_not_distinct_from(job_description))
+                .values(question_pool=pool)
+            )
+            await db.commit()
+        if not result.rowcount:
+            logger.info(f"Interview {interview_id} changed while its question pool was filled; discarded")
+            return None
+
+        pipe = redis.pipeline()
+        if retired_ids:
+            pipe.hdel(_served_key(interview_id), *retired_ids)
+        pipe.delete(_retired_key(interview_id))
+        await pipe.execute()
+        logger.info(f"Question pool for interview {interview_id}: {len(added)} added, {len(retired_ids)} retired, {len(pool['questions'])} total")
+
+        if PRECOMPUTE_TTS and added:
+            await self._warm_tts(added, voice_id)
+        return pool
+
+    async def _warm_tts(self, questions: List[Dict], voice_id: Optional[str]) -> None:
+        """Synthesize new pool questions ahead of time; synthesize_tts caches the audio by content."""
+        await warm_tts([q["question"] for q in questions], voice_id, TTS_CONCURRENCY)
+
+    async def reset(self, interview) -> None:
+        """Drop the pool and its serve counts (the interview's question set-up changed)."""
+        interview.question_pool = None
+        try:
+            redis = await get_redis()
+            await redis.delete(_served_key(str(interview.id)), _retired_key(str(interview.id)))
+        except Exception as e:
+            logger.warning(f"Failed to clear question pool counters for interview {interview.id}: {e}")
+
+
+question_pool_service = QuestionPoolService()
+
+
+async def _handle_fill_question_pool(payload: dict) -> None:
+    await question_pool_service.fill(payload["interview_id"])
+
+
+register_handler("fill_question_pool", _handle_fill_question_pool)
@@ -1,10 +1,35 @@
 # Service layer for question-related business logic
 
-from typing import Dict, List, Optional, Tuple
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm.attributes import flag_modified
-from utils.interview_utils import normalize_question, get_questions_list
+from models import ResponseQuestion
+from utils.interview_utils import normalize_question, get_response_questions, question_text
 from services.summarization_service import summarization_service
 from services.llm_service import llm_service
+from services.question_pool_service import question_pool_service
+from services.question_bank_service import question_bank_service
+from services.model_routing import LLMDeadlineExceeded
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Served when a dynamic question misses its LLM deadline and no unused manual question is left
+GENERIC_FIRST_QUESTION = "To start, could you walk me through your background and the experience most relevant to this role?"
+GENERIC_FOLLOW_UP_QUESTIONS = [
+    "Could you walk me through a recent project you are proud of and the part you personally owned?",
+    "Tell me about a difficult problem you faced at work and how you approached solving it.",
+    "Describe a time you had to learn something new quickly. How did you go about it?",
+    "How do you handle disagreements with teammates about technical or project decisions?",
+    "What would you focus on in your first few months if you joined this team?",
+]
+
+# llm_generated_questions["source"] for questions generated together with the JD summary at creation
+FUSED_SETUP_SOURCE = "fused_setup"
+# ... and for questions copied from an interview template
+TEMPLATE_SOURCE = "template"
 
 
 class QuestionService:
@@ -22,6 +47,46 @@ class QuestionService:
             flag_modified(model, field_name)
         await db.commit()
     
+    @staticmethod
+    async def take_prepared_questions(interview, db, target_count: int) -> Optional[List[Dict]]:
+        """
+        A question set that needs no LLM call: the one generated by create-interview in the same call
+        as the JD summary or copied from a template (first request only), else a fresh draw from the
+        interview's question pool.
+        """
+        prepared = interview.llm_generated_questions if isinstance(interview.llm_generated_questions, dict) else {}
+        if (prepared.get("source") in (FUSED_SETUP_SOURCE, TEMPLATE_SOURCE) and not prepared.get("served")
+                and len(prepared.get("questions") or []) >= target_count):
+            # Later requests regenerate, as they did before the questions were prepared at creation
+            questions = prepared["questions"][:target_count]
+            interview.llm_generated_questions = {**prepared, "questions": questions, "served": True}
+            await QuestionService.commit_changes(db, interview, 'llm_generated_questions')
+            await question_pool_service.schedule_fill(str(interview.id))
+            await question_bank_service.add_questions(interview, questions, "generated")
+            return questions
+
+        sampled = question_pool_service.sample_for_interview(interview, target_count)
+        if sampled:
+            return await QuestionService.store_predefined_questions(interview, db, {"questions": sampled}, target_count)
+        return None
+
+    @staticmethod
+    async def store_predefined_questions(interview, db, result: Dict, target_count: int) -> List[Dict]:
+        usage = result.get('_usage') if isinstance(result, dict) else None
+        questions = [normalize_question(q) for q in result.get('questions', [])[:target_count]]
+        
+        metadata = {"questions": questions}
+        if usage and isinstance(usage, dict):
+            metadata["_usage"] = {"predefined_generation": [usage]}
+        if result.get("bank_questions"):
+            metadata["bank_questions"] = result["bank_questions"]
+        interview.llm_generated_questions = metadata
+        await QuestionService.commit_changes(db, interview, 'llm_generated_questions')
+        # The pool is built in the background once the interview has questions to review
+        await question_pool_service.schedule_fill(str(interview.id))
+        await question_bank_service.add_questions(interview, questions, "generated")
+        return questions
+
     @staticmethod
     async def handle_predefined_questions(
         interview, 
@@ -29,24 +94,69 @@ class QuestionService:
         target_count: int, 
         context_for_llm: str
     ) -> Tuple[List[Dict], Optional[str]]:
+        prepared = await QuestionService.take_prepared_questions(interview, db, target_count)
+        if prepared is not None:
+            return prepared, None
+
         # difficulty = QuestionService.get_difficulty_level(interview)
         job_description = interview.job_description or ""
         name = interview.name or ""
         
-        result = await llm_service._generate_predefined_questions(
-            context_for_llm, target_count, job_description, name
-        )
-        
-        usage = result.get('_usage') if isinstance(result, dict) else None
-        questions = [normalize_question(q) for q in result.get('questions', [])[:target_count]]
-        
-        metadata = {"questions": questions}
-        if usage and isinstance(usage, dict):
-            metadata["_usage"] = {"predefined_generation": [usage]}
-        interview.llm_generated_questions = metadata
-        await QuestionService.commit_changes(db, interview, 'llm_generated_questions')
+        # Questions from earlier interviews with a closely matching JD; the LLM only writes the rest
+        bank = await question_bank_service.match(interview, target_count)
+        if len(bank) >= target_count:
+            result = {"questions": bank}
+        else:
+            result = await llm_service._generate_predefined_questions(
+                context_for_llm, target_count - len(bank), job_description, name,
+                existing_questions=[q["question"] for q in bank],
+            )
+            result["questions"] = bank + (result.get("questions") or [])
+        result["bank_questions"] = len(bank)
+        questions = await QuestionService.store_predefined_questions(interview, db, result, target_count)
         
         return questions, None
+
+    @staticmethod
+    async def stream_predefined_questions(
+        interview,
+        db,
+        target_count: int,
+        context_for_llm: str
+    ) -> AsyncIterator[Dict]:
+        """
+        Streaming handle_predefined_questions: yields {"question": dict} per question as it is generated,
+        then {"questions": [...]} once the full set has been stored on the interview.
+        """
+        prepared = await QuestionService.take_prepared_questions(interview, db, target_count)
+        if prepared is not None:
+            for question in prepared:
+                yield {"question": question}
+            yield {"questions": prepared}
+            return
+
+        bank = [normalize_question(q) for q in await question_bank_service.match(interview, target_count)]
+        for question in bank:
+            yield {"question": question}
+        if len(bank) >= target_count:
+            questions = await QuestionService.store_predefined_questions(
+                interview, db, {"questions": bank, "bank_questions": len(bank)}, target_count
+            )
+            yield {"questions": questions}
+            return
+
+        events = llm_service.stream_predefined_questions(
+            context_for_llm, target_count - len(bank), interview.job_description or "", interview.name or "",
+            existing_questions=[q["question"] for q in bank],
+        )
+        async for event in events:
+            if "question" in event:
+                yield {"question": normalize_question(event["question"])}
+            elif "result" in event:
+                result = {**event["result"], "bank_questions": len(bank)}
+                result["questions"] = bank + (result.get("questions") or [])
+                questions = await QuestionService.store_predefined_questions(interview, db, result, target_count)
+                yield {"questions": questions}
     
     @staticmethod
     async def handle_manual_questions(
@@ -59,53 +169,73 @@ class QuestionService:
         
         interview.llm_generated_questions = {"questions": questions}
         await QuestionService.commit_changes(db, interview, 'llm_generated_questions')
+        await question_bank_service.add_questions(interview, questions, "manual")
         
         return questions
     
     @staticmethod
-    def ensure_llm_questions_structure(interview):
-        if not interview.llm_generated_questions:
-            interview.llm_generated_questions = {"questions": []}
-        elif not isinstance(interview.llm_generated_questions, dict):
-            interview.llm_generated_questions = {"questions": []}
-        elif "questions" not in interview.llm_generated_questions:
-            interview.llm_generated_questions["questions"] = []
+    async def add_dynamic_question(
+        db,
+        response_id,
+        position: int,
+        question: Dict
+    ) -> Dict:
+        """
+        Append a dynamic question to the response's own question list (one INSERT, the interview row is
+        never written). If a concurrent request already stored this position, that question wins and
+        is returned instead, so the candidate and the transcript agree on what was asked.
+        """
+        usage = question.get("_usage") if isinstance(question, dict) else None
+        stored = (await db.execute(
+            pg_insert(ResponseQuestion)
+            .values(
+                response_id=response_id,
+                position=position,
+                question=normalize_question(question),
+                usage=usage if isinstance(usage, dict) and usage else None,
+            )
+            .on_conflict_do_nothing(index_elements=["response_id", "position"])
+            .returning(ResponseQuestion.question)
+        )).scalar_one_or_none()
+        await db.commit()
+        if stored is None:
+            stored = (await db.execute(
+                select(ResponseQuestion.question)
+                .where(ResponseQuestion.response_id == response_id)
+                .where(ResponseQuestion.position == position)
+            )).scalar_one()
+        return stored
     
     @staticmethod
-    async def add_dynamic_question_to_interview(
-        interview, 
-        db, 
-        question: Dict
-    ) -> None:
-        QuestionService.ensure_llm_questions_structure(interview)
-        
-        normalized_q = normalize_question(question)
-        existing_questions = interview.llm_generated_questions.get("questions", [])
-        existing_questions.append(normalized_q)
-        interview.llm_generated_questions["questions"] = existing_questions
-        
-        usage = None
-        if isinstance(question, dict):
-            usage = question.get("_usage")
-        if usage and isinstance(usage, dict):
-            usage_container = interview.llm_generated_questions.setdefault("_usage", {})
-            usage_container.setdefault("dynamic_generation", []).append(usage)
-            
-        await QuestionService.commit_changes(db, interview, 'llm_generated_questions')
+    def fallback_question(interview, asked_questions: List[Dict], first: bool = False) -> Dict:
+        """Next unused manual question, else a generic question that has not been asked yet."""
+        asked = {(question_text(q) or "").strip().lower() for q in asked_questions}
+        manual_list = interview.manual_questions if isinstance(interview.manual_questions, list) else []
+        candidates = [question_text(normalize_question(q)) for q in manual_list]
+        candidates += [GENERIC_FIRST_QUESTION] if first else GENERIC_FOLLOW_UP_QUESTIONS
+        text = next(
+            (c for c in candidates if c and c.strip().lower() not in asked),
+            candidates[-1],
+        )
+        return {"id": str(uuid.uuid4()), "question": text, "text": text, "fallback": True}
     
     @staticmethod
     async def generate_first_dynamic_question(
         interview, 
         db, 
-        context_for_llm: str
+        context_for_llm: str,
+        response_id
     ) -> Optional[Dict]:
         # difficulty_level = QuestionService.get_difficulty_level(interview)
-        generated = await llm_service._generate_dynamic_question(context_for_llm)
+        try:
+            generated = await llm_service._generate_dynamic_question(context_for_llm)
+        except LLMDeadlineExceeded as e:
+            logger.warning(f"{e}; serving fallback first question for response {response_id}")
+            generated = [QuestionService.fallback_question(interview, [], first=True)]
         
         if generated:
             first_q = generated[0] if isinstance(generated, list) else generated
-            await QuestionService.add_dynamic_question_to_interview(interview, db, first_q)
-            return first_q
+            return await QuestionService.add_dynamic_question(db, response_id, 0, first_q)
         
         return None
     
@@ -113,16 +243,22 @@ class QuestionService:
     async def generate_next_dynamic_question(
         interview, 
         db, 
-        previous_answers: List[Dict]
+        previous_answers: List[Dict],
+        response_id,
+        position: int
     ) -> Optional[Dict]:
-        next_question = await llm_service.generate_next_dynamic_question(
-            str(interview.id),
-            previous_answers
-        )
+        try:
+            next_question = await llm_service.generate_next_dynamic_question(
+                str(interview.id),
+                previous_answers
+            )
+        except LLMDeadlineExceeded as e:
+            logger.warning(f"{e}; serving fallback question for response {response_id}")
+            asked = await get_response_questions(db, response_id)
+            next_question = QuestionService.fallback_question(interview, asked)
         
         if next_question and not next_question.get("error"):
-            await QuestionService.add_dynamic_question_to_interview(interview, db, next_question)
-            return next_question
+            return await QuestionService.add_dynamic_question(db, response_id, position, next_question)
         
         return next_question  
 
@@ -0,0 +1,149 @@
+# Streams the current question to the candidate: LLM text deltas and sentence-by-sentence TTS audio
+
+import asyncio
+import base64
+from typing import Awaitable, Callable, Optional
+from db import AsyncSessionLocal
+from services.llm_service import llm_service
+from services.model_routing import LLMDeadlineExceeded
+from services.question_service import QuestionService
+from services.speculation_service import speculation_service
+from services.tts_service import tts_service
+from utils.interview_utils import get_interview_or_404, get_response_or_404, load_questions_list, get_voice_id, question_text
+from utils.stream_utils import SentenceBuffer
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Emit = Callable[[str, dict], Awaitable[None]]
+
+
+class QuestionStreamService:
+    """
+    Streaming counterpart of GET /get-current-question.
+
+    Events emitted (all carry response_id):
+      question_text_delta     {"text"}                      question text as the LLM produces it
+      question_ready          get-current-question payload   full question, emitted once text is complete
+      question_audio_chunk    {"seq", "sentence", "audio_base64", "content_type"}
+      question_audio_complete {"chunks"}
+      question_stream_error   {"error"}
+    """
+
+    async def stream_current_question(self, response_id: str, emit: Emit) -> None:
+        sentences: asyncio.Queue = asyncio.Queue()
+        speaker: Optional[asyncio.Task] = None
+        try:
+            async with AsyncSessionLocal() as db:
+                response = await get_response_or_404(db, response_id)
+                interview = await get_interview_or_404(db, str(response.interview_id))
+                questions = await load_questions_list(db, interview, response)
+                index = response.current_question_index or 0
+                dynamic = interview.question_mode == "dynamic"
+                total_questions = interview.question_count if dynamic else len(questions)
+
+                if (dynamic and index >= interview.question_count) or (not dynamic and questions and index >= len(questions)):
+                    await emit("question_ready", {
+                        "ok": True, "complete": True, "mode": interview.question_mode, "response_id": response_id
+                    })
+                    return
+
+                voice_id = await get_voice_id(db, interview)
+                speaker = asyncio.create_task(self._speak(response_id, sentences, voice_id, emit))
+                splitter = SentenceBuffer()
+                speculative = False
+
+                if dynamic and index >= len(questions):
+                    previous_answers = response.qa_history or []
+                    question = None
+                    if previous_answers:
+                        last_answer = previous_answers[-1].get("answer", "") if isinstance(previous_answers[-1], dict) else ""
+                        question = await speculation_service.take(response_id, index, last_answer)
+                        speculative = question is not None
+
+                    if question is None:
+                        if previous_answers:
+                            events = llm_service.stream_next_dynamic_question(str(interview.id), previous_answers)
+                        else:
+                            events = llm_service.stream_first_dynamic_question(QuestionService.safe_get_context(interview))
+                        try:
+                            async for event in events:
+                                if "delta" in event:
+                                    await emit("question_text_delta", {"response_id": response_id, "text": event["delta"]})
+                                    for sentence in splitter.push(event["delta"]):
+                                        sentences.put_nowait(sentence)
+                                else:
+                                    question = event["question"]
+                        except LLMDeadlineExceeded as e:
+                            # Raised before the first delta, so nothing has been spoken yet
+                            logger.warning(f"{e}; serving fallback question for response {response_id}")
+                            question = QuestionService.fallback_question(interview, questions, first=not previous_answers)
+
+                    if question and (speculative or question.get("fallback")):
+                        # Not streamed from the LLM: send the whole text at once
+                        await emit("question_text_delta", {"response_id": response_id, "text": question_text(question)})
+                        for sentence in splitter.push(question_text(question)):
+                            sentences.put_nowait(sentence)
+
+                    if not question or not question_text(question):
+                        raise ValueError("Failed to generate question")
+                    current_question = await QuestionService.add_dynamic_question(db, response.id, index, question)
+                else:
+                    if index >= len(questions) or not questions[index]:
+                        raise ValueError("No questions available for this interview")
+                    current_question = questions[index]
+                    await emit("question_text_delta", {"response_id": response_id, "text": question_text(current_question)})
+                    for sentence in splitter.push(question_text(current_question)):
+                        sentences.put_nowait(sentence)
+
+                for sentence in splitter.flush():
+                    sentences.put_nowait(sentence)
+                sentences.put_nowait(None)
+
+                ready = {
+                    "ok": True,
+                    "response_id": response_id,
+                    "current_question": current_question,
+                    "question_number": index + 1,
+                    "total_questions": total_questions,
+                    "mode": interview.question_mode,
+                }
+                if dynamic:
+                    ready["speculative"] = speculative
+                await emit("question_ready", ready)
+
+            await speaker
+        except Exception as e:
+            logger.error(f"Question stream failed for response {response_id}: {type(e).__name__}: {e}", exc_info=True)
+            if speaker and not speaker.done():
+                speaker.cancel()
+            detail = getattr(e, "detail", None) or str(e)
+            await emit("question_stream_error", {"response_id": response_id, "error": detail})
+
+    async def _speak(self, response_id: str, sentences: asyncio.Queue, voice_id: Optional[str], emit: Emit) -> None:
+        """Synthesize queued sentences in order, forwarding audio chunks as they arrive."""
+        seq = 0
+        sentence_index = 0
+        while True:
+            sentence = await sentences.get()
+            if sentence is None:
+                break
+            try:
+                async for chunk in tts_service.stream_synthesize(sentence, voice_id=voice_id):
+                    await emit("question_audio_chunk", {
+                        "response_id": response_id,
+                        "seq": seq,
+                        "sentence": sentence_index,
+                        "audio_base64": base64.b64encode(chunk).decode("ascii"),
+                        "content_type": "audio/mpeg",
+                    })
+                    seq += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Streaming TTS failed for response {response_id}, sentence {sentence_index}: {e}")
+            sentence_index += 1
+        await emit("question_audio_complete", {"response_id": response_id, "chunks": seq})
+
+
+question_stream_service = QuestionStreamService()
@@ -0,0 +1,293 @@
+# Bulk re-analysis of an interview's responses (background job with progress tracking)
+
+import asyncio
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, select, func, or_, update
+from sqlalchemy.dialects.postgresql import JSONB
+from config_loader import load_config
+from db import AsyncSessionLocal
+from models import Response
+from services.analysis_service import analysis_service, ANALYSIS_COMPLETE
+from services.insights_service import insights_service
+from utils.cost_utils import calculate_response_cost
+from utils.job_queue import enqueue, register_handler
+from utils.rate_limiter import RateLimiter
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REANALYSIS_QUEUE = "reanalysis"
+
+_reanalysis_config = load_config().get("reanalysis", {}) or {}
+DB_BATCH_SIZE = int(_reanalysis_config.get("db_batch_size", 50))
+CONCURRENCY = int(_reanalysis_config.get("concurrency", 4))
+# Bulk work gets its own budget so it cannot starve live-interview LLM traffic
+LLM_REQUESTS_PER_MINUTE = float(_reanalysis_config.get("llm_requests_per_minute", 120))
+STATUS_TTL_SECONDS = 7 * 24 * 3600
+FAILURES_KEPT = 500
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+def _status_key(job_id: str) -> str:
+    return f"reanalysis:{job_id}"
+
+def _failures_key(job_id: str) -> str:
+    return f"reanalysis:{job_id}:failures"
+
+def _active_key(interview_id: str) -> str:
+    return f"reanalysis:active:{interview_id}"
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+def _filtered_query(query, interview_id: str, filters: Dict):
+    query = query.where(Response.interview_id == interview_id)
+    if filters.get("completed_only", True):
+        query = query.where(Response.is_completed == True)
+    if filters.get("statuses"):
+        query = query.where(Response.status.in_(filters["statuses"]))
+    if filters.get("response_ids"):
+        query = query.where(Response.id.in_(filters["response_ids"]))
+    if filters.get("missing_only"):
+        query = query.where(or_(Response.overall_analysis.is_(None), Response.overall_analysis == {}))
+    return query
+
+
+class ReanalysisService:
+    """
+    Re-runs the final analysis for every response of an interview matching a filter, e.g. after a
+    rubric change. Responses are read in keyset-paginated batches of DB_BATCH_SIZE, analysed with at
+    most CONCURRENCY analyses in flight (each charged to the shared bulk LLM rate limiter for every
+    LLM call it makes) and written back with one executemany UPDATE per batch. A response whose
+    qa_history changed while it was analysed (answers still arriving) is left untouched. Progress is
+    kept in Redis; the cursor makes a retried job resume after the last written batch.
+    """
+
+    def __init__(self):
+        self.limiter = RateLimiter("llm_bulk", LLM_REQUESTS_PER_MINUTE)
+
+    async def start(self, interview_id: str, filters: Optional[Dict] = None) -> Dict:
+        """Queue a job, or return the one already running for this interview."""
+        redis = await get_redis()
+        active = await redis.get(_active_key(interview_id))
+        if active:
+            status = await self.get_status(_decode(active))
+            if status and status["status"] in (STATUS_QUEUED, STATUS_RUNNING):
+                return {**status, "already_running": True}
+
+        filters = filters or {}
+        async with AsyncSessionLocal() as db:
+            total = (await db.execute(
+                _filtered_query(select(func.count(Response.id)), interview_id, filters)
+            )).scalar() or 0
+
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        pipe = redis.pipeline()
+        pipe.hset(_status_key(job_id), mapping={
+            "job_id": job_id,
+            "interview_id": interview_id,
+            "filters": json.dumps(filters),
+            "status": STATUS_QUEUED,
+            "total": total,
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "cursor": "",
+            "created_at": now,
+            "updated_at": now,
+        })
+        pipe.expire(_status_key(job_id), STATUS_TTL_SECONDS)
+        pipe.set(_active_key(interview_id), job_id, ex=STATUS_TTL_SECONDS)
+        await pipe.execute()
+        await enqueue(REANALYSIS_QUEUE, "reanalyze_interview", {"job_id": job_id})
+        logger.info(f"Queued re-analysis job {job_id} for interview {interview_id} ({total} responses)")
+        return await self.get_status(job_id)
+
+    async def get_status(self, job_id: str) -> Optional[Dict]:
+        redis = await get_redis()
+        raw = await redis.hgetall(_status_key(job_id))
+        if not raw:
+            return None
+        data = {_decode(k): _decode(v) for k, v in raw.items()}
+        total = int(data.get("total", 0))
+        processed = int(data.get("processed", 0))
+        started_at = float(data["started_at"]) if data.get("started_at") else None
+        finished_at = float(data["finished_at"]) if data.get("finished_at") else None
+
+        eta_seconds = None
+        if data["status"] == STATUS_RUNNING and started_at and processed:
+            rate = processed / max(time.time() - started_at, 1e-6)
+            eta_seconds = round(max(total - processed, 0) / rate)
+
+        failures = [json.loads(_decode(f)) for f in await redis.lrange(_failures_key(job_id), 0, 99)]
+        return {
+            "job_id": job_id,
+            "interview_id": data.get("interview_id"),
+            "filters": json.loads(data.get("filters") or "{}"),
+            "status": data["status"],
+            "total": total,
+            "processed": processed,
+            "succeeded": int(data.get("succeeded", 0)),
+            "failed": int(data.get("failed", 0)),
+            "progress": round(processed / total, 4) if total else 1.0,
+            "eta_seconds": eta_seconds,
+            "elapsed_seconds": round((finished_at or time.time()) - started_at) if started_at else None,
+            "error": data.get("error") or None,
+            "failures": failures,
+        }
+
+    async def run(self, job_id: str) -> None:
+        redis = await get_redis()
+        raw = await redis.hgetall(_status_key(job_id))
+        if not raw:
+            logger.warning(f"Re-analysis job {job_id} has no status record, skipping")
+            return
+        data = {_decode(k): _decode(v) for k, v in raw.items()}
+        if data["status"] in (STATUS_COMPLETED, STATUS_FAILED):
+            return
+        interview_id = data["interview_id"]
+        filters = json.loads(data.get("filters") or "{}")
+        cursor = data.get("cursor") or None
+        await redis.hset(_status_key(job_id), mapping={
+            "status": STATUS_RUNNING,
+            "started_at": data.get("started_at") or time.time(),
+            "updated_at": time.time(),
+        })
+
+        try:
+            while True:
+                async with AsyncSessionLocal() as db:
+                    query = _filtered_query(
+                        select(Response.id, Response.qa_history, Response.duration, Response.start_time, Response.end_time),
+                        interview_id, filters,
+                    )
+                    if cursor:
+                        query = query.where(Response.id > uuid.UUID(cursor))
+                    rows = (await db.execute(query.order_by(Response.id).limit(DB_BATCH_SIZE))).all()
+                if not rows:
+                    break
+                await self._process_batch(job_id, interview_id, rows)
+                cursor = str(rows[-1].id)
+                await redis.hset(_status_key(job_id), mapping={"cursor": cursor, "updated_at": time.time()})
+        except Exception as e:
+            await redis.hset(_status_key(job_id), mapping={"error": f"{type(e).__name__}: {e}", "updated_at": time.time()})
+            raise
+
+        await redis.hset(_status_key(job_id), mapping={
+            "status": STATUS_COMPLETED,
+            "finished_at": time.time(),
+            "updated_at": time.time(),
+        })
+        await redis.delete(_active_key(interview_id))
+        logger.info(f"Re-analysis job {job_id} for interview {interview_id} completed")
+        # Call summaries changed: rebuild the interview's insights digest from scratch
+        await insights_service.schedule_refresh(interview_id, rebuild=True)
+
+    async def _process_batch(self, job_id: str, interview_id: str, rows: List) -> None:
+        semaphore = asyncio.Semaphore(max(1, CONCURRENCY))
+
+        async def analyse(row) -> Optional[Dict]:
+            qa_history = list(row.qa_history or [])
+            if not qa_history:
+                return None
+            async with semaphore:
+                # Long transcripts are analysed with several map calls plus a reduce call
+                await self.limiter.acquire(analysis_service.final_analysis_call_count(qa_history))
+                # No response_id: re-score from the transcript, not from a stale running evaluation
+                final_analysis, per_answer = await analysis_service.generate_final_analysis(interview_id, qa_history)
+            if not final_analysis or final_analysis.get("error"):
+                raise ValueError(final_analysis.get("error") if final_analysis else "Empty analysis")
+            return self._updated_values(row, qa_history, final_analysis, per_answer)
+
+        results = await asyncio.gather(*(analyse(row) for row in rows), return_exceptions=True)
+
+        updates = []
+        failures = []
+        for row, result in zip(rows, results):
+            if isinstance(result, BaseException):
+                failures.append(json.dumps({"response_id": str(row.id), "error": f"{type(result).__name__}: {result}"}))
+            elif result is not None:
+                updates.append(result)
+
+        if updates:
+            responses = Response.__table__
+            statement = (
+                update(responses)
+                .where(responses.c.id == bindparam("b_id"))
+                # Skipped if answers were added or analysed since the snapshot the analysis was built from
+                .where(responses.c.qa_history == bindparam("b_qa_history", type_=JSONB))
+            )
+            async with AsyncSessionLocal() as db:
+                # One executemany for the whole batch
+                await db.execute(statement, updates)
+                await db.commit()
+
+        redis = await get_redis()
+        pipe = redis.pipeline()
+        pipe.hincrby(_status_key(job_id), "processed", len(rows))
+        pipe.hincrby(_status_key(job_id), "succeeded", len(rows) - len(failures))
+        pipe.hincrby(_status_key(job_id), "failed", len(failures))
+        if failures:
+            pipe.rpush(_failures_key(job_id), *failures)
+            pipe.ltrim(_failures_key(job_id), 0, FAILURES_KEPT - 1)
+            pipe.expire(_failures_key(job_id), STATUS_TTL_SECONDS)
+        await pipe.execute()
+
+    def _updated_values(self, row, qa_history: List[Dict], final_analysis: Dict, per_answer: Optional[List[Dict]]) -> Dict:
+        # b_* select the row; qa_history is always set (unchanged without per-answer results) so every
+        # row of the executemany has the same parameters
+        values = {"b_id": row.id, "b_qa_history": row.qa_history, "overall_analysis": final_analysis}
+        if per_answer:
+            qa_history = [dict(qa) if isinstance(qa, dict) else qa for qa in qa_history]
+            for index, analysis in enumerate(per_answer[:len(qa_history)]):
+                if analysis and isinstance(qa_history[index], dict):
+                    qa_history[index]["analysis"] = analysis
+                    qa_history[index]["analysis_status"] = ANALYSIS_COMPLETE
+        values["qa_history"] = qa_history
+        cost = calculate_response_cost(SimpleNamespace(
+            qa_history=qa_history, overall_analysis=final_analysis,
+            duration=row.duration, start_time=row.start_time, end_time=row.end_time,
+        ))
+        values.update({
+            "cost": cost.get("total_cost", 0.0),
+            "deepgram_cost": cost.get("deepgram_cost", 0.0),
+            "elevenlabs_cost": cost.get("elevenlabs_cost", 0.0),
+            "azure_cost": cost.get("azure_cost", 0.0),
+        })
+        return values
+
+    async def mark_failed(self, job_id: str) -> None:
+        redis = await get_redis()
+        interview_id = _decode(await redis.hget(_status_key(job_id), "interview_id") or b"")
+        await redis.hset(_status_key(job_id), mapping={
+            "status": STATUS_FAILED,
+            "finished_at": time.time(),
+            "updated_at": time.time(),
+        })
+        if interview_id:
+            await redis.delete(_active_key(interview_id))
+
+
+reanalysis_service = ReanalysisService()
+
+
+async def _handle_reanalyze_interview(payload: dict) -> None:
+    await reanalysis_service.run(payload["job_id"])
+
+
+async def _give_up_reanalyze_interview(payload: dict) -> None:
+    await reanalysis_service.mark_failed(payload["job_id"])
+
+
+register_handler("reanalyze_interview", _handle_reanalyze_interview, on_give_up=_give_up_reanalyze_interview)
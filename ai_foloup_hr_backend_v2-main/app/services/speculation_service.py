@@ -0,0 +1,292 @@
+# Speculative next-question generation for dynamic interviews
+
+import asyncio
+import json
+import re
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from config_loader import load_config
+from db import AsyncSessionLocal
+from models import Interview, Response
+from services.llm_service import llm_service
+from utils.cost_utils import llm_call_cost
+from utils.interview_utils import load_questions_list, question_text
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SPECULATION_TTL_SECONDS = 900
+RECENT_TURNS_KEPT = 200
+_STATS_KEY = "speculation:stats"
+_TURNS_KEY = "speculation:turns"
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _speculation_key(response_id: str, question_index: int) -> str:
+    return f"speculation:{response_id}:{question_index}"
+
+def _calls_key(response_id: str, question_index: int) -> str:
+    return f"speculation:{response_id}:{question_index}:calls"
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall((text or "").lower())
+
+
+def transcript_coverage(speculated: str, final: str) -> float:
+    """
+    Share of the final answer's words that the speculated (partial) transcript already contained.
+    1.0 means the candidate added nothing new after the speculation was made.
+    """
+    final_words = _words(final)
+    if not final_words:
+        return 1.0
+    remaining: Dict[str, int] = {}
+    for word in _words(speculated):
+        remaining[word] = remaining.get(word, 0) + 1
+    covered = 0
+    for word in final_words:
+        if remaining.get(word, 0) > 0:
+            remaining[word] -= 1
+            covered += 1
+    return covered / len(final_words)
+
+
+class SpeculationService:
+    """
+    Starts generating the next dynamic question from the streaming partial transcript
+    once it stops changing, so get-current-question can serve it without an LLM round trip.
+    """
+
+    def __init__(self):
+        config = load_config().get('speculation', {}) or {}
+        self.enabled = bool(config.get('enabled', False))
+        self.stable_seconds = float(config.get('stable_ms', 1200)) / 1000
+        self.min_words = int(config.get('min_words', 8))
+        self.match_threshold = float(config.get('match_threshold', 0.8))
+        # Speculative LLM calls allowed while one answer is being given; later stable points are ignored
+        self.max_per_turn = int(config.get('max_per_turn', 2))
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    def on_transcript(self, response_id: str, transcript: str) -> None:
+        """Called for every partial/final STT update; (re)arms the stabilization timer."""
+        if not self.enabled or not response_id:
+            return
+        timer = self._timers.get(response_id)
+        if timer and not timer.done():
+            timer.cancel()
+        self._timers[response_id] = asyncio.create_task(self._speculate_when_stable(response_id, transcript))
+
+    def cancel(self, response_id: str) -> None:
+        timer = self._timers.pop(response_id, None)
+        if timer and not timer.done():
+            timer.cancel()
+
+    async def _speculate_when_stable(self, response_id: str, transcript: str) -> None:
+        try:
+            await asyncio.sleep(self.stable_seconds)
+        except asyncio.CancelledError:
+            return
+        self._timers.pop(response_id, None)
+        if len(_words(transcript)) < self.min_words:
+            return
+        running = self._in_flight.get(response_id)
+        if running and not running.done():
+            # One speculation per response at a time; the next stable point re-checks
+            return
+        task = asyncio.create_task(self.speculate(response_id, transcript))
+        self._in_flight[response_id] = task
+        task.add_done_callback(lambda t: self._in_flight.pop(response_id, None) if self._in_flight.get(response_id) is t else None)
+
+    async def speculate(self, response_id: str, partial_answer: str) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                response = (await db.execute(select(Response).where(Response.id == response_id))).scalar_one_or_none()
+                if not response or response.is_completed:
+                    return
+                interview = (await db.execute(select(Interview).where(Interview.id == response.interview_id))).scalar_one_or_none()
+                if not interview or interview.question_mode != "dynamic" or not interview.context:
+                    return
+                question_index = response.current_question_index or 0
+                questions = await load_questions_list(db, interview, response)
+                # Nothing to prepare when the current question is the last one
+                if question_index >= len(questions) or question_index + 1 >= (interview.question_count or 0):
+                    return
+                current_question = question_text(questions[question_index])
+                previous_answers = list(response.qa_history or [])
+                interview_id = str(interview.id)
+
+            redis = await get_redis()
+            key = _speculation_key(response_id, question_index + 1)
+            existing = await redis.get(key)
+            superseded = None
+            if existing:
+                prepared = json.loads(existing)
+                if transcript_coverage(prepared.get("transcript", ""), partial_answer) >= self.match_threshold:
+                    return
+                superseded = prepared
+
+            calls_key = _calls_key(response_id, question_index + 1)
+            pipe = redis.pipeline()
+            pipe.incr(calls_key)
+            pipe.expire(calls_key, SPECULATION_TTL_SECONDS)
+            calls, _ = await pipe.execute()
+            if calls > self.max_per_turn:
+                logger.debug(f"Speculation limit reached for question {question_index + 2} of response {response_id}")
+                return
+
+            started = time.perf_counter()
+            next_question = await llm_service.generate_next_dynamic_question(
+                interview_id,
+                previous_answers + [{"question": current_question, "answer": partial_answer}],
+                interactive=False,
+            )
+            generation_ms = int((time.perf_counter() - started) * 1000)
+            await self._record_call((next_question or {}).get("_usage"))
+            if not next_question or next_question.get("error"):
+                return
+
+            await redis.set(key, json.dumps({
+                "question": next_question,
+                "transcript": partial_answer,
+                "generation_ms": generation_ms,
+                "created_at": time.time(),
+            }), ex=SPECULATION_TTL_SECONDS)
+            if superseded:
+                await self._record_wasted(superseded)
+            logger.debug(f"Prepared speculative question {question_index + 2} for response {response_id} in {generation_ms}ms")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Speculative question generation failed for response {response_id}: {e}")
+
+    async def take(self, response_id: str, question_index: int, final_answer: str) -> Optional[Dict]:
+        """
+        Return the prepared question for `question_index` if the final answer did not materially
+        differ from the transcript it was generated from. Records the turn either way.
+        """
+        if not self.enabled:
+            return None
+        try:
+            redis = await get_redis()
+            key = _speculation_key(response_id, question_index)
+            pipe = redis.pipeline()
+            pipe.get(key)
+            pipe.delete(key)
+            raw, _ = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not read speculative question for response {response_id}: {e}")
+            return None
+
+        if not raw:
+            await self._record_turn(response_id, question_index, hit=False, reason="not_prepared")
+            return None
+
+        prepared = json.loads(raw)
+        coverage = transcript_coverage(prepared.get("transcript", ""), final_answer)
+        if coverage < self.match_threshold:
+            await self._record_turn(response_id, question_index, hit=False, reason="transcript_changed", coverage=coverage)
+            await self._record_wasted(prepared)
+            return None
+
+        await self._record_turn(
+            response_id, question_index, hit=True, coverage=coverage,
+            latency_saved_ms=prepared.get("generation_ms", 0)
+        )
+        return prepared.get("question")
+
+    async def _record_turn(self, response_id: str, question_index: int, hit: bool, reason: str = "hit",
+                           coverage: Optional[float] = None, latency_saved_ms: int = 0) -> None:
+        turn = {
+            "response_id": str(response_id),
+            "question_number": question_index + 1,
+            "hit": hit,
+            "reason": reason,
+            "coverage": round(coverage, 3) if coverage is not None else None,
+            "latency_saved_ms": latency_saved_ms,
+            "at": time.time(),
+        }
+        logger.info(f"Speculative question turn: {turn}")
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            pipe.hincrby(_STATS_KEY, "turns", 1)
+            pipe.hincrby(_STATS_KEY, "hits" if hit else "misses", 1)
+            if hit:
+                pipe.hincrby(_STATS_KEY, "latency_saved_ms", int(latency_saved_ms))
+            pipe.lpush(_TURNS_KEY, json.dumps(turn))
+            pipe.ltrim(_TURNS_KEY, 0, RECENT_TURNS_KEPT - 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record speculation stats: {e}")
+
+    async def _record_call(self, usage: Optional[Dict]) -> None:
+        """Token usage and cost of one speculative LLM call, served or not."""
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
+        completion_tokens = int(usage.get("completion_tokens", 0) or 0)
+        cached_tokens = int(usage.get("cached_tokens", 0) or 0)
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            pipe.hincrby(_STATS_KEY, "calls", 1)
+            pipe.hincrby(_STATS_KEY, "prompt_tokens", prompt_tokens)
+            pipe.hincrby(_STATS_KEY, "completion_tokens", completion_tokens)
+            pipe.hincrbyfloat(_STATS_KEY, "cost", llm_call_cost(prompt_tokens, completion_tokens, cached_tokens))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record speculation stats: {e}")
+
+    async def _record_wasted(self, prepared: Dict) -> None:
+        """A prepared question that will never be served: replaced by a newer speculation or rejected at take."""
+        usage = (prepared.get("question") or {}).get("_usage") or {}
+        cost = llm_call_cost(
+            int(usage.get("prompt_tokens", 0) or 0), int(usage.get("completion_tokens", 0) or 0),
+            int(usage.get("cached_tokens", 0) or 0),
+        )
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            pipe.hincrby(_STATS_KEY, "wasted", 1)
+            pipe.hincrbyfloat(_STATS_KEY, "wasted_cost", cost)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record speculation stats: {e}")
+
+    async def get_stats(self, recent: int = 20) -> Dict:
+        redis = await get_redis()
+        raw = await redis.hgetall(_STATS_KEY)
+        stats = {_decode(k): float(v) for k, v in raw.items()}
+        turns = int(stats.get("turns", 0))
+        hits = int(stats.get("hits", 0))
+        calls = int(stats.get("calls", 0))
+        recent_turns = [json.loads(t) for t in await redis.lrange(_TURNS_KEY, 0, max(0, recent - 1))]
+        return {
+            "enabled": self.enabled,
+            "turns": turns,
+            "hits": hits,
+            "misses": int(stats.get("misses", 0)),
+            "hit_rate": round(hits / turns, 3) if turns else 0.0,
+            "latency_saved_ms_total": int(stats.get("latency_saved_ms", 0)),
+            "latency_saved_ms_avg_per_hit": int(stats.get("latency_saved_ms", 0) / hits) if hits else 0,
+            "max_per_turn": self.max_per_turn,
+            "speculative_calls": calls,
+            "prompt_tokens": int(stats.get("prompt_tokens", 0)),
+            "completion_tokens": int(stats.get("completion_tokens", 0)),
+            "cost": round(stats.get("cost", 0.0), 6),
+            # Generated but never served; speculations that simply expired are not counted
+            "wasted_calls": int(stats.get("wasted", 0)),
+            "wasted_cost": round(stats.get("wasted_cost", 0.0), 6),
+            "calls_per_hit": round(calls / hits, 2) if hits else None,
+            "recent_turns": recent_turns,
+        }
+
+
+speculation_service = SpeculationService()
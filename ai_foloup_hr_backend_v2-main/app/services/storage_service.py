@@ -1,9 +1,18 @@
 import shutil
-import re
 import subprocess
 import sys
 import asyncio
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 import boto3
 from botocore.exceptions import ClientError
 from io import BytesIO
@@ -14,14 +23,32 @@ backend_dir = app_dir.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 from config_loader import load_config
+from utils.chunk_manifest import ChunkManifest
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 class StorageService:
+    # Chunks are appended to MERGED_NAME in index order as they arrive; a ChunkManifest records the
+    # byte range of every chunk and the out-of-order chunks parked until the gap before them is filled
+    MERGED_NAME = "merged.webm"
+    MIN_CHUNK_BYTES = 100  # smaller chunks are acknowledged but not appended (as the old merge skipped them)
+    # flock'd around every manifest change, so the API and the video worker never interleave
+    LOCK_NAME = ".chunks.lock"
+
     def __init__(self):
+        self._chunk_locks: Dict[str, threading.Lock] = {}
+        self._chunk_locks_guard = threading.Lock()
+        self._manifests: Dict[str, ChunkManifest] = {}
         config = load_config()
         self.storage_type = config.get('storage', {}).get('storage_type', 'local')
+        encoding_config = config.get('video_encoding', {}) or {}
+        # Stream-copy recordings into a container every target player handles; transcode to H.264/AAC MP4 otherwise
+        self.remux_first = bool(encoding_config.get('remux_first', True))
+        self.mp4_copy_video_codecs = set(encoding_config.get('mp4_copy_video_codecs') or ['h264'])
+        self.webm_copy_video_codecs = set(encoding_config.get('webm_copy_video_codecs') or [])
+        self.webm_copy_audio_codecs = set(encoding_config.get('webm_copy_audio_codecs') or ['opus', 'vorbis'])
+        self.timestamp_probe_packets = int(encoding_config.get('timestamp_probe_packets', 300))
         
         if self.storage_type == 'local':
             storage_path = config.get('storage', {}).get('storage_path')
@@ -126,61 +153,161 @@ class StorageService:
             logger.info(f"Image uploaded to S3 for response_id: {response_id}, key: {key}")
             return url
     
-    def _get_next_chunk_index(self, chunk_dir: Path, file_extension: str, proposed_index: int = None) -> int:
-        """Get the next available chunk index."""
-        if proposed_index is None:
-            existing = sorted(chunk_dir.glob(f"chunk_*.{file_extension}"))
-            return len(existing)
-        
-        proposed_path = chunk_dir / f"chunk_{proposed_index:05d}.{file_extension}"
-        if not proposed_path.exists():
-            return proposed_index
-        
-        existing = sorted(chunk_dir.glob(f"chunk_*.{file_extension}"))
-        max_index = -1
-        for f in existing:
-            match = re.search(r'chunk_(\d+)', f.name)
-            if match:
-                max_index = max(max_index, int(match.group(1)))
-        return max_index + 1
+    def _chunk_lock(self, response_id: str) -> threading.Lock:
+        with self._chunk_locks_guard:
+            return self._chunk_locks.setdefault(response_id, threading.Lock())
+
+    @contextmanager
+    def _chunk_guard(self, chunk_dir: Path):
+        """Exclusive access to a response's chunks: a thread lock in this process, an flock across processes."""
+        with self._chunk_lock(chunk_dir.name):
+            with open(chunk_dir / self.LOCK_NAME, "a+b") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _manifest(self, chunk_dir: Path) -> ChunkManifest:
+        """
+        The response's manifest. Cached per process and replayed from its sidecar again whenever
+        another process (the video worker draining parked chunks) has journaled since. Call under _chunk_guard.
+        """
+        manifest = self._manifests.get(chunk_dir.name)
+        if manifest is None or not manifest.is_current():
+            manifest = ChunkManifest.load(chunk_dir)
+            self._manifests[chunk_dir.name] = manifest
+        return manifest
+
+    def forget_chunks(self, response_id: str) -> None:
+        """Drop the response's cached manifest and lock (the journal on disk is kept)."""
+        with self._chunk_locks_guard:
+            self._manifests.pop(response_id, None)
+            self._chunk_locks.pop(response_id, None)
+
+    def _has_legacy_chunks(self, chunk_dir: Path) -> bool:
+        # Recording started before chunks were appended as they arrived; kept for one release
+        return not ChunkManifest.exists(chunk_dir) and any(chunk_dir.glob("chunk_*.webm"))
+
+    def _save_legacy_chunk(self, chunk_dir: Path, file_content: bytes, file_extension: str, chunk_index: Optional[int]) -> str:
+        existing = [int(re.search(r'chunk_(\d+)', f.name).group(1)) for f in chunk_dir.glob(f"chunk_*.{file_extension}")]
+        if chunk_index is None or chunk_index in existing:
+            chunk_index = max(existing, default=-1) + 1
+        file_path = chunk_dir / f"chunk_{chunk_index:05d}.{file_extension}"
+        with open(file_path, "wb") as f:
+            f.write(file_content)
+        return str(file_path)
+
+    def _pending_path(self, chunk_dir: Path, chunk_index: int, file_extension: str = "webm") -> Path:
+        return chunk_dir / f"pending_{chunk_index:05d}.{file_extension}"
+
+    def _append_range(self, chunk_dir: Path, manifest: ChunkManifest, chunk_index: int, data: bytes, crc: int) -> None:
+        """Write `data` at the end of the assembled bytes, durably, then record its range."""
+        offset = manifest.size
+        length = len(data) if len(data) >= self.MIN_CHUNK_BYTES else 0
+        if length:
+            merged_path = chunk_dir / self.MERGED_NAME
+            with open(merged_path, "r+b" if merged_path.exists() else "wb") as f:
+                f.seek(offset)
+                f.write(data)
+                # Drops bytes of a write that was interrupted before its range was recorded
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+        manifest.record_append(chunk_index, offset, length, crc)
+
+    def _drain_pending(self, chunk_dir: Path, manifest: ChunkManifest, skip_gaps: bool = False) -> None:
+        """Append parked chunks that are now in order; with skip_gaps, also past chunks that never arrived."""
+        while manifest.pending:
+            entry = manifest.pending.get(manifest.next_index)
+            if entry is None:
+                if not skip_gaps:
+                    return
+                first_parked = min(manifest.pending)
+                logger.warning(f"Video chunks {manifest.next_index}..{first_parked - 1} never arrived in {chunk_dir.name}")
+                entry = manifest.pending[first_parked]
+            pending_path = self._pending_path(chunk_dir, entry["index"], entry["ext"])
+            with open(pending_path, "rb") as f:
+                data = f.read()
+            self._append_range(chunk_dir, manifest, entry["index"], data, entry["crc"])
+            pending_path.unlink(missing_ok=True)
+
+    def _append_chunk_sync(self, file_content: bytes, response_id: str, file_extension: str, chunk_index: Optional[int]) -> str:
+        chunk_dir = self.temp_dir / response_id
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        crc = zlib.crc32(file_content)
+
+        with self._chunk_guard(chunk_dir):
+            if self._has_legacy_chunks(chunk_dir):
+                return self._save_legacy_chunk(chunk_dir, file_content, file_extension, chunk_index)
+            manifest = self._manifest(chunk_dir)
+            if chunk_index is None:
+                chunk_index = manifest.next_free_index()
+            known = manifest.lookup(chunk_index)
+            if known:
+                if known["crc"] == crc:
+                    logger.debug(f"Duplicate video chunk {chunk_index} for response_id: {response_id}, ignored")
+                    return str(chunk_dir / self.MERGED_NAME)
+                # Same index with different bytes (recorder restarted): keep it after everything received so far
+                chunk_index = manifest.next_free_index()
+
+            if chunk_index == manifest.next_index:
+                self._append_range(chunk_dir, manifest, chunk_index, file_content, crc)
+                self._drain_pending(chunk_dir, manifest)
+            else:
+                pending_path = self._pending_path(chunk_dir, chunk_index, file_extension)
+                with open(pending_path, "wb") as f:
+                    f.write(file_content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                manifest.record_park(chunk_index, crc, file_extension)
+
+        return str(chunk_dir / self.MERGED_NAME)
 
     async def save_chunk(self, file_content: bytes, response_id: str, file_extension: str, chunk_index: int = None) -> str:
         """
-        Save a video chunk to temporary storage.
+        Append a video chunk to the response's assembled recording in temporary storage.
         Chunks are ALWAYS stored locally in temp directory, regardless of storage_type.
         
         Chunk Path Structure:
-            {base_path}/temp/{response_id}/chunk_{index:05d}.{extension}
+            {base_path}/temp/{response_id}/merged.webm          chunks appended in index order
+            {base_path}/temp/{response_id}/manifest.jsonl       journal of chunk ranges (utils/chunk_manifest.py)
+            {base_path}/temp/{response_id}/pending_{index:05d}.{extension}   arrived before an earlier chunk
+            {base_path}/temp/{response_id}/.chunks.lock         flock shared with the video worker
             
         Where base_path is determined by:
             - If storage_path in config is absolute: uses that path
             - If storage_path in config is relative: {backend_dir}/{storage_path}
             - If storage_path not set: {backend_dir}/storage
             
-        Example with config.yaml storage_path: "app/cache/storage"
-            Chunks stored at: {backend_dir}/app/cache/storage/temp/{response_id}/chunk_00000.webm
+        Re-sent chunks (same index and bytes) are ignored, so merged.webm is final at interview end.
         """
-        chunk_dir = self.temp_dir / response_id
-        chunk_dir.mkdir(parents=True, exist_ok=True)
-        logger.debug(f"Saving chunk to local temp directory: {chunk_dir} (absolute: {chunk_dir.resolve()})")
+        return await asyncio.to_thread(self._append_chunk_sync, file_content, response_id, file_extension, chunk_index)
 
-        chunk_index = self._get_next_chunk_index(chunk_dir, file_extension, chunk_index)
-        file_path = chunk_dir / f"chunk_{chunk_index:05d}.{file_extension}"
-        
-        if file_extension.lower() == "webm" and chunk_index == 0 and len(file_content) >= 4:
-            if file_content[0:4] != b'\x1a\x45\xdf\xa3':
-                pass  
-        
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        saved_size = file_path.stat().st_size
-        if saved_size != len(file_content):
-            raise IOError(f"File size mismatch: expected {len(file_content)} bytes, got {saved_size} bytes")
+    def _finalize_chunks(self, temp_response_dir: Path) -> Optional[Path]:
+        """
+        merged.webm of the response's recording, or None if it is not a usable video.
+        Only chunks still parked behind a missing one are written here; validation reads the manifest.
+        """
+        with self._chunk_guard(temp_response_dir):
+            manifest = self._manifest(temp_response_dir)
+            if manifest.pending:
+                self._drain_pending(temp_response_dir, manifest, skip_gaps=True)
+            merged_webm = temp_response_dir / self.MERGED_NAME
+            valid = manifest.valid_ranges()
+            size = manifest.size
 
-        return str(file_path)
+        logger.info(f"Assembled recording for {temp_response_dir.name}: {len(valid)} chunks, {size} bytes")
+        if not valid or valid[0]["index"] != 0:
+            logger.warning(f"First video chunk missing for response_id: {temp_response_dir.name}")
+            return None
+        if len(valid) == 1 and valid[0]["length"] < 100_000:
+            logger.warning(f"Only one small video chunk for response_id: {temp_response_dir.name}")
+            return None
+        return merged_webm
 
     def _find_all_chunks(self, temp_response_dir: Path):
+        # Per-chunk files written before incremental assembly
         all_chunks = sorted(
             temp_response_dir.glob("chunk_*.webm"),
             key=lambda f: int(re.search(r'chunk_(\d+)', f.name).group(1))
@@ -204,16 +331,6 @@ class StorageService:
         
         return valid_chunks
 
-    def _get_video_url(self, response_id: str, base_url: str = None) -> str:
-        """
-        Get video URL. Returns local path if storage_type is 'local', S3 URL if 's3'.
-        """
-        if self.storage_type == 'local':
-            url = f"/api/media/files/videos/{response_id}.mp4"
-            url = url.replace('//', '/')
-            return url
-        else:
-            return f"https://{self.s3_bucket}.s3.amazonaws.com/videos/{response_id}.mp4"
 
     def _validate_chunks(self, chunks: list) -> bool:
         if not chunks:
@@ -311,6 +428,25 @@ class StorageService:
                 pass
             return False
 
+    def _get_video_url(self, response_id: str, base_url: str = None, extension: str = "mp4") -> str:
+        """
+        Get video URL. Returns local path if storage_type is 'local', S3 URL if 's3'.
+        """
+        if self.storage_type == 'local':
+            url = f"/api/media/files/videos/{response_id}.{extension}"
+            url = url.replace('//', '/')
+            return url
+        else:
+            return f"https://{self.s3_bucket}.s3.amazonaws.com/videos/{response_id}.{extension}"
+
+    def existing_video_path(self, response_id: str) -> Optional[Path]:
+        """The response's finished video in local storage (MP4, or WebM when it was stream-copied), if any."""
+        for extension in ("mp4", "webm"):
+            video_path = self.video_dir / f"{response_id}.{extension}"
+            if video_path.exists() and video_path.stat().st_size > 0:
+                return video_path
+        return None
+
     def _build_ffmpeg_command(self, merged_webm: Path, output_path: Path) -> list:
         """Build FFmpeg command for WebM to MP4 conversion."""
         # Optimized for corrupted/fragmented WebM files from MediaRecorder
@@ -334,6 +470,186 @@ class StorageService:
             str(output_path)
         ]
 
+    def _build_remux_command(self, merged_webm: Path, output_path: Path, probe: dict, container: str) -> list:
+        """
+        Stream-copy the video. "mp4": H.264 with AAC audio (copied, or encoded from anything else)
+        and +faststart. "webm": VP9/Opus rewritten by the WebM muxer, which adds the duration and
+        cues (seek index) that MediaRecorder output lacks.
+        """
+        if container == "mp4":
+            audio = ["-c:a", "copy"] if probe.get("audio_codec") == "aac" else ["-c:a", "aac", "-b:a", "128k"]
+            output_options = ["-movflags", "+faststart", "-f", "mp4"]
+        else:
+            audio = ["-c:a", "copy"]
+            output_options = ["-f", "webm"]
+        return [
+            "ffmpeg",
+            "-fflags", "+genpts",
+            "-i", str(merged_webm),
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-c:v", "copy",
+            *audio,
+            "-avoid_negative_ts", "make_zero",
+            *output_options,
+            "-y",
+            str(output_path)
+        ]
+
+    def _probe_media(self, path: Path) -> Optional[dict]:
+        """Codecs, start time and duration of a recording (ffprobe), plus whether its video timestamps are sane."""
+        probe_cmd = [
+            "ffprobe", "-v", "error",
+            "-show_entries", "stream=codec_type,codec_name:format=duration,start_time",
+            "-of", "json", str(path)
+        ]
+        try:
+            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
+            if probe_result.returncode != 0:
+                logger.warning(f"ffprobe failed for {path}: {probe_result.stderr[-500:]}")
+                return None
+            info = json.loads(probe_result.stdout or "{}")
+        except Exception as e:
+            logger.warning(f"ffprobe failed for {path}: {e}")
+            return None
+
+        def first_codec(codec_type: str) -> Optional[str]:
+            return next((st.get("codec_name") for st in info.get("streams", []) if st.get("codec_type") == codec_type), None)
+
+        def as_float(value) -> Optional[float]:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+
+        video_codec = first_codec("video")
+        return {
+            "video_codec": video_codec,
+            "audio_codec": first_codec("audio"),
+            "start_time": as_float(info.get("format", {}).get("start_time")),
+            "duration": as_float(info.get("format", {}).get("duration")),
+            "timestamps_ok": self._video_timestamps_ok(path) if video_codec else False,
+        }
+
+    def _video_timestamps_ok(self, path: Path) -> bool:
+        """First timestamp_probe_packets video packets all have non-negative, non-decreasing timestamps."""
+        probe_cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-read_intervals", f"%+#{self.timestamp_probe_packets}",
+            "-show_entries", "packet=pts_time,dts_time",
+            "-of", "csv=p=0", str(path)
+        ]
+        try:
+            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
+        except Exception:
+            return False
+        if probe_result.returncode != 0:
+            return False
+        previous = None
+        for line in probe_result.stdout.splitlines():
+            pts, _, dts = line.strip().partition(",")
+            value = dts if dts not in ("", "N/A") else pts
+            if value in ("", "N/A"):
+                return False
+            timestamp = float(value)
+            if timestamp < 0 or (previous is not None and timestamp < previous):
+                return False
+            previous = timestamp
+        return previous is not None
+
+    def _stream_copy_container(self, probe: Optional[dict]) -> Tuple[Optional[str], Optional[str]]:
+        """("mp4" | "webm", None) if the recording can be stream-copied into that container, else (None, reason)."""
+        if probe is None:
+            return None, "probe failed"
+        if not probe["video_codec"]:
+            return None, "no video stream"
+        if not probe["timestamps_ok"]:
+            return None, "missing or non-monotonic video timestamps"
+        if probe["video_codec"] in self.mp4_copy_video_codecs:
+            return "mp4", None
+        if probe["video_codec"] in self.webm_copy_video_codecs:
+            if probe["audio_codec"] and probe["audio_codec"] not in self.webm_copy_audio_codecs:
+                return None, f"audio codec {probe['audio_codec']} is not stream-copied into WebM"
+            return "webm", None
+        return None, f"video codec {probe['video_codec']} is not stream-copied"
+
+    def _try_stream_copy(self, response_id: str, merged_webm: Path, output_path: Path,
+                         progress: Optional[dict] = None) -> Optional[Path]:
+        """
+        Remux without re-encoding when the probe allows it. Returns the written file (output_path,
+        with a .webm suffix for VP9 recordings), or None: run the full transcode to output_path.
+        """
+        if not self.remux_first:
+            return None
+        probe = self._probe_media(merged_webm)
+        container, blocker = self._stream_copy_container(probe)
+        if blocker:
+            logger.info(f"Transcoding video for response_id {response_id}: {blocker}")
+            return None
+
+        remux_path = output_path.with_suffix(f".{container}")
+        remux_cmd = self._build_remux_command(merged_webm, remux_path, probe, container)
+        logger.debug(f"FFmpeg remux command: {' '.join(remux_cmd)}")
+        start_time = time.time()
+        try:
+            self._run_ffmpeg(remux_cmd, timeout=300, progress=progress)
+            if self._validate_output_video(remux_path):
+                logger.info(f"Stream-copied video for response_id {response_id} "
+                            f"({probe['video_codec']}/{probe['audio_codec']} -> {container}) in {time.time() - start_time:.2f} seconds")
+                return remux_path
+            logger.warning(f"Stream-copied video failed validation for response_id {response_id}, transcoding instead")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            stderr = (e.stderr or b"").decode("utf-8", errors="ignore")
+            logger.warning(f"Stream copy failed for response_id {response_id}, transcoding instead: {stderr[-500:]}")
+        remux_path.unlink(missing_ok=True)
+        if progress is not None:
+            progress["out_time"] = 0.0
+        return None
+
+    def _run_ffmpeg(self, ffmpeg_cmd: list, timeout: float, progress: Optional[dict] = None) -> subprocess.CompletedProcess:
+        """
+        subprocess.run(ffmpeg_cmd, check=True, timeout=timeout) that also parses FFmpeg's -progress
+        output into `progress` ("out_time" in seconds, "speed"). Setting progress["cancel"] kills FFmpeg.
+        Raises subprocess.TimeoutExpired / CalledProcessError like subprocess.run.
+        """
+        cmd = ffmpeg_cmd[:1] + ["-progress", "pipe:1", "-nostats"] + ffmpeg_cmd[1:]
+        timed_out = threading.Event()
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+
+            def kill_on_timeout():
+                timed_out.set()
+                process.kill()
+
+            timer = threading.Timer(timeout, kill_on_timeout)
+            timer.start()
+            try:
+                for raw_line in process.stdout:
+                    if progress is None:
+                        continue
+                    if progress.get("cancel"):
+                        process.kill()
+                        break
+                    key, _, value = raw_line.decode("utf-8", errors="ignore").strip().partition("=")
+                    # out_time_us, and out_time_ms on older FFmpeg builds, are both microseconds
+                    if key in ("out_time_us", "out_time_ms") and value.isdigit():
+                        progress["out_time"] = int(value) / 1_000_000
+                    elif key == "speed":
+                        progress["speed"] = value
+                returncode = process.wait()
+            finally:
+                timer.cancel()
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout, stderr=stderr)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, output=b"", stderr=stderr)
+        return subprocess.CompletedProcess(cmd, returncode, stdout=b"", stderr=stderr)
+
     def _validate_output_video(self, output_path: Path) -> bool:
         if not output_path.exists():
             return False
@@ -357,12 +673,14 @@ class StorageService:
         
         return True
 
-    def _save_candidate_video_sync(self, response_id: str, base_url: str = None, file_extension: str = "webm") -> str:
+    def _save_candidate_video_sync(self, response_id: str, base_url: str = None, file_extension: str = "webm",
+                                   progress: Optional[dict] = None) -> str:
         """
         Synchronous version of video processing - contains all blocking operations.
         Uses local storage if storage_type is 'local', S3 if 's3'.
         Temp files are always kept locally for processing.
         This should be called via asyncio.to_thread() to avoid blocking the event loop.
+        `progress` receives FFmpeg's progress (see _run_ffmpeg).
         """
         use_s3 = self.storage_type == 's3'
         logger.info(f"Video processing for response_id: {response_id}, storage_type: {self.storage_type}, use_s3: {use_s3}")
@@ -377,9 +695,10 @@ class StorageService:
             logger.info(f"Using local storage, output will be in videos directory: {output_path}")
         
         # Check if video already exists (only for local storage)
-        if not use_s3 and output_path.exists() and output_path.stat().st_size > 0:
-            logger.info(f"Video already exists: {output_path}, size: {output_path.stat().st_size} bytes")
-            return self._get_video_url(response_id, base_url)
+        existing_video = None if use_s3 else self.existing_video_path(response_id)
+        if existing_video:
+            logger.info(f"Video already exists: {existing_video}, size: {existing_video.stat().st_size} bytes")
+            return self._get_video_url(response_id, base_url, existing_video.suffix.lstrip("."))
         
         # Temp directory is ALWAYS local - contains chunks, merged.webm, etc.
         # This is independent of storage_type (local or s3)
@@ -389,35 +708,25 @@ class StorageService:
             return None
         logger.debug(f"Using local temp directory for processing: {temp_response_dir}")
         
-        chunks = self._find_all_chunks(temp_response_dir)
-        logger.info(f"Found {len(chunks)} chunks for response_id: {response_id}")
-        
-        if not chunks:
-            logger.error(f"No chunks found in temp directory: {temp_response_dir}")
-            return None
-        
-        # Log chunk details
-        for idx, chunk in enumerate(chunks[:5]):  # Log first 5 chunks
-            logger.debug(f"Chunk {idx + 1}: {chunk.name}, size: {chunk.stat().st_size} bytes")
-        if len(chunks) > 5:
-            logger.debug(f"... and {len(chunks) - 5} more chunks")
-        
-        if not self._validate_chunks(chunks):
-            logger.warning(f"Chunks validation failed for response_id: {response_id}")
-            logger.warning(f"Chunk details: count={len(chunks)}, first_chunk={chunks[0].name if chunks else 'N/A'}")
-            return None
-        
-        merged_webm = temp_response_dir / "merged.webm"
-        logger.info(f"Starting chunk merge for response_id: {response_id}, output: {merged_webm}")
-        
-        if not self._merge_chunks_to_webm(chunks, merged_webm):
-            logger.error(f"Failed to merge chunks to WebM for response_id: {response_id}")
-            # Check if merged file exists
-            if merged_webm.exists():
-                logger.error(f"Merged file exists but merge failed: {merged_webm}, size: {merged_webm.stat().st_size} bytes")
-            else:
-                logger.error(f"Merged file was not created: {merged_webm}")
-            return None
+        if ChunkManifest.exists(temp_response_dir):
+            # Chunks were appended as they arrived: merged.webm is already the whole recording
+            merged_webm = self._finalize_chunks(temp_response_dir)
+            if merged_webm is None:
+                return None
+        else:
+            # Per-chunk files of a recording that started before the manifest was deployed
+            chunks = self._find_all_chunks(temp_response_dir)
+            logger.info(f"Found {len(chunks)} legacy chunks for response_id: {response_id}")
+            if not chunks:
+                logger.error(f"No chunks recorded in temp directory: {temp_response_dir}")
+                return None
+            if not self._validate_chunks(chunks):
+                logger.warning(f"Chunks validation failed for response_id: {response_id}")
+                return None
+            merged_webm = temp_response_dir / self.MERGED_NAME
+            if not self._merge_chunks_to_webm(chunks, merged_webm):
+                logger.error(f"Failed to merge chunks to WebM for response_id: {response_id}")
+                return None
         
         # Verify merged file exists and has content
         if not merged_webm.exists():
@@ -429,39 +738,45 @@ class StorageService:
             logger.error(f"Merged WebM file is empty: {merged_webm}")
             return None
         
-        logger.info(f"Chunks merged successfully. Merged WebM size: {merged_size} bytes")
+        logger.info(f"Merged WebM ready. Size: {merged_size} bytes")
 
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         logger.info(f"Output directory ensured: {output_path.parent}")
 
+        # Stream copy when the recording's codecs and timestamps allow it; full transcode otherwise
+        remuxed_path = self._try_stream_copy(response_id, merged_webm, output_path, progress)
+        stream_copied = remuxed_path is not None
+        if stream_copied:
+            output_path = remuxed_path
+        extension = output_path.suffix.lstrip(".")
+
         ffmpeg_cmd = self._build_ffmpeg_command(merged_webm, output_path)
-        logger.info(f"Running FFmpeg to convert WebM to MP4 for response_id: {response_id}")
+        logger.info(f"Running FFmpeg to convert WebM to MP4 for response_id: {response_id} (stream copied: {stream_copied})")
         logger.info(f"Input: {merged_webm} (exists: {merged_webm.exists()}, size: {merged_webm.stat().st_size if merged_webm.exists() else 0} bytes)")
         logger.info(f"Output: {output_path} (will upload to S3 after processing)")
         logger.debug(f"FFmpeg command: {' '.join(ffmpeg_cmd)}")
         
         try:
-            # Run FFmpeg subprocess (blocking operation)
-            logger.info(f"Starting FFmpeg process for response_id: {response_id}")
-            import time
-            start_time = time.time()
-            
-            # Run FFmpeg with timeout - increased to 900s (15 min) for large/corrupted files
-            # Also capture stderr in real-time to see progress
-            result = subprocess.run(
-                ffmpeg_cmd, 
-                check=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                timeout=900  # 15 minutes for very large or problematic videos
-            )
-            
-            elapsed_time = time.time() - start_time
-            logger.info(f"FFmpeg completed successfully for response_id: {response_id} in {elapsed_time:.2f} seconds")
+            result = None
+            if not stream_copied:
+                # Run FFmpeg subprocess (blocking operation)
+                logger.info(f"Starting FFmpeg process for response_id: {response_id}")
+                start_time = time.time()
+                
+                # Run FFmpeg with timeout - increased to 900s (15 min) for large/corrupted files
+                # Progress is read from FFmpeg's -progress output while it runs
+                result = self._run_ffmpeg(
+                    ffmpeg_cmd,
+                    timeout=900,  # 15 minutes for very large or problematic videos
+                    progress=progress
+                )
+                
+                elapsed_time = time.time() - start_time
+                logger.info(f"FFmpeg completed successfully for response_id: {response_id} in {elapsed_time:.2f} seconds")
             
             # Always log FFmpeg stderr for debugging (it often contains useful info)
-            if result.stderr:
+            if result is not None and result.stderr:
                 stderr_output = result.stderr.decode('utf-8', errors='ignore')
                 # Log last 1000 chars of stderr (usually contains the most relevant info)
                 stderr_snippet = stderr_output[-1000:] if len(stderr_output) > 1000 else stderr_output
@@ -494,7 +809,7 @@ class StorageService:
                 logger.info(f"Uploading video to S3 for response_id: {response_id}")
                 try:
                     with open(output_path, "rb") as f:
-                        response_url = self._upload_to_s3(f"videos/{response_id}.mp4", f.read())
+                        response_url = self._upload_to_s3(f"videos/{response_id}.{extension}", f.read())
                     logger.info(f"Video uploaded to S3 successfully for response_id: {response_id}, URL: {response_url}")
                     
                     # Clean up local temp files after successful S3 upload
@@ -521,11 +836,12 @@ class StorageService:
                 # Local storage - just clean up temp directory, keep the video file
                 try:
                     shutil.rmtree(temp_response_dir, ignore_errors=True)
+                    self.forget_chunks(response_id)
                     logger.debug(f"Cleaned up temp directory: {temp_response_dir}")
                 except Exception as cleanup_error:
                     logger.warning(f"Failed to remove temp directory {temp_response_dir}: {cleanup_error}")
                 
-                return self._get_video_url(response_id, base_url)
+                return self._get_video_url(response_id, base_url, extension)
             
         except subprocess.TimeoutExpired as e:
             logger.error(f"FFmpeg timeout (600s) for response_id: {response_id}")
@@ -571,14 +887,16 @@ class StorageService:
             logger.error(f"Unexpected error during video conversion for response_id: {response_id}: {e}", exc_info=True)
             return None
 
-    async def save_candidate_video(self, response_id: str, base_url: str = None, file_extension: str = "webm") -> str:
+    async def save_candidate_video(self, response_id: str, base_url: str = None, file_extension: str = "webm",
+                                   progress: Optional[dict] = None) -> str:
         try:
             try:
                 return await asyncio.to_thread(
                     self._save_candidate_video_sync,
                     response_id,
                     base_url,
-                    file_extension
+                    file_extension,
+                    progress
                 )
             except AttributeError:
                 # Fallback for Python < 3.9
@@ -588,7 +906,8 @@ class StorageService:
                     self._save_candidate_video_sync,
                     response_id,
                     base_url,
-                    file_extension
+                    file_extension,
+                    progress
                 )
         except Exception as e:
             logger.error(f"Error in async wrapper for video processing for response_id: {response_id}: {e}", exc_info=True)
@@ -9,10 +9,16 @@ from config_loader import load_config
 from openai import AsyncOpenAI
 from openai import AsyncAzureOpenAI
 import re
+import time
+from services.model_routing import model_router
+from utils.content_cache import ContentCache, text_key
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Bump when the prompt below changes so cached summaries from the old prompt are not reused
+JD_SUMMARY_CACHE_VERSION = 1
+
 class SummarizationService:
     def __init__(self):
         self.config = load_config()  
@@ -44,8 +50,17 @@ class SummarizationService:
             )
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
+
+        cache_config = self.config.get('content_cache', {}) or {}
+        self.summary_cache = ContentCache("jd_summary", int(cache_config.get('jd_summary_ttl_seconds', 30 * 24 * 3600)))
     
     async def summarize_jd(self, job_description: str):
+        """JD summary JSON, cached by the hash of the normalized JD text (failures are not cached)."""
+        cache_key = f"v{JD_SUMMARY_CACHE_VERSION}:{text_key(job_description)}"
+        cached = await self.summary_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("JD summary cache hit")
+            return cached
         try:
             jd_block = f"Job Description:\n{job_description}"
             
@@ -67,12 +82,24 @@ class SummarizationService:
             Do not include any extra text or explanations.
             """
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.3
-            )
+            decision = model_router.choose("jd_summary")
+            start = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=decision.deployment,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=decision.max_tokens or 300,
+                    temperature=0.3,
+                    timeout=decision.timeout_seconds,
+                )
+            except Exception as e:
+                model_router.record("jd_summary", decision, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+                raise
+            usage = getattr(response, "usage", None)
+            model_router.record("jd_summary", decision, (time.perf_counter() - start) * 1000, usage={
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            } if usage else None)
 
             summary_text = response.choices[0].message.content.strip()
             match = re.search(r"\{.*\}", summary_text, re.DOTALL)
@@ -82,6 +109,7 @@ class SummarizationService:
                 raise ValueError(f"Response not valid JSON: {summary_text}")
 
             summary_data = json.loads(json_text)
+            await self.summary_cache.set(cache_key, summary_data)
             return summary_data
 
         except Exception as e:
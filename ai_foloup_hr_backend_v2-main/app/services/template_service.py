@@ -0,0 +1,181 @@
+# Interview templates: snapshot an interview's prepared set-up and create new interviews from it
+
+import copy
+import uuid
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from db import AsyncSessionLocal
+from models import Interview, InterviewTemplate
+from services.llm_service import llm_service
+from services.summarization_service import summarization_service
+from services.question_service import TEMPLATE_SOURCE
+from utils.interview_utils import get_voice_id, normalize_question, question_text, warm_tts
+from utils.job_queue import enqueue, register_handler
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TEMPLATE_QUEUE = "analysis"
+TTS_CONCURRENCY = 4
+
+
+def _prepared_questions(interview) -> List[Dict]:
+    prepared = interview.llm_generated_questions
+    if isinstance(prepared, dict):
+        prepared = prepared.get("questions")
+    return [normalize_question(q) for q in prepared or []]
+
+
+def _pool_copy(question_pool) -> Optional[Dict]:
+    # Usage records belong to the interview that paid for the generation
+    if not isinstance(question_pool, dict) or not question_pool.get("questions"):
+        return None
+    return {k: copy.deepcopy(v) for k, v in question_pool.items() if k != "_usage"}
+
+
+class TemplateService:
+    """
+    A template stores what an interview needed LLM calls for (JD summary in `context`, the predefined
+    question set, the question pool) together with its voice and settings. Creating an interview from
+    it is a single insert: the first /generate-questions serves the copied set (TEMPLATE_SOURCE) and
+    start-interview samples from the copied pool. TTS audio is content-addressed by voice and text,
+    so it is warmed once per template and reused by every interview created from it.
+
+    LLM calls only happen when a template edit invalidates the prepared set-up (see apply_edits).
+    """
+
+    def from_interview(self, interview, name: Optional[str] = None) -> InterviewTemplate:
+        return InterviewTemplate(
+            name=name or interview.name or "Untitled template",
+            organization_id=interview.organization_id,
+            user_id=interview.user_id,
+            source_interview_id=interview.id,
+            interviewer_id=interview.interviewer_id,
+            job_description=interview.job_description,
+            description=interview.description,
+            question_mode=interview.question_mode,
+            question_count=interview.question_count,
+            auto_question_generate=interview.auto_question_generate,
+            manual_questions=copy.deepcopy(interview.manual_questions),
+            time_duration=interview.time_duration,
+            is_anonymous=interview.is_anonymous,
+            context=copy.deepcopy(interview.context or {}),
+            questions=_prepared_questions(interview),
+            question_pool=_pool_copy(interview.question_pool),
+        )
+
+    def new_interview(self, template: InterviewTemplate, name: Optional[str] = None, description: Optional[str] = None,
+                      interviewer_id: Optional[uuid.UUID] = None, time_duration: Optional[str] = None) -> Interview:
+        """Interview row carrying the template's prepared set-up; the caller adds url/slug and inserts it."""
+        questions = [dict(q) for q in template.questions or []]
+        return Interview(
+            name=name or template.name,
+            job_description=template.job_description,
+            description=description if description is not None else template.description,
+            organization_id=template.organization_id,
+            user_id=template.user_id,
+            interviewer_id=interviewer_id or template.interviewer_id,
+            question_mode=template.question_mode,
+            question_count=template.question_count,
+            auto_question_generate=template.auto_question_generate,
+            manual_questions=copy.deepcopy(template.manual_questions),
+            time_duration=time_duration or template.time_duration,
+            is_anonymous=template.is_anonymous,
+            context=copy.deepcopy(template.context or {}),
+            llm_generated_questions={
+                "questions": questions,
+                "source": TEMPLATE_SOURCE,
+                "template_id": str(template.id),
+            } if questions else None,
+            question_pool=_pool_copy(template.question_pool),
+        )
+
+    def _generates_questions(self, template: InterviewTemplate) -> bool:
+        # Same condition under which /generate-questions would call the LLM
+        return template.question_mode == "predefined" and bool(template.auto_question_generate or not template.manual_questions)
+
+    async def apply_edits(self, template: InterviewTemplate, job_description: Optional[str] = None,
+                          question_count: Optional[int] = None, mode: Optional[str] = None,
+                          questions: Optional[List[Dict]] = None) -> bool:
+        """
+        Apply edits that affect the prepared set-up, regenerating only what they invalidate:
+        a new JD re-summarizes (and regenerates the questions in the same call), a larger question
+        count generates just the missing questions. Returns True if the question set changed.
+        """
+        changed = False
+        if mode is not None and mode != template.question_mode:
+            template.question_mode = mode
+            changed = True
+        if question_count is not None and question_count > 0 and question_count != template.question_count:
+            template.question_count = question_count
+            changed = True
+        if questions is not None:
+            template.questions = [normalize_question(q) for q in questions]
+            changed = True
+
+        if job_description is not None and job_description != template.job_description:
+            template.job_description = job_description
+            changed = True
+            if self._generates_questions(template) and questions is None:
+                setup = await llm_service.summarize_jd_and_generate_questions(
+                    job_description, template.question_count, template.name or ""
+                )
+                summary = setup["summary"]
+                template.questions = [normalize_question(q) for q in setup["questions"]]
+            else:
+                summary = await summarization_service.summarize_jd(job_description)
+            if isinstance(summary, dict):
+                summary["context_summary"] = summarization_service.get_context_for_llm(summary)
+            template.context = summary
+
+        if self._generates_questions(template):
+            current = list(template.questions or [])
+            missing = (template.question_count or 0) - len(current)
+            if missing > 0:
+                result = await llm_service._generate_predefined_questions(
+                    summarization_service.get_context_for_llm(template.context) if template.context else "",
+                    missing, template.job_description or "", template.name or "",
+                    existing_questions=[question_text(q) for q in current],
+                )
+                current += [normalize_question(q) for q in result.get("questions", [])]
+            template.questions = current[:template.question_count] if template.question_count else current
+
+        if changed:
+            # Pooled questions were generated for the old set-up; new interviews build their own pool
+            template.question_pool = None
+        return changed
+
+    async def schedule_tts_warm(self, template_id: str, interviewer_id: Optional[str] = None) -> None:
+        try:
+            await enqueue(TEMPLATE_QUEUE, "warm_template_tts", {
+                "template_id": str(template_id),
+                "interviewer_id": str(interviewer_id) if interviewer_id else None,
+            })
+        except Exception as e:
+            logger.warning(f"Failed to schedule TTS warm-up for template {template_id}: {e}")
+
+    async def warm(self, template_id: str, interviewer_id: Optional[str] = None) -> None:
+        """Synthesize the template's questions (and pooled questions) in the given or the template's voice."""
+        async with AsyncSessionLocal() as db:
+            template = (await db.execute(
+                select(InterviewTemplate).where(InterviewTemplate.id == uuid.UUID(template_id))
+            )).scalar_one_or_none()
+            if not template:
+                return
+            texts = [question_text(q) for q in template.questions or []]
+            texts += [question_text(q) for q in (template.question_pool or {}).get("questions", [])]
+            # An interview created with a different interviewer than the template's is warmed in its voice
+            voice_owner = Interview(interviewer_id=uuid.UUID(interviewer_id)) if interviewer_id else template
+            voice_id = await get_voice_id(db, voice_owner)
+        await warm_tts(texts, voice_id, TTS_CONCURRENCY)
+        logger.info(f"Warmed TTS for {len(texts)} questions of template {template_id}")
+
+
+template_service = TemplateService()
+
+
+async def _handle_warm_template_tts(payload: dict) -> None:
+    await template_service.warm(payload["template_id"], payload.get("interviewer_id"))
+
+
+register_handler("warm_template_tts", _handle_warm_template_tts)
@@ -5,6 +5,8 @@ from typing import Optional, AsyncIterator
 import aiohttp
 from config_loader import load_config
 
+STREAM_CHUNK_BYTES = 4096
+
 
 class TTSProvider:
     async def synthesize(self, text: str, voice_id: Optional[str] = None, audio_format: str = "mp3") -> bytes:
@@ -34,10 +36,7 @@ class ElevenLabsProvider(TTSProvider):
 
         self.base_url = "https://api.elevenlabs.io/v1"
 
-    async def synthesize(self, text: str, voice_id: Optional[str] = None, audio_format: str = "mp3") -> bytes:
-        if not text:
-            return b""
-
+    def _request(self, text: str, voice_id: Optional[str], audio_format: str):
         voice_to_use = voice_id or self.default_voice_id
         url = f"{self.base_url}/text-to-speech/{voice_to_use}/stream"
 
@@ -54,18 +53,41 @@ class ElevenLabsProvider(TTSProvider):
                 "similarity_boost": 0.75
             }
         }
+        return url, headers, payload
 
+    async def _raise_for_status(self, resp) -> None:
+        if resp.status != 200:
+            try:
+                err = await resp.json()
+            except Exception:
+                err = await resp.text()
+            raise RuntimeError(f"ElevenLabs TTS error {resp.status}: {err}")
+
+    async def synthesize(self, text: str, voice_id: Optional[str] = None, audio_format: str = "mp3") -> bytes:
+        if not text:
+            return b""
+
+        url, headers, payload = self._request(text, voice_id, audio_format)
         timeout = aiohttp.ClientTimeout(total=180)
         async with aiohttp.ClientSession(timeout=timeout) as session:
             async with session.post(url, headers=headers, json=payload) as resp:
-                if resp.status != 200:
-                    try:
-                        err = await resp.json()
-                    except Exception:
-                        err = await resp.text()
-                    raise RuntimeError(f"ElevenLabs TTS error {resp.status}: {err}")
+                await self._raise_for_status(resp)
                 return await resp.read()
 
+    async def stream_synthesize(self, text: str, voice_id: Optional[str] = None, audio_format: str = "mp3") -> AsyncIterator[bytes]:
+        # Yields audio as ElevenLabs produces it instead of waiting for the whole clip
+        if not text:
+            return
+
+        url, headers, payload = self._request(text, voice_id, audio_format)
+        timeout = aiohttp.ClientTimeout(total=180)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(url, headers=headers, json=payload) as resp:
+                await self._raise_for_status(resp)
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_BYTES):
+                    if chunk:
+                        yield chunk
+
 
 class TTSService:
     def __init__(self, provider: Optional[TTSProvider] = None):
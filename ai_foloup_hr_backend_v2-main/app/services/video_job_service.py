@@ -0,0 +1,164 @@
+# Candidate video transcoding jobs: Redis-queued, deduplicated per response, run by app/worker.py
+
+import asyncio
+import time
+from typing import Dict, Optional
+from config_loader import load_config
+from db import AsyncSessionLocal
+from services.storage_service import storage_service
+from utils.interview_utils import get_response_or_404
+from utils.job_queue import enqueue, queue_depth, register_handler
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VIDEO_QUEUE = "video"
+
+_video_config = load_config().get("video_jobs", {}) or {}
+# Concurrent ffmpeg encodes per worker process (app/worker.py)
+CONCURRENCY = int(_video_config.get("concurrency", 2))
+# Also consume the queue inside the API process (single-process deployments without app/worker.py)
+RUN_IN_API = bool(_video_config.get("run_in_api", False))
+# Gives the last chunks of the recording time to arrive after end-interview
+MERGE_DELAY_SECONDS = float(_video_config.get("merge_delay_seconds", 3))
+DEDUP_TTL_SECONDS = int(_video_config.get("dedup_ttl_seconds", 7200))
+STATUS_TTL_SECONDS = int(_video_config.get("status_ttl_seconds", 86400))
+PROGRESS_INTERVAL_SECONDS = float(_video_config.get("progress_interval_seconds", 2))
+RUNNING_KEY = "video:running"
+
+
+def _dedup_key(response_id: str) -> str:
+    return f"video:job:{response_id}"
+
+def _status_key(response_id: str) -> str:
+    return f"video:status:{response_id}"
+
+
+class VideoJobService:
+    """
+    One transcode per response at a time, across all processes: enqueue() claims
+    video:job:{response_id} with SET NX and the claim is released when the job finishes or gives up.
+    Retries and crash recovery come from utils.job_queue.
+
+    video:status:{response_id} holds the job's state (queued | running | retrying | done | failed),
+    ffmpeg progress and the resulting URL.
+    """
+
+    async def enqueue(self, response_id: str, base_url: Optional[str] = None) -> bool:
+        """Queue the transcode of a response's recording. Returns False if one is already queued or running."""
+        # The interview has ended: this process no longer needs the recording's manifest cached
+        storage_service.forget_chunks(response_id)
+        redis = await get_redis()
+        if not await redis.set(_dedup_key(response_id), b"1", nx=True, ex=DEDUP_TTL_SECONDS):
+            logger.debug(f"Video job for response_id {response_id} already queued or running")
+            return False
+        try:
+            await self._set_status(response_id, state="queued", queued_at=time.time(), progress=0, error="")
+            await enqueue(VIDEO_QUEUE, "transcode_video", {"response_id": response_id, "base_url": base_url},
+                          delay_seconds=MERGE_DELAY_SECONDS)
+        except Exception:
+            await redis.delete(_dedup_key(response_id))
+            raise
+        return True
+
+    async def _set_status(self, response_id: str, **fields) -> None:
+        redis = await get_redis()
+        key = _status_key(response_id)
+        await redis.hset(key, mapping={k: "" if v is None else str(v) for k, v in fields.items()})
+        await redis.expire(key, STATUS_TTL_SECONDS)
+
+    async def get_status(self, response_id: str) -> Optional[Dict]:
+        redis = await get_redis()
+        raw = await redis.hgetall(_status_key(response_id))
+        if not raw:
+            return None
+        status = {
+            (k.decode("utf-8") if isinstance(k, bytes) else k): (v.decode("utf-8") if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+        for field in ("progress", "out_time_seconds", "duration_seconds", "queued_at", "started_at", "finished_at"):
+            if status.get(field):
+                status[field] = float(status[field])
+        return status
+
+    async def get_overview(self) -> Dict:
+        redis = await get_redis()
+        running = sorted(m.decode("utf-8") if isinstance(m, bytes) else m for m in await redis.smembers(RUNNING_KEY))
+        return {
+            "queue": await queue_depth(VIDEO_QUEUE),
+            "concurrency_per_worker": CONCURRENCY,
+            "running": [{"response_id": rid, **(await self.get_status(rid) or {})} for rid in running],
+        }
+
+    async def _expected_duration(self, response_id: str) -> Optional[float]:
+        try:
+            async with AsyncSessionLocal() as db:
+                response = await get_response_or_404(db, response_id)
+                return float(response.duration) if response.duration else None
+        except Exception:
+            return None
+
+    async def _report_progress(self, response_id: str, progress: Dict, duration: Optional[float]) -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+            out_time = progress.get("out_time", 0.0)
+            fields = {"out_time_seconds": round(out_time, 1), "speed": progress.get("speed", "")}
+            if duration:
+                # The recording may run slightly past the interview's measured duration
+                fields["progress"] = round(min(out_time / duration, 0.99), 3)
+            try:
+                await self._set_status(response_id, **fields)
+            except Exception as e:
+                logger.debug(f"Failed to report video progress for response_id {response_id}: {e}")
+
+    async def transcode(self, response_id: str, base_url: Optional[str] = None) -> None:
+        redis = await get_redis()
+        duration = await self._expected_duration(response_id)
+        # Filled by the ffmpeg thread; "cancel" stops the encode when the worker shuts down
+        progress: Dict = {"out_time": 0.0, "cancel": False}
+        await redis.sadd(RUNNING_KEY, response_id)
+        await self._set_status(response_id, state="running", started_at=time.time(), progress=0,
+                               duration_seconds=duration, error="")
+        reporter = asyncio.create_task(self._report_progress(response_id, progress, duration))
+        try:
+            video_url = await storage_service.save_candidate_video(response_id, base_url, progress=progress)
+        except asyncio.CancelledError:
+            progress["cancel"] = True
+            raise
+        finally:
+            reporter.cancel()
+            storage_service.forget_chunks(response_id)
+            await redis.srem(RUNNING_KEY, response_id)
+
+        if not video_url:
+            await self._set_status(response_id, state="retrying", error="Video processing failed")
+            raise RuntimeError(f"Video processing failed for response_id: {response_id}")
+
+        async with AsyncSessionLocal() as db:
+            response = await get_response_or_404(db, response_id)
+            if response.candidate_video_url != video_url:
+                response.candidate_video_url = video_url
+                await db.commit()
+        await self._set_status(response_id, state="done", progress=1, url=video_url, finished_at=time.time())
+        await redis.delete(_dedup_key(response_id))
+        logger.info(f"Video ready for response_id: {response_id}, url: {video_url}")
+
+    async def give_up(self, response_id: str) -> None:
+        await self._set_status(response_id, state="failed", finished_at=time.time())
+        redis = await get_redis()
+        await redis.delete(_dedup_key(response_id))
+
+
+video_job_service = VideoJobService()
+
+
+async def _handle_transcode_video(payload: dict) -> None:
+    await video_job_service.transcode(payload["response_id"], payload.get("base_url"))
+
+
+async def _give_up_transcode_video(payload: dict) -> None:
+    await video_job_service.give_up(payload["response_id"])
+
+
+register_handler("transcode_video", _handle_transcode_video, on_give_up=_give_up_transcode_video)
@@ -9,12 +9,15 @@ import base64
 import re
 import time
 from services.storage_service import storage_service
+from services.speculation_service import speculation_service
+from services.question_stream_service import question_stream_service
 from utils.logger import get_logger
 from utils.audio_utils import extract_opus_from_webm_chunk
 
 logger = get_logger(__name__)
 sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
 _sessions = {}  
+_question_streams = {}
 
 async def _cleanup_session(sid):
     sess = _sessions.pop(sid, None)
@@ -61,6 +64,9 @@ async def _cleanup_session(sid):
             except Exception as e:
                 logger.warning(f"Error handling {task_name} for sid={sid}, response_id={response_id}: {type(e).__name__}: {e}")
 
+    if sess.get("speculate") and sess.get("response_id"):
+        speculation_service.cancel(sess["response_id"])
+
     if "session_id" in sess:
         try:
             await remove_session(sess["session_id"])
@@ -101,6 +107,9 @@ async def start_interview(sid, data):
 
         if not interview.is_open:
             return {"ok": False, "error": "Interview is not active"}
+
+        # Dynamic interviews prepare the next question while the candidate is still answering
+        speculate = interview.question_mode == "dynamic" and bool(response_id)
     
 
     session_id = f"{interview_id}_{response_id}"
@@ -108,6 +117,7 @@ async def start_interview(sid, data):
     
     async def transcript_emitter(sid, t_queue, response_id_for_logging):
         last_partial = ""
+        final_segments = []
         while True:
             try:
                 update = await t_queue.get()
@@ -121,6 +131,14 @@ async def start_interview(sid, data):
                     logger.warning(f"Failed to emit transcript to sid={sid}, response_id={response_id_for_logging}: {type(emit_error).__name__}: {emit_error}")
                 if is_final:  
                     last_partial = ""
+                    if text:
+                        final_segments.append(text)
+                else:
+                    last_partial = text
+                if speculate:
+                    speculation_service.on_transcript(
+                        response_id_for_logging, " ".join(final_segments + ([last_partial] if last_partial else []))
+                    )
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -148,6 +166,7 @@ async def start_interview(sid, data):
         "emitter_task": emitter_task,
         "created_at": time.time(),
         "reconnecting": False,  
+        "speculate": speculate,
     }
     
     active_sessions = {k: v.get("response_id", "unknown") for k, v in _sessions.items() if v.get("stt_task") and not v.get("stt_task").done()}
@@ -355,6 +374,26 @@ async def end_interview(sid, data=None):
             pass
         _sessions.pop(sid, None)
 
+@sio.event
+async def stream_current_question(sid, data):
+    """Streaming alternative to GET /get-current-question: text deltas and TTS audio arrive as events."""
+    response_id = (data or {}).get("response_id")
+    if not response_id:
+        return {"ok": False, "error": "response_id is required"}
+
+    running = _question_streams.get(sid)
+    if running and not running.done():
+        return {"ok": False, "error": "A question is already streaming"}
+
+    async def emit(event, payload):
+        await sio.emit(event, payload, to=sid)
+
+    task = asyncio.create_task(question_stream_service.stream_current_question(response_id, emit))
+    _question_streams[sid] = task
+    task.add_done_callback(lambda t: _question_streams.pop(sid, None) if _question_streams.get(sid) is t else None)
+    return {"ok": True, "response_id": response_id}
+
+
 @sio.event
 async def save_video_chunk(sid, data):
     response_id = data.get("response_id")
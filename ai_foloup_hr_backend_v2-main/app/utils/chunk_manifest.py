@@ -0,0 +1,110 @@
+# Per-response video chunk manifest: in memory, journaled to an fsync'd JSONL sidecar
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+class ChunkManifest:
+    """
+    Where every chunk of one response's recording is: appended ranges of the assembled file
+    (index, offset, length, crc) and chunks parked until the chunk before them arrives.
+
+    Lookups are O(1) in memory. Each change is one JSON line appended to the sidecar and fsync'd
+    before the write is acknowledged, so a restarted process replays the journal instead of
+    scanning the directory:
+
+        {"op": "append", "index": 3, "offset": 51234, "length": 16890, "crc": 123456789}
+        {"op": "park", "index": 7, "crc": 987654321, "ext": "webm"}
+
+    A park is cleared by the later append of the same index. A torn last line (crash mid-write)
+    is ignored on replay. Another process may journal to the same sidecar (under the caller's
+    file lock); is_current() tells a cached manifest that it has to be replayed again.
+    """
+
+    def __init__(self, directory: Path):
+        self.path = directory / MANIFEST_NAME
+        self.size = 0
+        self.journal_size = 0
+        self.next_index = 0
+        self.max_index = -1
+        self.ranges: List[Dict] = []
+        self.appended: Dict[int, Dict] = {}
+        self.pending: Dict[int, Dict] = {}
+
+    @classmethod
+    def load(cls, directory: Path) -> "ChunkManifest":
+        manifest = cls(directory)
+        if not manifest.path.exists():
+            return manifest
+        with open(manifest.path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            # Torn last record: cut it so the next record starts on its own line
+            logger.warning(f"Dropping incomplete last record of {manifest.path}")
+            with open(manifest.path, "r+b") as f:
+                f.truncate(complete)
+        manifest.journal_size = complete
+        for line_number, line in enumerate(data[:complete].splitlines(), 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring unreadable line {line_number} of {manifest.path}")
+                continue
+            manifest._apply(record)
+        return manifest
+
+    @staticmethod
+    def exists(directory: Path) -> bool:
+        return (directory / MANIFEST_NAME).exists()
+
+    def is_current(self) -> bool:
+        """False if the sidecar was written since this manifest last read or wrote it."""
+        try:
+            return os.path.getsize(self.path) == self.journal_size
+        except FileNotFoundError:
+            return self.journal_size == 0
+
+    def _apply(self, record: Dict) -> None:
+        index = record["index"]
+        self.max_index = max(self.max_index, index)
+        if record["op"] == "append":
+            entry = {"index": index, "offset": record["offset"], "length": record["length"], "crc": record["crc"]}
+            self.ranges.append(entry)
+            self.appended[index] = entry
+            self.pending.pop(index, None)
+            self.size = entry["offset"] + entry["length"]
+            self.next_index = index + 1
+        elif record["op"] == "park":
+            self.pending[index] = {"index": index, "crc": record["crc"], "ext": record.get("ext", "webm")}
+
+    def _journal(self, record: Dict) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_size += len(line)
+        self._apply(record)
+
+    def record_append(self, index: int, offset: int, length: int, crc: int) -> None:
+        self._journal({"op": "append", "index": index, "offset": offset, "length": length, "crc": crc})
+
+    def record_park(self, index: int, crc: int, ext: str) -> None:
+        self._journal({"op": "park", "index": index, "crc": crc, "ext": ext})
+
+    def lookup(self, index: int) -> Optional[Dict]:
+        return self.appended.get(index) or self.pending.get(index)
+
+    def next_free_index(self) -> int:
+        return self.max_index + 1
+
+    def valid_ranges(self) -> List[Dict]:
+        return [r for r in self.ranges if r["length"]]
@@ -0,0 +1,87 @@
+# Content-addressed cache: in-process LRU with TTL in front of Redis
+
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional
+from config_loader import load_config
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_cache_config = load_config().get("content_cache", {}) or {}
+L1_MAX_ENTRIES = int(_cache_config.get("l1_max_entries", 256))
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form for text keys: Unicode NFKC, case-folded, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def text_key(text: str) -> str:
+    return sha256_hex(normalize_text(text).encode("utf-8"))
+
+
+class ContentCache:
+    """
+    JSON values keyed by content hash. Lookups hit a per-process LRU (max_entries, TTL) first, then
+    Redis (same TTL, shared by all workers); a Redis hit is copied into the LRU. Values are stored
+    serialized, so callers always get a fresh copy they may mutate. Redis errors degrade to a miss.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int = L1_MAX_ENTRIES):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _remember(self, key: str, raw: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, raw)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, raw = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(raw)
+            del self._entries[key]
+
+        try:
+            redis = await get_redis()
+            raw = await redis.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"Content cache '{self.namespace}' Redis read failed: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        raw = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+        self._remember(key, raw)
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        raw = json.dumps(value)
+        self._remember(key, raw)
+        try:
+            redis = await get_redis()
+            await redis.set(self._redis_key(key), raw, ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Content cache '{self.namespace}' Redis write failed: {e}")
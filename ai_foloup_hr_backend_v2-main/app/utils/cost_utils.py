@@ -15,6 +15,10 @@ ELEVENLABS_COST_PER_CHARACTER_DOLLARS = _tts_config.get("cost_per_character", 0.
 DEEPGRAM_COST_PER_MINUTE_DOLLARS = _stt_config.get("cost_per_minute", 0.006)
 GPT4O_MINI_INPUT_COST_PER_TOKEN_DOLLARS = _llm_config.get("input_cost_per_token", 0.15 / 1_000_000)
 GPT4O_MINI_OUTPUT_COST_PER_TOKEN_DOLLARS = _llm_config.get("output_cost_per_token", 0.60 / 1_000_000)
+# Prompt tokens served from the provider's prompt-prefix cache are billed at a discounted rate
+GPT4O_MINI_CACHED_INPUT_COST_PER_TOKEN_DOLLARS = _llm_config.get("cached_input_cost_per_token", 0.075 / 1_000_000)
+# Offline batch results (usage marked "batch": true) are billed at this fraction of the synchronous price
+BATCH_COST_MULTIPLIER = _llm_config.get("batch_cost_multiplier", 0.5)
 
 
 @dataclass
@@ -26,6 +30,7 @@ class CostBreakdown:
     azure_cost: float
     llm_prompt_tokens: int
     llm_completion_tokens: int
+    llm_cached_tokens: int
     question_characters: int
     duration_seconds: int
 
@@ -42,6 +47,16 @@ class CostBreakdown:
         return payload
 
 
+def llm_call_cost(prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """Dollar cost of one LLM call; cached_tokens is the part of prompt_tokens served from the prompt cache."""
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_tokens) * GPT4O_MINI_INPUT_COST_PER_TOKEN_DOLLARS
+        + cached_tokens * GPT4O_MINI_CACHED_INPUT_COST_PER_TOKEN_DOLLARS
+        + completion_tokens * GPT4O_MINI_OUTPUT_COST_PER_TOKEN_DOLLARS
+    )
+
+
 def _extract_duration_seconds(response) -> int:
     duration = getattr(response, "duration", None)
     if isinstance(duration, (int, float)) and duration > 0:
@@ -56,9 +71,10 @@ def _extract_duration_seconds(response) -> int:
     return 0
 
 
-def _extract_llm_tokens(response) -> Tuple[int, int]:
+def _extract_llm_tokens(response) -> Tuple[int, int, int]:
     prompt_tokens = 0
     completion_tokens = 0
+    cached_tokens = 0
 
     qa_history = getattr(response, "qa_history", None) or []
     if isinstance(qa_history, list):
@@ -69,6 +85,7 @@ def _extract_llm_tokens(response) -> Tuple[int, int]:
             if isinstance(usage, dict):
                 prompt_tokens += int(usage.get("prompt_tokens") or 0)
                 completion_tokens += int(usage.get("completion_tokens") or 0)
+                cached_tokens += int(usage.get("cached_tokens") or 0)
 
     overall_analysis = getattr(response, "overall_analysis", None)
     if isinstance(overall_analysis, dict):
@@ -76,8 +93,23 @@ def _extract_llm_tokens(response) -> Tuple[int, int]:
         if isinstance(usage, dict):
             prompt_tokens += int(usage.get("prompt_tokens") or 0)
             completion_tokens += int(usage.get("completion_tokens") or 0)
+            cached_tokens += int(usage.get("cached_tokens") or 0)
+
+    return prompt_tokens, completion_tokens, cached_tokens
 
-    return prompt_tokens, completion_tokens
+
+def _batch_usage_share(response) -> float:
+    """Share of the response's LLM cost that came from offline batch calls (the final analysis only)."""
+    overall_analysis = getattr(response, "overall_analysis", None)
+    usage = overall_analysis.get("_usage") if isinstance(overall_analysis, dict) else None
+    if not isinstance(usage, dict) or not usage.get("batch"):
+        return 0.0
+    batch_cost = llm_call_cost(
+        int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0), int(usage.get("cached_tokens") or 0)
+    )
+    prompt_tokens, completion_tokens, cached_tokens = _extract_llm_tokens(response)
+    total_cost = llm_call_cost(prompt_tokens, completion_tokens, cached_tokens)
+    return batch_cost / total_cost if total_cost else 0.0
 
 
 def _count_question_characters(response) -> int:
@@ -103,6 +135,8 @@ def calculate_response_cost(response) -> Dict[str, Any]:
     Expected usage metadata:
       - For per-question analysis, `qa_history[i]["analysis_usage"]`
       - For final analysis, `response.overall_analysis["_usage"]`
+    Usage entries may carry `cached_tokens` (subset of prompt_tokens billed at the cached rate);
+    a final-analysis usage marked `batch` is billed at BATCH_COST_MULTIPLIER.
     """
     question_chars = _count_question_characters(response)
     elevenlabs_cost = question_chars * ELEVENLABS_COST_PER_CHARACTER_DOLLARS
@@ -111,9 +145,18 @@ def calculate_response_cost(response) -> Dict[str, Any]:
     duration_minutes = duration_seconds / 60 if duration_seconds > 0 else 0
     deepgram_cost = duration_minutes * DEEPGRAM_COST_PER_MINUTE_DOLLARS
 
-    prompt_tokens, completion_tokens = _extract_llm_tokens(response)
-    llm_input_cost = prompt_tokens * GPT4O_MINI_INPUT_COST_PER_TOKEN_DOLLARS
+    prompt_tokens, completion_tokens, cached_tokens = _extract_llm_tokens(response)
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    llm_input_cost = (
+        (prompt_tokens - cached_tokens) * GPT4O_MINI_INPUT_COST_PER_TOKEN_DOLLARS
+        + cached_tokens * GPT4O_MINI_CACHED_INPUT_COST_PER_TOKEN_DOLLARS
+    )
     llm_output_cost = completion_tokens * GPT4O_MINI_OUTPUT_COST_PER_TOKEN_DOLLARS
+    batch_share = _batch_usage_share(response)
+    if batch_share:
+        discount = 1 - batch_share * (1 - BATCH_COST_MULTIPLIER)
+        llm_input_cost *= discount
+        llm_output_cost *= discount
     azure_cost = llm_input_cost + llm_output_cost
 
     breakdown = CostBreakdown(
@@ -124,6 +167,7 @@ def calculate_response_cost(response) -> Dict[str, Any]:
         azure_cost=azure_cost,
         llm_prompt_tokens=prompt_tokens,
         llm_completion_tokens=completion_tokens,
+        llm_cached_tokens=cached_tokens,
         question_characters=question_chars,
         duration_seconds=duration_seconds,
     )
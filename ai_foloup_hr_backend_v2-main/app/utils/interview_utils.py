@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import io
 import json
@@ -9,12 +10,27 @@ import docx
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from models import Interview, Response
+from models import Interview, Interviewer, Response, ResponseQuestion
 from services.tts_service import tts_service
+from config_loader import load_config
+from utils.content_cache import ContentCache, sha256_hex
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+_content_cache_config = load_config().get("content_cache", {}) or {}
+# Extracted JD text keyed by the SHA-256 of the uploaded bytes (HR re-uploads the same files a lot)
+_file_text_cache = ContentCache(
+    "file_text",
+    int(_content_cache_config.get("file_text_ttl_seconds", 30 * 24 * 3600)),
+)
+# Question audio keyed by voice and exact text: pooled and predefined questions are spoken many times
+_tts_cache = ContentCache(
+    "tts_audio",
+    int(_content_cache_config.get("tts_audio_ttl_seconds", 7 * 24 * 3600)),
+    max_entries=int(_content_cache_config.get("tts_audio_l1_max_entries", 64)),
+)
+
 def _remove_text_field(questions: list) -> list:
     if not questions:
         return []
@@ -27,7 +43,14 @@ def _remove_text_field(questions: list) -> list:
             cleaned_questions.append(q)
     return cleaned_questions
 
-def get_questions_list(interview) -> list:
+def get_questions_list(interview, response_questions: Optional[list] = None) -> list:
+    """
+    Questions of an interview. Dynamic interviews generate questions per response, and predefined
+    responses may get their own set drawn from the question pool: pass that response's questions
+    (get_response_questions) to read them instead of the interview's.
+    """
+    if response_questions is not None and (interview.question_mode == "dynamic" or response_questions):
+        return _remove_text_field(response_questions)
     if isinstance(interview.llm_generated_questions, list):
         questions = interview.llm_generated_questions or []
         if questions:
@@ -44,6 +67,18 @@ def get_questions_list(interview) -> list:
     
     return []
 
+async def get_response_questions(db: AsyncSession, response_id) -> list:
+    result = await db.execute(
+        select(ResponseQuestion.question)
+        .where(ResponseQuestion.response_id == response_id)
+        .order_by(ResponseQuestion.position)
+    )
+    return list(result.scalars().all())
+
+async def load_questions_list(db: AsyncSession, interview, response) -> list:
+    """get_questions_list for one response, reading its own questions when it has them."""
+    return get_questions_list(interview, await get_response_questions(db, response.id))
+
 def normalize_question(q):
     if isinstance(q, dict):
         normalized = {
@@ -64,19 +99,61 @@ def question_text(q) -> str:
         return q.get("question") 
     return str(q)
 
-async def synthesize_tts(q_text: str, voice_id: Optional[str] = None) -> Optional[dict]:
+async def synthesize_tts(q_text: str, voice_id: Optional[str] = None, cache: bool = True) -> Optional[dict]:
+    """
+    TTS audio for a question. With cache=True the audio is shared by content across interviews;
+    pass cache=False for one-off text (dynamic follow-ups) so it is never stored.
+    """
     if not q_text:
         return None
+    key = sha256_hex(f"{voice_id or ''}\n{q_text}".encode("utf-8"))
+    if cache:
+        cached = await _tts_cache.get(key)
+        if cached is not None:
+            return cached
     try:
         audio_bytes = await tts_service.synthesize(q_text, voice_id=voice_id)
-        return {
+        tts_data = {
             "tts_audio_base64": base64.b64encode(audio_bytes).decode("ascii"),
             "tts_content_type": "audio/mpeg",
         }
+        if cache:
+            await _tts_cache.set(key, tts_data)
+        return tts_data
     except Exception as e:
         logger.warning(f"TTS failed: {e}", exc_info=True)
         return None
 
+async def warm_tts(texts: list, voice_id: Optional[str] = None, concurrency: int = 4) -> None:
+    """Synthesize questions ahead of time so later synthesize_tts calls are cache hits."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(text: str) -> None:
+        async with semaphore:
+            await synthesize_tts(text, voice_id)
+
+    await asyncio.gather(*(warm(t) for t in dict.fromkeys(texts) if t))
+
+async def get_voice_id(db: AsyncSession, interview) -> Optional[str]:
+    if interview.interviewer_id:
+        try:
+            interviewer_result = await db.execute(
+                select(Interviewer).where(Interviewer.id == interview.interviewer_id)
+            )
+            interviewer = interviewer_result.scalar_one_or_none()
+            if interviewer and interviewer.elevenlabs_voice_id:
+                return interviewer.elevenlabs_voice_id
+        except Exception:
+            pass
+    
+    try:
+        if hasattr(tts_service.provider, 'default_voice_id'):
+            return tts_service.provider.default_voice_id
+    except Exception:
+        pass
+    
+    return None
+
 async def get_interview_or_404(db: AsyncSession, interview_id: str) -> Interview:
     result = await db.execute(select(Interview).where(Interview.id == interview_id))
     interview = result.scalar_one_or_none()
@@ -84,8 +161,12 @@ async def get_interview_or_404(db: AsyncSession, interview_id: str) -> Interview
         raise HTTPException(status_code=404, detail="Interview not found")
     return interview
 
-async def get_response_or_404(db: AsyncSession, response_id: str) -> Response:
-    result = await db.execute(select(Response).where(Response.id == response_id))
+async def get_response_or_404(db: AsyncSession, response_id: str, for_update: bool = False) -> Response:
+    query = select(Response).where(Response.id == response_id)
+    if for_update:
+        # Row lock + refresh so concurrent qa_history writers (e.g. analysis jobs) are serialized
+        query = query.with_for_update().execution_options(populate_existing=True)
+    result = await db.execute(query)
     resp = result.scalar_one_or_none()
     if not resp:
         raise HTTPException(status_code=404, detail="Response not found")
@@ -113,6 +194,18 @@ def extract_text_from_file(file_content: bytes, filename: str) -> str:
     
     return file_content.decode('utf-8', errors='ignore')
 
+async def extract_text_from_file_cached(file_content: bytes, filename: str) -> str:
+    """extract_text_from_file behind the content-hash cache; parsing runs off the event loop."""
+    # The extension is part of the key: the same bytes are parsed differently as .txt and .pdf
+    key = f"{sha256_hex(file_content)}{Path(filename).suffix.lower()}"
+    cached = await _file_text_cache.get(key)
+    if cached is not None:
+        logger.debug(f"File text cache hit for {filename}")
+        return cached
+    text = await asyncio.to_thread(extract_text_from_file, file_content, filename)
+    await _file_text_cache.set(key, text)
+    return text
+
 def format_duration(seconds: int) -> str:
     """Format duration in seconds to readable format (e.g., '1m 3s' or '1:03')"""
     if not seconds or seconds <= 0:
@@ -0,0 +1,224 @@
+# Durable Redis-backed background jobs (enqueue, worker loop, retries)
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+from config_loader import load_config
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_jobs_config = load_config().get("jobs", {}) or {}
+MAX_ATTEMPTS = int(_jobs_config.get("max_attempts", 3))
+RETRY_BACKOFF_SECONDS = float(_jobs_config.get("retry_backoff_seconds", 5))
+QUEUE_CONCURRENCY = _jobs_config.get("queues", {}) or {}
+WORKER_HEARTBEAT_SECONDS = 15
+FAILED_JOBS_KEPT = 1000
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+_give_up_handlers: Dict[str, JobHandler] = {}
+
+
+def register_handler(job_type: str, handler: JobHandler, on_give_up: Optional[JobHandler] = None) -> None:
+    """
+    Register the coroutine that processes jobs of `job_type`.
+    `on_give_up` is awaited with the same payload once all retry attempts are exhausted.
+    """
+    _handlers[job_type] = handler
+    if on_give_up:
+        _give_up_handlers[job_type] = on_give_up
+
+
+def _pending_key(queue: str) -> str:
+    return f"jobs:{queue}:pending"
+
+def _delayed_key(queue: str) -> str:
+    return f"jobs:{queue}:delayed"
+
+def _failed_key(queue: str) -> str:
+    return f"jobs:{queue}:failed"
+
+def _processing_key(queue: str, worker_id: str) -> str:
+    return f"jobs:{queue}:processing:{worker_id}"
+
+def _workers_key(queue: str) -> str:
+    return f"jobs:{queue}:workers"
+
+def _heartbeat_key(worker_id: str) -> str:
+    return f"jobs:worker:{worker_id}:alive"
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+async def enqueue(queue: str, job_type: str, payload: dict, delay_seconds: float = 0) -> str:
+    """Persist a job in Redis. It survives API restarts until a worker acknowledges it."""
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "payload": payload or {},
+        "attempts": 0,
+        "enqueued_at": time.time(),
+    }
+    raw = json.dumps(job)
+    redis = await get_redis()
+    if delay_seconds > 0:
+        await redis.zadd(_delayed_key(queue), {raw: time.time() + delay_seconds})
+    else:
+        await redis.lpush(_pending_key(queue), raw)
+    logger.debug(f"Enqueued job {job['id']} ({job_type}) on queue '{queue}'")
+    return job["id"]
+
+
+async def queue_depth(queue: str) -> Dict[str, int]:
+    redis = await get_redis()
+    return {
+        "pending": await redis.llen(_pending_key(queue)),
+        "delayed": await redis.zcard(_delayed_key(queue)),
+        "failed": await redis.llen(_failed_key(queue)),
+    }
+
+
+async def _promote_delayed(redis, queue: str) -> None:
+    due = await redis.zrangebyscore(_delayed_key(queue), 0, time.time())
+    for raw in due:
+        # zrem acts as the claim, so only one worker moves a given job
+        if await redis.zrem(_delayed_key(queue), raw):
+            await redis.lpush(_pending_key(queue), raw)
+
+
+async def _recover_orphaned_jobs(redis, queue: str) -> None:
+    """Re-queue jobs held by workers whose heartbeat has expired (crash or restart)."""
+    for raw_worker_id in await redis.smembers(_workers_key(queue)):
+        worker_id = _decode(raw_worker_id)
+        if await redis.exists(_heartbeat_key(worker_id)):
+            continue
+        processing = _processing_key(queue, worker_id)
+        recovered = 0
+        while await redis.rpoplpush(processing, _pending_key(queue)):
+            recovered += 1
+        await redis.srem(_workers_key(queue), raw_worker_id)
+        if recovered:
+            logger.warning(f"Recovered {recovered} orphaned job(s) from dead worker {worker_id} on queue '{queue}'")
+
+
+async def _run_job(redis, queue: str, processing: str, raw: bytes) -> None:
+    try:
+        job = json.loads(_decode(raw))
+    except Exception:
+        logger.error(f"Dropping malformed job on queue '{queue}': {raw[:200]!r}")
+        await redis.lrem(processing, 1, raw)
+        return
+
+    job_type = job.get("type")
+    payload = job.get("payload") or {}
+    try:
+        handler = _handlers.get(job_type)
+        if handler is None:
+            raise LookupError(f"No handler registered for job type '{job_type}'")
+        await handler(payload)
+        logger.debug(f"Job {job.get('id')} ({job_type}) completed")
+    except asyncio.CancelledError:
+        # Leave the job in the processing list; it is recovered once this worker's heartbeat expires
+        raise
+    except Exception as e:
+        job["attempts"] = int(job.get("attempts", 0)) + 1
+        job["last_error"] = f"{type(e).__name__}: {e}"
+        if job["attempts"] < MAX_ATTEMPTS:
+            backoff = RETRY_BACKOFF_SECONDS * (2 ** (job["attempts"] - 1))
+            await redis.zadd(_delayed_key(queue), {json.dumps(job): time.time() + backoff})
+            logger.warning(f"Job {job.get('id')} ({job_type}) failed (attempt {job['attempts']}/{MAX_ATTEMPTS}), retrying in {backoff:.0f}s: {e}")
+        else:
+            logger.error(f"Job {job.get('id')} ({job_type}) failed after {job['attempts']} attempts: {e}", exc_info=True)
+            await redis.lpush(_failed_key(queue), json.dumps(job))
+            await redis.ltrim(_failed_key(queue), 0, FAILED_JOBS_KEPT - 1)
+            give_up = _give_up_handlers.get(job_type)
+            if give_up:
+                try:
+                    await give_up(payload)
+                except Exception as give_up_error:
+                    logger.error(f"Give-up handler for job {job.get('id')} ({job_type}) failed: {give_up_error}", exc_info=True)
+    await redis.lrem(processing, 1, raw)
+
+
+async def _keep_alive(queue: str, worker_id: str) -> None:
+    """
+    Refresh the worker's heartbeat for its whole lifetime, independently of the consume loop,
+    which stops polling while every slot is busy (long encodes, bulk reanalysis).
+    """
+    while True:
+        try:
+            redis = await get_redis()
+            await redis.set(_heartbeat_key(worker_id), b"1", ex=WORKER_HEARTBEAT_SECONDS * 3)
+            await redis.sadd(_workers_key(queue), worker_id)
+            await _recover_orphaned_jobs(redis, queue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job worker heartbeat error on queue '{queue}': {type(e).__name__}: {e}")
+        await asyncio.sleep(WORKER_HEARTBEAT_SECONDS)
+
+
+async def run_worker(queue: str, concurrency: int = 1) -> None:
+    """Consume `queue` forever with at most `concurrency` jobs in flight."""
+    worker_id = uuid.uuid4().hex
+    processing = _processing_key(queue, worker_id)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    in_flight = set()
+    heartbeat = asyncio.create_task(_keep_alive(queue, worker_id))
+    logger.info(f"Job worker {worker_id} started on queue '{queue}' (concurrency={concurrency})")
+
+    while True:
+        slot_held = False
+        try:
+            redis = await get_redis()
+            await _promote_delayed(redis, queue)
+            await semaphore.acquire()
+            slot_held = True
+            raw = await redis.brpoplpush(_pending_key(queue), processing, timeout=1)
+            if raw is None:
+                semaphore.release()
+                continue
+
+            task = asyncio.create_task(_run_job(redis, queue, processing, raw))
+            slot_held = False  # released by the task's done callback
+            in_flight.add(task)
+
+            def _done(t, _sem=semaphore):
+                in_flight.discard(t)
+                _sem.release()
+                if not t.cancelled() and t.exception():
+                    logger.error(f"Job runner crashed on queue '{queue}': {t.exception()}")
+
+            task.add_done_callback(_done)
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            for task in list(in_flight):
+                task.cancel()
+            logger.info(f"Job worker {worker_id} on queue '{queue}' stopped")
+            raise
+        except Exception as e:
+            if slot_held:
+                semaphore.release()
+            logger.error(f"Job worker error on queue '{queue}': {type(e).__name__}: {e}")
+            await asyncio.sleep(1)
+
+
+def start_workers(queues: Optional[Dict[str, int]] = None) -> List[asyncio.Task]:
+    """Start one worker task per queue. Defaults to the `jobs.queues` map from config.yaml."""
+    queues = queues if queues is not None else QUEUE_CONCURRENCY
+    return [
+        asyncio.create_task(run_worker(name, int(concurrency or 1)))
+        for name, concurrency in queues.items()
+    ]
+
+
+async def stop_workers(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
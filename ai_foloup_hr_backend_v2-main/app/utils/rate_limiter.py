@@ -0,0 +1,63 @@
+# Redis token-bucket rate limiter shared by all API workers
+
+import asyncio
+import time
+from utils.redis_utils import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Returns the seconds to wait before `cost` tokens are available (0 = taken now).
+# Returned as a string: Lua numbers are truncated to integers on the way back to Redis clients.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+if tokens < cost then
+    return tostring((cost - tokens) / rate)
+end
+redis.call("HSET", KEYS[1], "tokens", tokens - cost, "ts", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 60)
+return "0"
+"""
+
+
+class RateLimiter:
+    """
+    Token bucket refilled at `per_minute` tokens a minute, holding at most `burst` tokens.
+    State lives in Redis so the limit holds across processes.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: float = None):
+        self.name = name
+        self.rate = max(per_minute, 0.001) / 60
+        self.capacity = float(burst if burst is not None else max(1.0, per_minute / 10))
+
+    @property
+    def key(self) -> str:
+        return f"ratelimit:{self.name}"
+
+    async def acquire(self, cost: float = 1) -> float:
+        """
+        Wait until `cost` tokens are available and take them. Returns the seconds spent waiting.
+        A cost above the bucket's capacity is taken in capacity-sized parts.
+        """
+        remaining = float(cost)
+        waited = 0.0
+        while remaining > 0:
+            part = min(remaining, self.capacity)
+            redis = await get_redis()
+            wait = float(await redis.eval(_TAKE_SCRIPT, 1, self.key, self.rate, self.capacity, time.time(), part))
+            if wait <= 0:
+                remaining -= part
+                continue
+            await asyncio.sleep(wait)
+            waited += wait
+        if waited > 1:
+            logger.debug(f"Rate limiter '{self.name}' delayed a caller by {waited:.1f}s")
+        return waited
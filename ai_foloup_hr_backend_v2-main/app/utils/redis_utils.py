@@ -5,6 +5,8 @@ import os
 from dotenv import load_dotenv
 from utils.logger import get_logger
 import asyncio
+import uuid
+from typing import Optional
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -114,4 +116,43 @@ async def get_session_meta(session_id: str) -> dict:
 async def delete_session_all(session_id: str):
     redis = await get_redis()
     await redis.delete(_meta_key(session_id))
-    await remove_session(session_id)
\ No newline at end of file
+    await remove_session(session_id)
+
+# Distributed locks (SET NX + token so only the owner can release)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+def _lock_key(name: str) -> str:
+    return f"lock:{name}"
+
+async def acquire_lock(name: str, ttl_seconds: int) -> Optional[str]:
+    """Try to take the lock once. Returns the owner token, or None if someone else holds it."""
+    redis = await get_redis()
+    token = uuid.uuid4().hex
+    if await redis.set(_lock_key(name), token, nx=True, ex=ttl_seconds):
+        return token
+    return None
+
+async def extend_lock(name: str, token: str, ttl_seconds: int) -> bool:
+    """Reset the lock's TTL if `token` still owns it. False means the lock was lost."""
+    redis = await get_redis()
+    return bool(await redis.eval(_EXTEND_LOCK_SCRIPT, 1, _lock_key(name), token, ttl_seconds))
+
+async def release_lock(name: str, token: str) -> bool:
+    redis = await get_redis()
+    return bool(await redis.eval(_RELEASE_LOCK_SCRIPT, 1, _lock_key(name), token))
+
+async def is_locked(name: str) -> bool:
+    redis = await get_redis()
+    return bool(await redis.exists(_lock_key(name)))
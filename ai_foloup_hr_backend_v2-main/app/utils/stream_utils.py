@@ -0,0 +1,179 @@
+# Helpers for consuming streamed LLM output (incremental JSON field reading, sentence splitting)
+
+import json
+import re
+from typing import Dict, List
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+
+class JsonStringFieldReader:
+    """
+    Extracts the value of one string field (e.g. "question") from a JSON object that is
+    arriving in chunks, returning the decoded characters as soon as they are available.
+    Only the first occurrence of the field is read; everything else is ignored.
+    """
+
+    def __init__(self, field: str):
+        self._marker = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._scan_from = 0
+        self._in_value = False
+        self._done = False
+        self.value = ""
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> str:
+        """Consume the next chunk of raw model output; returns newly decoded value text."""
+        if self._done or not chunk:
+            return ""
+        self._buffer += chunk
+        if not self._in_value:
+            match = self._marker.search(self._buffer, max(0, self._scan_from - len(self._marker.pattern)))
+            if not match:
+                self._scan_from = len(self._buffer)
+                return ""
+            self._in_value = True
+            self._buffer = self._buffer[match.end():]
+
+        decoded = []
+        i = 0
+        while i < len(self._buffer):
+            ch = self._buffer[i]
+            if ch == '"':
+                self._done = True
+                i += 1
+                break
+            if ch != '\\':
+                decoded.append(ch)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest of it if it was split across chunks
+            if i + 1 >= len(self._buffer):
+                break
+            code = self._buffer[i + 1]
+            if code == 'u':
+                if i + 6 > len(self._buffer):
+                    break
+                try:
+                    decoded.append(json.loads(f'"{self._buffer[i:i + 6]}"'))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                decoded.append(_ESCAPES.get(code, code))
+                i += 2
+        self._buffer = self._buffer[i:]
+        text = "".join(decoded)
+        self.value += text
+        return text
+
+
+class JsonArrayObjectReader:
+    """
+    Extracts the objects of one array field (e.g. "questions": [{...}, ...]) from a JSON document
+    that is arriving in chunks. Each object is returned, parsed, as soon as its closing brace
+    arrives. Only the first occurrence of the field is read; objects that fail to parse are skipped.
+    """
+
+    def __init__(self, field: str):
+        self._marker = re.compile(r'"' + re.escape(field) + r'"\s*:\s*\[')
+        self._buffer = ""
+        self._scan_from = 0
+        self._in_array = False
+        self._done = False
+        # Scanner state inside the array: brace depth, string/escape flags and the current object's start
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+        self.count = 0
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume the next chunk of raw model output; returns the objects completed by it."""
+        if self._done or not chunk:
+            return []
+        self._buffer += chunk
+        if not self._in_array:
+            match = self._marker.search(self._buffer, max(0, self._scan_from - len(self._marker.pattern)))
+            if not match:
+                self._scan_from = len(self._buffer)
+                return []
+            self._in_array = True
+            self._buffer = self._buffer[match.end():]
+
+        objects = []
+        while self._pos < len(self._buffer):
+            ch = self._buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._depth == 0:
+                    self._object_start = self._pos
+                self._depth += 1
+            elif ch == '}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        parsed = json.loads(self._buffer[self._object_start:self._pos + 1])
+                    except ValueError:
+                        parsed = None
+                    if isinstance(parsed, dict):
+                        objects.append(parsed)
+                        self.count += 1
+                    self._object_start = None
+            elif ch == ']' and self._depth == 0:
+                self._done = True
+                break
+            self._pos += 1
+
+        # Drop consumed input; keep the unfinished object (if any) for the next chunk
+        keep_from = self._object_start if self._object_start is not None else self._pos
+        self._buffer = self._buffer[keep_from:]
+        self._pos -= keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+        return objects
+
+
+class SentenceBuffer:
+    """Accumulates streamed text and releases it one complete sentence at a time."""
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._pending = ""
+
+    def push(self, text: str) -> List[str]:
+        self._pending += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self._pending):
+            candidate = self._pending[start:match.start()].strip()
+            # Very short fragments ("Hi.", "Great!") are merged into the next sentence
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._pending = self._pending[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        remainder = self._pending.strip()
+        self._pending = ""
+        return [remainder] if remainder else []
@@ -0,0 +1,100 @@
+# Hashing-trick text vectors and an in-memory cosine index (NumPy only, no embedding model)
+
+import re
+import zlib
+from typing import List, Sequence, Tuple
+import numpy as np
+from utils.content_cache import normalize_text
+
+DEFAULT_DIM = 1024
+
+# Keeps technology names such as c++, c#, node.js and .net together
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]*[a-z0-9+#]")
+_STOPWORDS = frozenset("""
+a an and are as at be been by can could describe did do does for from had has have how i if in into is it its
+me my of on or our should so tell than that the their them then there these they this to was we were what when
+where which while who why will with would you your yourself about explain walk through give example time
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words without stopwords, plus adjacent-word bigrams."""
+    words = [w for w in _TOKEN_RE.findall(normalize_text(text)) if len(w) > 1 and w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hashing_vector(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """
+    Signed feature hashing of tokenize(text) into `dim` buckets, sublinear term frequency,
+    L2-normalized. CRC32 keeps bucket assignment stable across processes and restarts.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokenize(text):
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h // dim) % 2 == 0 else -1.0
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def vector_to_bytes(vector: np.ndarray) -> bytes:
+    # float16 halves storage; cosine scores are unaffected at the precision we threshold on
+    return vector.astype(np.float16).tobytes()
+
+
+def vector_from_bytes(data: bytes, dim: int = DEFAULT_DIM) -> np.ndarray:
+    vector = np.frombuffer(data, dtype=np.float16).astype(np.float32)
+    return vector if vector.shape[0] == dim else np.zeros(dim, dtype=np.float32)
+
+
+class SimilarityIndex:
+    """
+    Cosine similarity over a fixed set of hashed vectors. IDF weights are computed from the indexed
+    rows at build time, so terms every document shares (e.g. "experience") count for little.
+    """
+
+    def __init__(self, vectors: Sequence[np.ndarray], dim: int = DEFAULT_DIM):
+        self.dim = dim
+        matrix = np.vstack(vectors).astype(np.float32) if len(vectors) else np.zeros((0, dim), dtype=np.float32)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        self.idf = (np.log((1 + matrix.shape[0]) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.matrix = self._normalize_rows(matrix * self.idf)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def extended(self, vectors: Sequence[np.ndarray]) -> "SimilarityIndex":
+        """A copy with `vectors` appended, weighted with this index's IDF (recomputed on the next full build)."""
+        index = SimilarityIndex.__new__(SimilarityIndex)
+        index.dim = self.dim
+        index.idf = self.idf
+        added = self._normalize_rows(np.vstack(vectors).astype(np.float32) * self.idf) if len(vectors) else \
+            np.zeros((0, self.dim), dtype=np.float32)
+        index.matrix = np.vstack([self.matrix, added])
+        return index
+
+    def transform(self, vector: np.ndarray) -> np.ndarray:
+        weighted = vector * self.idf
+        norm = np.linalg.norm(weighted)
+        return weighted / norm if norm else weighted
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of `vector` to every indexed row."""
+        if not len(self):
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.transform(vector)
+
+    def top(self, vector: np.ndarray, k: int, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        scores = self.scores(vector)
+        if not scores.size:
+            return []
+        k = min(k, scores.size)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(int(i), float(scores[i])) for i in ranked if scores[i] >= min_score]
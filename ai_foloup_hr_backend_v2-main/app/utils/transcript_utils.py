@@ -0,0 +1,54 @@
+# Compact interview transcript serialization for LLM prompts
+
+import math
+from typing import Dict, List, Optional
+from config_loader import load_config
+
+MAX_ANSWER_CHARS = int(load_config().get("llm", {}).get("transcript_max_answer_chars", 1500) or 0)
+TRUNCATION_MARKER = " [...]"
+# Rough chars-per-token ratio for English text with the GPT-4o family tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def _compact(text) -> str:
+    return " ".join(str(text or "").split())
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Avoid cutting a word in half when there is a nearby boundary
+    boundary = cut.rfind(" ")
+    if boundary > max_chars * 0.8:
+        cut = cut[:boundary]
+    return cut + TRUNCATION_MARKER
+
+
+def serialize_transcript(qa_history: List[Dict], max_answer_chars: Optional[int] = None, start: int = 1) -> str:
+    """
+    Render qa_history as numbered question/answer lines, e.g.
+
+        Q1: Tell me about yourself.
+        A1: I have five years of ...
+
+    Only the question and answer text is kept (analysis blobs, usage and timing fields are dropped),
+    whitespace is collapsed and answers longer than `max_answer_chars` are truncated
+    (defaults to llm.transcript_max_answer_chars; 0 disables truncation).
+    """
+    limit = MAX_ANSWER_CHARS if max_answer_chars is None else max_answer_chars
+    lines = []
+    number = start
+    for qa in qa_history or []:
+        if not isinstance(qa, dict):
+            continue
+        question = _compact(qa.get("question"))
+        answer = _truncate(_compact(qa.get("answer")), limit) or "(no answer)"
+        lines.append(f"Q{number}: {question}\nA{number}: {answer}")
+        number += 1
+    return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for prompt sizing; not exact, but stable enough for comparisons."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
@@ -0,0 +1,36 @@
+# Worker process entry point: video transcoding jobs, kept off the API process
+
+import asyncio
+import signal
+from dotenv import load_dotenv
+from utils.job_queue import start_workers, stop_workers
+from utils.redis_utils import close_redis, get_redis
+from services.video_job_service import VIDEO_QUEUE, CONCURRENCY
+from utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+
+async def main():
+    try:
+        await get_redis()
+    except Exception as e:
+        # The worker loop keeps retrying Redis on its own
+        logger.error(f"Failed to initialize Redis connection: {e}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker_tasks = start_workers({VIDEO_QUEUE: CONCURRENCY})
+    logger.info(f"Video worker started (max {CONCURRENCY} concurrent encodes)")
+    await stop.wait()
+    logger.info("Video worker stopping; in-flight encodes are re-queued once this worker's heartbeat expires")
+    await stop_workers(worker_tasks)
+    await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
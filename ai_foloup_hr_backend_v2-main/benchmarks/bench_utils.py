@@ -0,0 +1,76 @@
+# Shared helpers for the benchmark scripts (app import path, recorded interviews, reporting)
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+APP_DIR = BACKEND_DIR / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from utils.cost_utils import llm_call_cost  # noqa: E402
+
+
+def load_recorded_interviews_from_file(path: str) -> List[Dict]:
+    """
+    Load recorded interviews from a JSON export.
+    Expected shape: [{"interview_id": str, "response_id": str (optional), "qa_history": [...]}, ...]
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [item for item in data if isinstance(item, dict) and item.get("qa_history")]
+
+
+async def load_recorded_interviews_from_db(interview_id: Optional[str] = None, limit: int = 10) -> List[Dict]:
+    """Load completed responses that have a qa_history (read-only)."""
+    from sqlalchemy import select
+    from db import AsyncSessionLocal
+    from models import Response
+
+    async with AsyncSessionLocal() as db:
+        query = select(Response).where(Response.is_completed == True)
+        if interview_id:
+            query = query.where(Response.interview_id == interview_id)
+        query = query.order_by(Response.created_at.desc()).limit(limit * 3)
+        rows = (await db.execute(query)).scalars().all()
+
+    recorded = []
+    for r in rows:
+        if r.qa_history:
+            recorded.append({
+                "interview_id": str(r.interview_id),
+                "response_id": str(r.id),
+                "qa_history": r.qa_history,
+            })
+        if len(recorded) >= limit:
+            break
+    return recorded
+
+
+async def load_recorded_interviews(args) -> List[Dict]:
+    if getattr(args, "file", None):
+        return load_recorded_interviews_from_file(args.file)[:args.limit]
+    return await load_recorded_interviews_from_db(getattr(args, "interview_id", None), args.limit)
+
+
+def add_recording_args(parser) -> None:
+    parser.add_argument("--file", help="JSON export of recorded interviews (default: read completed responses from the DB)")
+    parser.add_argument("--interview-id", dest="interview_id", help="Only use responses of this interview (DB source)")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum number of recorded interviews")
+
+
+def token_cost(prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    return llm_call_cost(prompt_tokens, completion_tokens, cached_tokens)
+
+
+def print_table(headers: List[str], rows: List[List]) -> None:
+    cells = [[str(h) for h in headers]] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.rjust(widths[i]) for i, cell in enumerate(row)))
+        if index == 0:
+            print("  ".join("-" * w for w in widths))
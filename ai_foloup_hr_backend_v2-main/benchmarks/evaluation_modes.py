@@ -0,0 +1,129 @@
+"""
+Compare the per-answer, batched and incremental evaluation modes on recorded interviews.
+
+Runs all three modes against the configured LLM (nothing is written to the DB) and reports
+total tokens, cost, summed LLM wall time and the wall time spent at interview end.
+
+Usage (from the backend directory):
+    python benchmarks/evaluation_modes.py --limit 5
+    python benchmarks/evaluation_modes.py --file recorded_interviews.json
+"""
+
+import argparse
+import asyncio
+import time
+
+from bench_utils import add_recording_args, load_recorded_interviews, print_table, token_cost
+from services.llm_service import llm_service
+
+
+async def run_per_answer(interview_id: str, qa_history: list) -> dict:
+    prompt_tokens = completion_tokens = 0
+    answers_seconds = 0.0
+    for qa in qa_history:
+        start = time.perf_counter()
+        _, usage = await llm_service.analyze_response(interview_id, qa.get("answer", ""), {"question": qa.get("question", "")})
+        answers_seconds += time.perf_counter() - start
+        prompt_tokens += usage.get("prompt_tokens", 0)
+        completion_tokens += usage.get("completion_tokens", 0)
+
+    start = time.perf_counter()
+    _, usage = await llm_service.generate_final_analysis(interview_id, qa_history)
+    final_seconds = time.perf_counter() - start
+    prompt_tokens += usage.get("prompt_tokens", 0)
+    completion_tokens += usage.get("completion_tokens", 0)
+    return {
+        # Long transcripts take several map calls plus a reduce for the final analysis
+        "calls": len(qa_history) + llm_service.final_analysis_call_count(qa_history),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "llm_seconds": answers_seconds + final_seconds,
+        "end_seconds": final_seconds,
+    }
+
+
+async def run_batched(interview_id: str, qa_history: list) -> dict:
+    start = time.perf_counter()
+    _, _, usage = await llm_service.evaluate_interview(interview_id, qa_history)
+    elapsed = time.perf_counter() - start
+    return {
+        "calls": 1,
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "llm_seconds": elapsed,
+        "end_seconds": elapsed,
+    }
+
+
+async def run_incremental(interview_id: str, qa_history: list) -> dict:
+    state = {"folded": [], "question_summaries": {}, "notes": "", "scores": {}}
+    prompt_tokens = completion_tokens = 0
+    llm_seconds = last_fold_seconds = 0.0
+    for index, qa in enumerate(qa_history):
+        start = time.perf_counter()
+        folded, usage = await llm_service.fold_answer(state, qa.get("question", ""), qa.get("answer", ""), index + 1)
+        last_fold_seconds = time.perf_counter() - start
+        llm_seconds += last_fold_seconds
+        prompt_tokens += usage.get("prompt_tokens", 0)
+        completion_tokens += usage.get("completion_tokens", 0)
+        state["folded"].append(index)
+        state["question_summaries"][str(index)] = {"question": qa.get("question", ""), "summary": folded.get("questionSummary", "")}
+        state["notes"] = folded.get("runningNotes") or state["notes"]
+        state["scores"] = folded.get("runningScores") or state["scores"]
+
+    start = time.perf_counter()
+    _, usage = await llm_service.finalize_running_evaluation(
+        list(state["question_summaries"].values()), state["notes"], state["scores"]
+    )
+    finalize_seconds = time.perf_counter() - start
+    prompt_tokens += usage.get("prompt_tokens", 0)
+    completion_tokens += usage.get("completion_tokens", 0)
+    return {
+        "calls": len(qa_history) + 1,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "llm_seconds": llm_seconds + finalize_seconds,
+        # The last answer is typically still being folded when the interview ends
+        "end_seconds": last_fold_seconds + finalize_seconds,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_recording_args(parser)
+    args = parser.parse_args()
+
+    recorded = await load_recorded_interviews(args)
+    if not recorded:
+        print("No recorded interviews found.")
+        return
+
+    modes = (("per_answer", run_per_answer), ("batched", run_batched), ("incremental", run_incremental))
+    totals = {mode: {} for mode, _ in modes}
+    rows = []
+    for item in recorded:
+        qa_history = [qa for qa in item["qa_history"] if isinstance(qa, dict)]
+        label = (item.get("response_id") or item["interview_id"])[:8]
+        for mode, runner in modes:
+            result = await runner(item["interview_id"], qa_history)
+            result["cost"] = token_cost(result["prompt_tokens"], result["completion_tokens"])
+            for key, value in result.items():
+                totals[mode][key] = totals[mode].get(key, 0) + value
+            rows.append([
+                label, len(qa_history), mode, result["calls"],
+                result["prompt_tokens"] + result["completion_tokens"],
+                f"{result['cost']:.6f}", f"{result['llm_seconds']:.2f}", f"{result['end_seconds']:.2f}",
+            ])
+
+    headers = ["interview", "answers", "mode", "calls", "tokens", "cost_usd", "llm_s", "at_end_s"]
+    print_table(headers, rows)
+    print()
+    print_table(headers[2:], [
+        [mode, t["calls"], t["prompt_tokens"] + t["completion_tokens"], f"{t['cost']:.6f}",
+         f"{t['llm_seconds']:.2f}", f"{t['end_seconds']:.2f}"]
+        for mode, t in totals.items()
+    ])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Measure final-analysis prompt size with the previous repr() serialization of qa_history
+versus the compact numbered transcript (utils/transcript_utils.py).
+
+By default only the prompts are built and their size estimated, so no LLM calls are made.
+With --live both prompts are sent to the configured LLM and the reported prompt tokens and
+latency are compared as well (nothing is written to the DB).
+
+Usage (from the backend directory):
+    python benchmarks/final_analysis_prompt.py --limit 5
+    python benchmarks/final_analysis_prompt.py --file recorded_interviews.json --live
+"""
+
+import argparse
+import asyncio
+import time
+
+from bench_utils import add_recording_args, load_recorded_interviews, print_table, token_cost
+from services.llm_service import llm_service
+from services.prompt_templates import get_template
+from utils.transcript_utils import estimate_tokens, serialize_transcript
+
+
+def build_messages(qa_history: list, variant: str, max_answer_chars: int = None) -> list:
+    if variant == "repr":
+        transcript = str(qa_history)
+    else:
+        transcript = serialize_transcript(qa_history, max_answer_chars=max_answer_chars)
+    return get_template("final_analysis").render(transcript=transcript)
+
+
+async def run_live(messages: list) -> dict:
+    start = time.perf_counter()
+    response = await llm_service.client.chat.completions.create(
+        model=llm_service.model,
+        messages=messages,
+        response_format={"type": "json_object"},
+        max_tokens=1500,
+        temperature=0.3
+    )
+    elapsed = time.perf_counter() - start
+    usage = llm_service._usage_dict(getattr(response, "usage", None))
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "cached_tokens": usage.get("cached_tokens", 0),
+        "seconds": elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_recording_args(parser)
+    parser.add_argument("--live", action="store_true", help="Send both prompts to the LLM and compare reported usage and latency")
+    parser.add_argument("--max-answer-chars", dest="max_answer_chars", type=int, default=None,
+                        help="Override llm.transcript_max_answer_chars for the compact variant")
+    args = parser.parse_args()
+
+    recorded = await load_recorded_interviews(args)
+    if not recorded:
+        print("No recorded interviews found.")
+        return
+
+    headers = ["interview", "answers", "variant", "chars", "est_tokens"]
+    if args.live:
+        headers += ["prompt_tokens", "cost_usd", "latency_s"]
+    rows = []
+    totals = {}
+    for item in recorded:
+        qa_history = [qa for qa in item["qa_history"] if isinstance(qa, dict)]
+        label = (item.get("response_id") or item["interview_id"])[:8]
+        for variant in ("repr", "compact"):
+            messages = build_messages(qa_history, variant, args.max_answer_chars)
+            chars = sum(len(m["content"]) for m in messages)
+            result = {"chars": chars, "est_tokens": sum(estimate_tokens(m["content"]) for m in messages)}
+            row = [label, len(qa_history), variant, chars, result["est_tokens"]]
+            if args.live:
+                live = await run_live(messages)
+                result.update(live)
+                result["cost"] = token_cost(live["prompt_tokens"], live["completion_tokens"], live["cached_tokens"])
+                row += [live["prompt_tokens"], f"{result['cost']:.6f}", f"{live['seconds']:.2f}"]
+            rows.append(row)
+            for key, value in result.items():
+                totals.setdefault(variant, {})[key] = totals.setdefault(variant, {}).get(key, 0) + value
+
+    print_table(headers, rows)
+    print()
+    summary_headers = ["variant", "chars", "est_tokens"] + (["prompt_tokens", "cost_usd", "latency_s"] if args.live else [])
+    summary_rows = []
+    for variant, t in totals.items():
+        row = [variant, t["chars"], t["est_tokens"]]
+        if args.live:
+            row += [t["prompt_tokens"], f"{t['cost']:.6f}", f"{t['seconds']:.2f}"]
+        summary_rows.append(row)
+    print_table(summary_headers, summary_rows)
+    if totals.get("repr", {}).get("est_tokens"):
+        saved = 1 - totals["compact"]["est_tokens"] / totals["repr"]["est_tokens"]
+        print(f"\nEstimated prompt token reduction: {saved:.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Compare the stream-copy (remux) and full H.264 transcode paths for candidate videos.
+
+Runs both ffmpeg commands the storage service would run on the same WebM recording and
+reports encode seconds per recorded minute and output size. The remux writes MP4 for H.264
+recordings and, when video_encoding.webm_copy_video_codecs lists vp9, WebM for VP9 ones, as
+the storage service does. Without --file, a synthetic VP9/Opus recording (what Chrome's
+MediaRecorder produces) is generated first.
+
+Usage (from the backend directory):
+    python benchmarks/video_encode.py --minutes 5
+    python benchmarks/video_encode.py --file <storage_path>/temp/<response_id>/merged.webm
+"""
+
+import argparse
+import asyncio
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import print_table
+from services.storage_service import storage_service
+
+
+def make_synthetic_recording(path: Path, minutes: float) -> None:
+    subprocess.run([
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", "testsrc=size=1280x720:rate=30",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000",
+        "-t", str(minutes * 60),
+        "-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8", "-b:v", "1M",
+        "-c:a", "libopus", "-b:a", "64k",
+        "-y", str(path),
+    ], check=True)
+
+
+def recorded_seconds(path: Path) -> float:
+    """Timestamp of the last video packet; MediaRecorder files carry no container duration."""
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time", "-of", "csv=p=0", str(path),
+    ], capture_output=True, text=True, check=True)
+    times = [float(value) for value in result.stdout.split() if value not in ("", "N/A")]
+    return max(times, default=0.0)
+
+
+def run_path(name: str, cmd: list, output_path: Path, recorded_minutes: float) -> list:
+    start = time.perf_counter()
+    try:
+        storage_service._run_ffmpeg(cmd, timeout=3600)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        return [name, "failed", "-", "-", type(e).__name__]
+    elapsed = time.perf_counter() - start
+    valid = storage_service._validate_output_video(output_path)
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    return [name, f"{elapsed:.2f}", f"{elapsed / recorded_minutes:.2f}", f"{size_mb:.1f}", "ok" if valid else "invalid"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="WebM recording to convert (default: generate a synthetic one)")
+    parser.add_argument("--minutes", type=float, default=2, help="Length of the synthetic recording")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.file:
+            source = Path(args.file)
+        else:
+            source = tmp_dir / "synthetic.webm"
+            print(f"Generating a {args.minutes:g} minute VP9/Opus recording...")
+            make_synthetic_recording(source, args.minutes)
+
+        probe = storage_service._probe_media(source)
+        if not probe:
+            raise SystemExit(f"Could not probe {source}")
+        duration = probe.get("duration") or recorded_seconds(source)
+        if not duration:
+            raise SystemExit(f"Could not determine the recorded length of {source}")
+        recorded_minutes = duration / 60
+        container, blocker = storage_service._stream_copy_container(probe)
+        print(f"{source}: {probe['video_codec']}/{probe['audio_codec']}, {recorded_minutes:.2f} min, "
+              f"stream copy {'not possible (' + blocker + ')' if blocker else 'into ' + container}")
+        print()
+
+        rows = []
+        if container:
+            remux_output = tmp_dir / f"remux.{container}"
+            rows.append(run_path(f"remux ({container})",
+                                 storage_service._build_remux_command(source, remux_output, probe, container),
+                                 remux_output, recorded_minutes))
+        transcode_output = tmp_dir / "transcode.mp4"
+        rows.append(run_path("transcode", storage_service._build_ffmpeg_command(source, transcode_output),
+                             transcode_output, recorded_minutes))
+        print_table(["path", "encode_s", "s_per_recorded_min", "size_mb", "output"], rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
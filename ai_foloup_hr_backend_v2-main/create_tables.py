@@ -2,7 +2,7 @@
 
 import os
 from dotenv import load_dotenv
-from app.models import Base, Organization, User, Interview, Response, Feedback
+from app.models import Base, Organization, User, Interview, Response, ResponseQuestion, QuestionBankEntry, InterviewTemplate, Feedback
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -0,0 +1,29 @@
+# DB column migration script: adds columns introduced after a table was first created
+
+import os
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+import asyncio
+
+load_dotenv()
+
+engine = create_async_engine(os.getenv("DATABASE_URL"), echo=True)
+
+# create_all only creates missing tables, so columns added to existing tables are listed here.
+# Every statement is idempotent; the script is safe to run on every deploy.
+COLUMN_MIGRATIONS = [
+    'ALTER TABLE response ADD COLUMN IF NOT EXISTS running_evaluation JSONB',
+    'ALTER TABLE interview ADD COLUMN IF NOT EXISTS insights JSONB',
+    'ALTER TABLE interview ADD COLUMN IF NOT EXISTS question_pool JSONB',
+]
+
+async def migrate_columns():
+    async with engine.begin() as conn:
+        for statement in COLUMN_MIGRATIONS:
+            await conn.execute(text(statement))
+    from app.utils.logger import get_logger
+    logger = get_logger(__name__)
+    logger.info("Column migrations applied successfully!")
+
+asyncio.run(migrate_columns())
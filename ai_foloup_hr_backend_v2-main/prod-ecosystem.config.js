@@ -1,5 +1,15 @@
 module.exports = {
   apps: [
+    {
+      // One-shot: adds columns new code expects to existing tables (idempotent), then exits
+      name: "Prod_Interview_Tool_Migrate",
+      script: "/home/azureuser/Interview_Tool/prod/ai_foloup_hr_backend_v2/migrate_columns.py",
+      cwd: "/home/azureuser/Interview_Tool/prod/ai_foloup_hr_backend_v2",
+      exec_mode: "fork",
+      instances: 1,
+      autorestart: false,
+      interpreter: "/usr/bin/python3"
+    },
     {
       name: "Prod_Interview_Tool",
       script: "/home/azureuser/Interview_Tool/prod/ai_foloup_hr_backend_v2/app/main.py",
@@ -10,6 +20,16 @@ module.exports = {
       autorestart: true,
       max_restarts: 5,
       interpreter: "/usr/bin/python3"
+    },
+    {
+      name: "Prod_Interview_Tool_Video_Worker",
+      script: "/home/azureuser/Interview_Tool/prod/ai_foloup_hr_backend_v2/app/worker.py",
+      exec_mode: "fork",
+      instances: 1,
+      autorestart: true,
+      max_restarts: 5,
+      kill_timeout: 10000,
+      interpreter: "/usr/bin/python3"
     }
   ]
 };
\ No newline at end of file
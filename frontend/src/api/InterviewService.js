@@ -1,37 +1,128 @@
-import { INTERVIEW_ROUTES } from '../utils/constants/apiRoutes';
-import { FORM_DATA_OPTIONS } from '../utils/constants/apiConstants';
-import { QUESTION_GENERATION } from '../utils/constants/interviewServiceConstants';
-import { postFormData, postJson } from '../utils/helper';
-
-export async function createInterview(interviewData) {
-  return postFormData(
-    INTERVIEW_ROUTES.CREATE_INTERVIEW,
-    interviewData,
-    FORM_DATA_OPTIONS.CREATE,
-  );
-}
-
-export async function generateQuestions(interviewId, questionCount) {
-  const requestBody = {
-    interview_id: interviewId,
-    question_count: questionCount,
-    question_mode: QUESTION_GENERATION.MODE,
-    auto_question_generate: QUESTION_GENERATION.AUTO_GENERATE,
-  };
-
-  return postJson(INTERVIEW_ROUTES.GENERATE_QUESTIONS, requestBody);
-}
-
-export async function updateInterview(updateData) {
-  return postFormData(
-    INTERVIEW_ROUTES.UPDATE_INTERVIEW,
-    updateData,
-    FORM_DATA_OPTIONS.UPDATE,
-  );
-}
-
-export default {
-  createInterview,
-  generateQuestions,
-  updateInterview,
-};
+import { API_URL } from '../config/config';
+import { INTERVIEW_ROUTES } from '../utils/constants/apiRoutes';
+import { FORM_DATA_OPTIONS, HTTP_VERB } from '../utils/constants/apiConstants';
+import { QUESTION_GENERATION } from '../utils/constants/interviewServiceConstants';
+import messages from '../utils/constants/messages';
+import { postFormData, postJson } from '../utils/helper';
+import APIService from './APIService';
+
+export async function createInterview(interviewData) {
+  return postFormData(
+    INTERVIEW_ROUTES.CREATE_INTERVIEW,
+    interviewData,
+    FORM_DATA_OPTIONS.CREATE,
+  );
+}
+
+export async function generateQuestions(interviewId, questionCount) {
+  const requestBody = {
+    interview_id: interviewId,
+    question_count: questionCount,
+    question_mode: QUESTION_GENERATION.MODE,
+    auto_question_generate: QUESTION_GENERATION.AUTO_GENERATE,
+  };
+
+  return postJson(INTERVIEW_ROUTES.GENERATE_QUESTIONS, requestBody);
+}
+
+// Parses one server-sent event ("event: <name>\ndata: <json>")
+const parseSseEvent = frame => {
+  let event = 'message';
+  const dataLines = [];
+  frame.split('\n').forEach(line => {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      dataLines.push(line.slice(5).trim());
+    }
+  });
+  return {
+    event,
+    data: dataLines.length ? JSON.parse(dataLines.join('\n')) : {},
+  };
+};
+
+// Streams /generate-questions: onQuestion is called for every question as soon
+// as it is generated, and the promise resolves like generateQuestions once all
+// are done. The endpoint is a POST that needs the Authorization header, which
+// EventSource cannot send, so the response body is read with fetch.
+export async function generateQuestionsStream(
+  interviewId,
+  questionCount,
+  onQuestion,
+) {
+  const requestBody = {
+    interview_id: interviewId,
+    question_count: questionCount,
+    question_mode: QUESTION_GENERATION.MODE,
+    auto_question_generate: QUESTION_GENERATION.AUTO_GENERATE,
+  };
+  const { method, headers, data } = APIService.buildRequest({
+    httpVerb: HTTP_VERB.POST,
+    body: requestBody,
+  });
+  const response = await fetch(
+    `${API_URL}${INTERVIEW_ROUTES.GENERATE_QUESTIONS_STREAM}`,
+    { method, headers, body: data },
+  );
+
+  if (!response.ok || !response.body) {
+    let errorMessage = messages.SOMETHING_WENT_WRONG_ERROR;
+    try {
+      errorMessage = (await response.json())?.detail || errorMessage;
+    } catch {
+      // Non-JSON error body
+    }
+    throw { body: null, error: errorMessage, status: response.status };
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const { event, data: payload } = parseSseEvent(
+        buffer.slice(0, boundary),
+      );
+      buffer = buffer.slice(boundary + 2);
+      if (event === 'question') {
+        onQuestion?.(payload.question);
+      } else if (event === 'done') {
+        return { body: payload, status: response.status, error: null };
+      } else if (event === 'error') {
+        throw {
+          body: null,
+          error: payload.error || messages.SOMETHING_WENT_WRONG_ERROR,
+          status: 500,
+        };
+      }
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+  throw {
+    body: null,
+    error: messages.SOMETHING_WENT_WRONG_ERROR,
+    status: response.status,
+  };
+}
+
+export async function updateInterview(updateData) {
+  return postFormData(
+    INTERVIEW_ROUTES.UPDATE_INTERVIEW,
+    updateData,
+    FORM_DATA_OPTIONS.UPDATE,
+  );
+}
+
+export default {
+  createInterview,
+  generateQuestions,
+  generateQuestionsStream,
+  updateInterview,
+};